@@ -1,50 +1,26 @@
 import pygame  # Import the pygame library for game development
 import sys  # Import sys for system-specific parameters and functions
-import math # Import math for distance calculations
-import random # For Dartling Gunner accuracy
+import time  # Used to name profiler exports
 
-from tower import CannonTower, DartMonkey, TackShooter, SniperMonkey, DartlingGunner, IceTower, BananaFarm, UPGRADES # Import tower classes and UPGRADES
-from enemy import Red, Blue, Green, Yellow, Pink, Black, White, Purple, Lead, Zebra, Rainbow, Ceramic, MOAB  # Import enemy classes
-from enemy_info import ALL_WAVES, path  # Import predefined enemy waves and path
+from enemy import preload_bloon_sprites  # Fills the shared bloon sprite registry
+from game import Game, FAST_FORWARD_SPEEDS, FAST_FORWARD_BUDGET  # Game state and simulation (shared with headless runs)
 from menu import Menu  # Import the menu class for handling UI
-
-# --- Helper Functions for Collision ---
-def dist_point_to_segment(px, py, x1, y1, x2, y2):
-    """Calculates the shortest distance from a point to a line segment."""
-    line_vec_x, line_vec_y = x2 - x1, y2 - y1
-    line_len_sq = line_vec_x**2 + line_vec_y**2
-    if line_len_sq == 0: # Segment is a point
-        return math.sqrt((px - x1)**2 + (py - y1)**2)
-
-    # Project point onto the line defined by the segment
-    t = ((px - x1) * line_vec_x + (py - y1) * line_vec_y) / line_len_sq
-    t = max(0.0, min(1.0, t)) # Clamp t to [0, 1] to stay within the segment
-
-    closest_x = x1 + t * line_vec_x
-    closest_y = y1 + t * line_vec_y
-    return math.sqrt((px - closest_x)**2 + (py - closest_y)**2)
-
-def is_on_path(x, y, path_points, path_thickness):
-    """Checks if a point is within the path's thickness."""
-    for i in range(len(path_points) - 1):
-        p1 = path_points[i]
-        p2 = path_points[i+1]
-        if dist_point_to_segment(x, y, p1[0], p1[1], p2[0], p2[1]) <= path_thickness / 2:
-            return True
-    return False
-
-def is_overlapping_tower(new_x, new_y, new_radius, existing_towers):
-    """Checks if a proposed tower placement overlaps with any existing tower."""
-    for tower in existing_towers:
-        # Calculate distance between centers
-        dist = math.sqrt((new_x - tower.x)**2 + (new_y - tower.y)**2)
-        # Check if their circles overlap
-        # Assuming tower.radius exists and is roughly consistent with its visual size.
-        if dist < (new_radius + tower.radius):
-            return True
-    return False
-# --- End Helper Functions ---
-
+from profiler import frame_profiler  # Per-phase frame timings (F3: overlay, F4: export to CSV)
+from renderer import FrameRenderer  # Cached background and dirty-rectangle display updates
+from replay import ReplayRecorder  # Input log for exact playback (python replay.py FILE)
+from snapshot import write_snapshot, read_snapshot  # Binary save files (autosave, resume)
+from sprites import get_text_surface  # Cache of rendered text for the HUD
+
+
+# Command line: --record=FILE writes a replay of this game on exit, --seed=N fixes its random numbers,
+# --load=FILE resumes a saved game (a replay recorded with it starts from the saved state) and
+# --autosave=FILE saves the game every AUTOSAVE_INTERVAL seconds and on exit
+options = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--") and "=" in arg)
+record_path = options.get("record")
+seed = int(options["seed"]) if "seed" in options else None
+load_path = options.get("load")
+autosave_path = options.get("autosave")
+AUTOSAVE_INTERVAL = 5.0  # Seconds of game time between autosaves
 
 # Initialize pygame
 pygame.init()
@@ -62,237 +38,146 @@ Path_color = (150, 150, 150)  # RGB value for path color
 screen = pygame.display.set_mode((screen_width, screen_height))  # Create the game window
 pygame.display.set_caption("Tower Defense")  # Set the title of the game window
 
-# Define the path
-path_line_amount = len(path) - 1  # Number of segments in the path
-path_thickness = 30  # Thickness of the path lines
+# Load and scale every bloon sprite once up front, so spawning and popping never touch the disk mid-wave
+preload_bloon_sprites()
+
+# Create the game (towers, bloons, money, health and wave progress live here)
+if load_path:
+    game = read_snapshot(load_path)
+else:
+    game = Game(money=65000, health=100, seed=seed)
+next_autosave = game.time + AUTOSAVE_INTERVAL
+recorder = ReplayRecorder(game) if record_path else None  # Logs placements, upgrades and the mouse, tick by tick
 
-# Player health and money
-player_health = 100  # Initialize player's health
+# The grass, path and tower bodies are drawn once into a cached background; only what moves is redrawn each frame
+renderer = FrameRenderer(screen, game, DARK_GREEN, Path_color)
 
 # Font for displaying health and money
 font = pygame.font.Font(None, 36)  # Define font for rendering text
-
-# Enemy spawning variables
-enemy_list = []  # List to store active enemies
-current_wave_set_index = 0  # Index for the main list of waves (ALL_WAVES)
-current_wave_group_index = 0 # Index for groups within the current wave (e.g., Red bloons, then Blue bloons)
-enemies_spawned_in_current_group = 0 # Counter for enemies spawned from the current group
-wave_start_time = pygame.time.get_ticks() / 1000  # Reference time for starting the current wave or group, in seconds
-next_enemy_spawn_time = 0 # Time when the next enemy from the current group should spawn
+profiler_font = pygame.font.Font(None, 18)  # Small font for the profiler overlay
 
 # Initialize the menu
-menu = Menu(screen, money=65000)  # Create the menu object with starting money
-
-# Towers list
-towers = []  # List to store placed towers
-
-# Visual effects list (for hit markers, explosions, etc.)
-visual_effects = []
+menu = Menu(screen, game)  # Create the menu object; money is owned by the game
 
 # Initialize clock for managing frame rate
 clock = pygame.time.Clock()  # Create a clock object to control frame rate
 
+# Fast-forward (F key cycles 1x, 2x, 4x and max): several ticks run per frame, and the window is redrawn less often
+speed_index = 0  # Index into FAST_FORWARD_SPEEDS
+FAST_FORWARD_RENDER_INTERVAL = 1.0 / 30  # Seconds between redraws while fast-forwarding
+last_render = 0.0  # time.perf_counter() of the last redraw
+
 # Main game loop
 running = True
 
 while running:
     # --- Game Loop Timing & Input ---
-    # Limit frame rate to 60 FPS and get frame duration in seconds
-    time_started = clock.tick(60) / 1000.0  # Frame duration in seconds (delta time)
-    current_time = pygame.time.get_ticks() / 1000.0  # Total elapsed game time in seconds
+    # Limit frame rate to 60 FPS and get frame duration in seconds (no limit at max speed: the tick budget paces the loop)
+    speed = FAST_FORWARD_SPEEDS[speed_index]
+    time_started = clock.tick(60 if speed is not None else 0) / 1000.0  # Frame duration in seconds (delta time)
     mouse_pos = pygame.mouse.get_pos()  # Get the current mouse position
+    frame_profiler.begin_frame()  # Phase timings below add up into this frame (no-op while the profiler is off)
 
     # --- Event Handling ---
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:  # Handle window close event
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:  # Handle mouse button click
-            # Handle clicks on menu items (buy towers) and upgrade buttons
-            menu.handle_click(event.pos, towers)
-
-            # If a tower is selected for placement (from the buy menu)
-            # and no existing tower is currently selected for upgrades
-            if menu.selected_tower_to_buy and not menu.selected_placed_tower:
-                placement_x, placement_y = event.pos[0], event.pos[1]
-                # Use a default radius for placement collision checks
-                tower_radius_for_placement = 25
-
-                if placement_y < 750:  # Ensure the tower is placed outside the menu area
-                    # Check for collision with path
-                    if is_on_path(placement_x, placement_y, path, path_thickness):
-                        print("Cannot place tower on the path!")
-                        continue # Skip placement
-
-                    # Check for collision with other towers
-                    if is_overlapping_tower(placement_x, placement_y, tower_radius_for_placement, towers):
-                        print("Cannot place tower on another tower!")
-                        continue # Skip placement
-
-                    tower_type = menu.selected_tower_to_buy["name"]  # Get the type of the tower
-                    if menu.money >= menu.selected_tower_to_buy["price"]:  # Check if player has enough money
-                        # Create and place the new tower based on its type
-                        new_tower = None
-                        if tower_type == "Cannon Tower":
-                            new_tower = CannonTower(placement_x, placement_y)
-                        elif tower_type == "Dart Monkey":
-                            new_tower = DartMonkey(placement_x, placement_y)
-                        elif tower_type == "Tack Shooter":
-                            new_tower = TackShooter(placement_x, placement_y)
-                        elif tower_type == "Sniper Monkey":
-                            new_tower = SniperMonkey(placement_x, placement_y)
-                        elif tower_type == "Dartling Gunner":
-                            new_tower = DartlingGunner(placement_x, placement_y)
-                        elif tower_type == "Ice Tower":
-                            new_tower = IceTower(placement_x, placement_y)
-                        elif tower_type == "Banana Farm":
-                            new_tower = BananaFarm(placement_x, placement_y)
-
+    with frame_profiler.scope('events'):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:  # Handle window close event
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:  # Toggle the profiler and its overlay
+                    frame_profiler.enabled = not frame_profiler.enabled
+                    frame_profiler.clear()
+                    renderer.invalidate()  # Repaint the whole window so a hidden overlay leaves nothing behind
+                elif event.key == pygame.K_F4:  # Dump the recorded frames to a CSV file
+                    export_path = time.strftime("profile_%Y%m%d_%H%M%S.csv")
+                    frames_written = frame_profiler.export_csv(export_path)
+                    print(f"Profiler: {frames_written} frames written to {export_path}")
+                elif event.key == pygame.K_f:  # Cycle the fast-forward speed
+                    speed_index = (speed_index + 1) % len(FAST_FORWARD_SPEEDS)
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):  # The window was uncovered
+                renderer.invalidate()
+            elif event.type == pygame.MOUSEBUTTONDOWN:  # Handle mouse button click
+                # Handle clicks on menu items (buy towers) and upgrade buttons
+                menu.handle_click(event.pos, game.towers)
+
+                # If a tower is selected for placement (from the buy menu)
+                # and no existing tower is currently selected for upgrades
+                if menu.selected_tower_to_buy and not menu.selected_placed_tower:
+                    placement_x, placement_y = event.pos[0], event.pos[1]
+
+                    if placement_y < 750:  # Ensure the tower is placed outside the menu area
+                        # The game checks the path, other towers and the price before placing
+                        new_tower = game.place_tower(menu.selected_tower_to_buy["name"], placement_x, placement_y)
                         if new_tower: # If tower was successfully created
-                            towers.append(new_tower)
-                            menu.money -= new_tower.price  # Deduct cost
                             menu.selected_tower_to_buy = None  # Clear selected tower for buying
                             menu.preview_tower = None  # Clear placement preview
+                        else:
+                            blocker = game.placement_blocker(placement_x, placement_y)
+                            if blocker == "path":
+                                print("Cannot place tower on the path!")
+                            elif blocker == "tower":
+                                print("Cannot place tower on another tower!")
 
     # --- Game State Updates ---
-    # Check if there are more waves to play
-    if current_wave_set_index < len(ALL_WAVES):
-        current_wave_data = ALL_WAVES[current_wave_set_index] # This is a list of groups for the current wave
-
-        # --- Handle Spawning of current enemy group in the current wave ---
-        if current_wave_group_index < len(current_wave_data):
-            current_group = current_wave_data[current_wave_group_index]
-
-            # Check if it's time to start spawning this group's enemies and if there are still enemies to spawn
-            if current_time >= wave_start_time + current_group["delay_from_start"] and \
-                enemies_spawned_in_current_group < current_group["amount"]:
-
-                if current_time >= next_enemy_spawn_time:
-                    enemy_type = current_group["type"]
-                    # Get camo and regrowth flags directly from current_group dictionary
-                    is_camo_bloon = current_group.get("is_camo", False)
-                    is_regrowth_bloon = current_group.get("is_regrowth", False)
-
-                    # Using a dictionary to map strings to classes for cleaner code
-                    enemy_classes = {
-                        "Red": Red, "Blue": Blue, "Green": Green, "Yellow": Yellow, "Pink": Pink,
-                        "Black": Black, "White": White, "Purple": Purple, "Lead": Lead,
-                        "Zebra": Zebra, "Rainbow": Rainbow, "Ceramic": Ceramic, "MOAB": MOAB
-                    }
-
-                    if enemy_type in enemy_classes:
-                        new_enemy = enemy_classes[enemy_type](
-                            path,
-                            is_regrowth=is_regrowth_bloon,
-                            is_camo=is_camo_bloon
-                        )
-
-                        enemy_list.append(new_enemy)
-                        enemies_spawned_in_current_group += 1
-                        next_enemy_spawn_time = current_time + current_group["spawn_delay"]
-
-            # Check if all enemies in the current group have been spawned
-            if enemies_spawned_in_current_group >= current_group["amount"]:
-                current_wave_group_index += 1 # Move to the next group
-                enemies_spawned_in_current_group = 0 # Reset counter for the next group
-                wave_start_time = current_time # Update reference time: the next group's delay will be relative to this moment
-                next_enemy_spawn_time = current_time # Reset next spawn time immediately
-
-        # --- Check for Wave Completion and Advance to Next Wave Set ---
-        # If all groups in the current wave have been fully processed
-        # AND there are no active enemies left on screen
-        if current_wave_group_index >= len(current_wave_data) and len(enemy_list) == 0:
-            current_wave_set_index += 1
-            menu.increment_wave()  # Update the wave number in the menu UI
-            current_wave_group_index = 0  # Reset group index for the new wave
-            enemies_spawned_in_current_group = 0 # Reset spawned counter for the new wave
-            wave_start_time = current_time  # Set reference time: the first group of the new wave will use this as its starting point for delays
-            next_enemy_spawn_time = current_time # Reset next spawn time for the new wave
-
-            if current_wave_set_index >= len(ALL_WAVES):
-                print("All waves completed! Game over, you win!")
-                running = False # End the game loop
-
-
-    # Move enemies and handle those reaching the end
-    for enemy in enemy_list[:]: # Iterate over a copy to allow modification
-        enemy.move()
-        if enemy.current_path_index == len(path) - 1: # Enemy reached end of path
-            player_health -= enemy.health
-            # menu.money += enemy.money # Player loses health; also, the enemy's money value is added to player's money when it leaks
-            enemy_list.remove(enemy)
-
-    # Update towers (firing, abilities, etc.)
-    for tower in towers:
-        if isinstance(tower, DartlingGunner):
-            tower.fire(mouse_pos, current_time) # Dartling aims at mouse
-        elif isinstance(tower, SniperMonkey):
-            income = tower.update(enemy_list, current_time) # Sniper may generate income
-            if income and income > 0:
-                menu.money += income
-            tower.fire(enemy_list, current_time, screen, visual_effects) # Sniper also fires, pass screen and visual_effects
-        elif isinstance(tower, IceTower):
-            tower.update(enemy_list, current_time, screen) # Ice Tower has its own update for aura
-        elif isinstance(tower, BananaFarm):
-            money_earned = tower.update(current_time, mouse_pos) # Banana Farm generates money
-            if money_earned > 0:
-                menu.money += money_earned
-        else: # All other shooting towers
-            tower.fire(enemy_list, current_time)
-
-    # Clean up dead enemies and spawn children bloons
-    for enemy in enemy_list[:]:
-        if enemy.health <= 0:
-            menu.money += enemy.money # Player gains money for destroying an enemy
-            enemy.destroyed(enemy_list) # Spawn child bloons if applicable
-            enemy_list.remove(enemy)
+    # The simulation runs in fixed ticks; a slow frame simply runs more ticks before the next render.
+    # Game.step times its own phases (spawning, movement, towers, cleanup, projectiles, effects).
+    # When fast-forwarding, the ticks of a frame are capped by a time budget so input stays responsive.
+    if speed == 1:
+        ticks_run = game.advance(time_started, mouse_pos)
+    else:
+        ticks_run = game.advance(time_started, mouse_pos, speed=speed, budget=FAST_FORWARD_BUDGET)
+    if autosave_path and game.time >= next_autosave:
+        write_snapshot(game, autosave_path)  # A few milliseconds, even with thousands of bloons
+        next_autosave = game.time + AUTOSAVE_INTERVAL
+
+    if game.won:
+        print("All waves completed! Game over, you win!")
+        running = False # End the game loop
 
     # --- Drawing ---
-    screen.fill(DARK_GREEN) # Background
-
-    # Draw the path
-    for i in range(path_line_amount):
-        pygame.draw.line(screen, Path_color, path[i], path[i + 1], path_thickness)
-
-    # Draw enemies
-    for enemy in enemy_list:
-        enemy.draw(screen)
-
-    # Draw towers
-    for tower in towers:
-        tower.draw(screen, enemy_list) # enemy_list is passed for potential range drawing
-
-        # Update and draw projectiles for towers that manage them (MOVED HERE)
-        if hasattr(tower, 'projectiles') and tower.projectiles is not None and tower.projectile_type is not None:
-             tower.update_projectiles(screen, enemy_list, time_started) # Pass delta_time (time_started) for projectile movement
-
-    # Draw visual effects (like hit markers)
-    # Iterate over a copy for safe removal
-    for effect in visual_effects[:]:
-        if effect['type'] == 'hit_marker':
-            pygame.draw.circle(screen, effect['color'], (int(effect['pos'][0]), int(effect['pos'][1])), effect['radius'])
-
-        # Remove effect if its duration has passed
-        if current_time - effect['creation_time'] > effect['duration']:
-            visual_effects.remove(effect)
-
-    # Display player health and money
-    health_text = font.render(f"Health: {player_health}", True, BLACK)
-    screen.blit(health_text, (50, 10))
-    menu.draw_money()
-
-    # Draw menu elements (buy menu, upgrade menu, preview)
-    menu.draw_menu()
-    menu.draw_upgrade_menu() # Draw upgrade menu if a tower is selected
-    menu.draw_preview(mouse_pos) # Draw placement preview
-
-    # Update the display
-    pygame.display.flip()
+    # Every frame at normal speed; while fast-forwarding, at most every FAST_FORWARD_RENDER_INTERVAL
+    now = time.perf_counter()
+    if speed == 1 or now - last_render >= FAST_FORWARD_RENDER_INTERVAL:
+        last_render = now
+        with frame_profiler.scope('draw_background'):
+            renderer.begin_frame() # Background back over last frame's sprites (or everywhere, if a tower was placed)
+
+        # Draw enemies, tower extras, projectiles and visual effects; tower bodies are part of the background
+        dirty_rects = game.draw(screen, [], tower_bodies=False)
+
+        with frame_profiler.scope('menu'):
+            # Display player health and money
+            health_text = get_text_surface(font, f"Health: {game.health}", BLACK)  # Rendered once per health value
+            dirty_rects.append(screen.blit(health_text, (50, 10)))
+            dirty_rects.append(menu.draw_money())
+            if speed != 1:  # Fast-forward indicator
+                speed_text = get_text_surface(font, f"Speed: {speed}x" if speed else "Speed: max", BLACK)
+                dirty_rects.append(screen.blit(speed_text, (50, 40)))
+
+            # Draw menu elements (buy menu, upgrade menu, preview)
+            dirty_rects.extend(menu.draw_menu())
+            dirty_rects.extend(menu.draw_upgrade_menu()) # Draw upgrade menu if a tower is selected
+            dirty_rects.extend(menu.draw_preview(mouse_pos)) # Draw placement preview
+
+        if frame_profiler.enabled:
+            dirty_rects.append(frame_profiler.draw_overlay(screen, profiler_font)) # Shows the frames completed so far
+
+        # Update the display (only the areas drawn this frame and last frame)
+        with frame_profiler.scope('display'):
+            renderer.end_frame(dirty_rects)
+    if frame_profiler.enabled:
+        frame_profiler.end_frame(len(game.enemy_list), game.projectile_count(), ticks_run)
 
     # --- Game Over Condition ---
-    if player_health <= 0:
+    if game.lost:
         print("Game Over!")
         running = False
 
 # --- Game Exit ---
+if autosave_path:
+    write_snapshot(game, autosave_path)
+if recorder is not None:
+    inputs_written = recorder.save(record_path)
+    print(f"Replay: {inputs_written} inputs written to {record_path} (seed {game.seed})")
 pygame.quit()
-sys.exit()
\ No newline at end of file
+sys.exit()
@@ -0,0 +1,230 @@
+# batch.py
+"""
+Evaluates many tower layouts against ranges of ALL_WAVES in parallel, one headless game per
+layout and wave range, spread over a multiprocessing pool.
+
+Results are appended to a JSON-lines file as each game finishes (one object per line, in
+finishing order), so a long run can be watched while it goes and resumed if it is stopped:
+jobs whose id is already in the file are skipped.
+
+Each worker process sets up once (headless mode, compiled wave timelines) and then plays game
+after game. Bloons and projectiles released by one game are recycled by the next (see
+object_pool.py), and every slice of ALL_WAVES reuses the timelines compiled at startup.
+
+Job file (JSON):
+    {
+        "layouts": {"tack_corner": [{"type": "Tack Shooter", "x": 380, "y": 230, "upgrades": {"1": 2}}, ...], ...},
+        "wave_ranges": [[0, 9], [10, 19]],
+        "money": 650, "health": 100, "seed": 0
+    }
+"layouts" may also be a list (named layout_0, layout_1, ...). Wave ranges are inclusive indexes
+into ALL_WAVES and default to every wave. Every layout is played on every wave range.
+
+Usage:
+    python batch.py jobs.json --out=results.jsonl [--workers=N] [--no-resume]
+
+Python:
+    from batch import make_jobs, run_batch
+    jobs = make_jobs({"tack_corner": layout}, wave_ranges=[(0, 9), (10, 19)])
+    summary = run_batch(jobs, "results.jsonl", workers=32)
+"""
+import os
+import sys
+import time
+import json
+import multiprocessing
+
+from sprites import set_headless
+from enemy_info import ALL_WAVES, path
+from wave_timeline import compile_waves
+from headless import run_headless
+
+PROGRESS_EVERY = 100 # Print a progress line after this many finished games
+
+
+def make_jobs(layouts, wave_ranges=None, money=650, health=100, seed=0, max_time=None, use_enemy_store=False,
+              use_projectile_pool=False):
+    """
+    Builds one job per layout and wave range.
+
+    Args:
+        layouts (dict or list): Layouts (see headless.build_game) by name, or a list of layouts.
+        wave_ranges (list of tuples, optional): (first, last) indexes into ALL_WAVES, inclusive.
+            Defaults to every wave.
+        money (int, optional): Starting money of every game. Defaults to 650.
+        health (int, optional): Starting health of every game. Defaults to 100.
+        seed (int, optional): Seed of every game's random numbers, the same for all so layouts are
+            compared on equal terms. Defaults to 0.
+        max_time (float, optional): Stop a game after this much game time (seconds). Defaults to no limit.
+        use_enemy_store (bool, optional): See headless.run_headless. Defaults to False.
+        use_projectile_pool (bool, optional): See headless.run_headless. Defaults to False.
+
+    Returns:
+        list of dict: The jobs, each with a unique "id" ("name:first-last").
+    """
+    if not isinstance(layouts, dict):
+        layouts = {f"layout_{i}": layout for i, layout in enumerate(layouts)}
+    if wave_ranges is None:
+        wave_ranges = [(0, len(ALL_WAVES) - 1)]
+    jobs = []
+    for name, layout in layouts.items():
+        for first, last in wave_ranges:
+            jobs.append({
+                'id': f"{name}:{first}-{last}",
+                'layout_name': name,
+                'layout': layout,
+                'first_wave': first,
+                'last_wave': last,
+                'money': money,
+                'health': health,
+                'seed': seed,
+                'max_time': max_time,
+                'use_enemy_store': use_enemy_store,
+                'use_projectile_pool': use_projectile_pool,
+            })
+    return jobs
+
+
+def _init_worker():
+    """Runs once in every worker process, before its first game."""
+    set_headless(True) # Bloons must not try to load images
+    compile_waves(ALL_WAVES, path) # Every slice of ALL_WAVES reuses these timelines
+
+
+def run_job(job):
+    """
+    Plays one job's game and summarises it. Any error (a tower placed on the path, a malformed
+    layout entry such as {"upgrades": {"1": "2"}}) is reported in the result, as the exception's
+    repr, instead of being raised, so one bad layout doesn't stop a batch.
+
+    Returns:
+        dict: "job", "layout", "first_wave", "last_wave" and either "error", or "survived_waves",
+            "waves_played", "won", "health", "leaks", "pops", "money", "layout_cost",
+            "money_curve" (money after each wave), "leak_curve" (leaks per wave),
+            "game_time" and "runtime" (wall-clock seconds).
+    """
+    result = {
+        'job': job['id'],
+        'layout': job['layout_name'],
+        'first_wave': job['first_wave'],
+        'last_wave': job['last_wave'],
+    }
+    try:
+        report = run_headless(job['layout'], ALL_WAVES[job['first_wave']:job['last_wave'] + 1],
+                              money=job['money'], health=job['health'], max_time=job['max_time'],
+                              use_enemy_store=job['use_enemy_store'], use_projectile_pool=job['use_projectile_pool'],
+                              seed=job['seed'])
+    except Exception as error: # Whatever a layout does wrong; a worker must not die on it
+        result['error'] = repr(error)
+        return result
+    result.update({
+        'survived_waves': report['survived_waves'],
+        'waves_played': len(report['waves']),
+        'won': report['won'],
+        'health': report['health'],
+        'leaks': report['leaks'],
+        'pops': report['pops'],
+        'money': report['money'],
+        'layout_cost': report['layout_cost'],
+        'money_curve': [wave['money'] for wave in report['waves']],
+        'leak_curve': [wave['leaks'] for wave in report['waves']],
+        'game_time': report['game_time'],
+        'runtime': report['wall_time'],
+    })
+    return result
+
+
+def iter_results(jobs, workers=None):
+    """
+    Plays every job and yields each result as soon as its game finishes (in finishing order).
+
+    Args:
+        jobs (list of dict): Jobs from make_jobs.
+        workers (int, optional): Worker processes. 1 plays the games in this process.
+            Defaults to os.cpu_count().
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        _init_worker()
+        for job in jobs:
+            yield run_job(job)
+        return
+    with multiprocessing.Pool(processes=workers, initializer=_init_worker) as pool:
+        # chunksize 1: games take seconds, so handing them out one at a time balances the load best
+        for result in pool.imap_unordered(run_job, jobs, chunksize=1):
+            yield result
+
+
+def finished_job_ids(out_path):
+    """Ids of the jobs already in a results file (none if it doesn't exist)."""
+    if not os.path.exists(out_path):
+        return set()
+    done = set()
+    with open(out_path) as results_file:
+        for line in results_file:
+            try:
+                done.add(json.loads(line)['job'])
+            except (ValueError, KeyError):
+                pass # A line cut short when an earlier run was stopped; its job is played again
+    return done
+
+
+def run_batch(jobs, out_path, workers=None, resume=True):
+    """
+    Plays every job and appends each result to a JSON-lines file as soon as it is known.
+
+    Args:
+        jobs (list of dict): Jobs from make_jobs.
+        out_path (str): Results file; created if missing, appended to otherwise.
+        workers (int, optional): Worker processes. Defaults to os.cpu_count().
+        resume (bool, optional): Skip jobs already in the results file. Defaults to True.
+
+    Returns:
+        dict: "jobs", "skipped", "finished", "errors" and "wall_time".
+    """
+    started = time.perf_counter()
+    skipped = 0
+    if resume:
+        done = finished_job_ids(out_path)
+        pending = [job for job in jobs if job['id'] not in done]
+        skipped = len(jobs) - len(pending)
+    else:
+        pending = jobs
+    finished = 0
+    errors = 0
+    with open(out_path, 'a') as results_file:
+        for result in iter_results(pending, workers):
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush() # Each result is on disk as soon as its game ends
+            finished += 1
+            if 'error' in result:
+                errors += 1
+                print(f"{result['job']}: {result['error']}")
+            if finished % PROGRESS_EVERY == 0 or finished == len(pending):
+                elapsed = time.perf_counter() - started
+                print(f"{finished}/{len(pending)} games in {elapsed:.0f} s ({finished / elapsed:.2f} per second)")
+    return {
+        'jobs': len(jobs),
+        'skipped': skipped,
+        'finished': finished,
+        'errors': errors,
+        'wall_time': time.perf_counter() - started,
+    }
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--") and "=" in arg)
+    if len(args) != 1 or "out" not in options:
+        print("Usage: python batch.py jobs.json --out=results.jsonl [--workers=N] [--no-resume]")
+        sys.exit(1)
+    with open(args[0]) as jobs_file:
+        spec = json.load(jobs_file)
+    jobs = make_jobs(spec["layouts"], [tuple(wave_range) for wave_range in spec.get("wave_ranges", [])] or None,
+                     money=spec.get("money", 650), health=spec.get("health", 100), seed=spec.get("seed", 0),
+                     max_time=spec.get("max_time"), use_enemy_store=spec.get("use_enemy_store", False),
+                     use_projectile_pool=spec.get("use_projectile_pool", False))
+    workers = int(options["workers"]) if "workers" in options else None
+    summary = run_batch(jobs, options["out"], workers=workers, resume="--no-resume" not in sys.argv[1:])
+    print(json.dumps(summary, indent=2))
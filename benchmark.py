@@ -0,0 +1,315 @@
+# benchmark.py
+"""
+Performance measurements for the simulation. Nothing here opens a window.
+
+Scenarios are named, repeatable games (a set of waves against a tower layout) that are played
+headless while every tick is timed. The report is JSON, so results can be saved and compared
+between versions.
+
+Usage:
+    python benchmark.py                          # Bytes per bloon/projectile instance
+    python benchmark.py list                     # Names and descriptions of the scenarios
+    python benchmark.py all [options]            # Run every scenario
+    python benchmark.py NAME [NAME ...] [options]
+
+Options:
+    --store          Keep bloons in the NumPy enemy store (see enemy_store.py)
+    --pool           Simulate projectiles in the NumPy projectile pool (see projectile_pool.py)
+    --trace-malloc   Also report traced memory (slows every tick down, so timings are not comparable)
+    --out=FILE       Write the JSON report to FILE instead of printing it
+"""
+import gc
+import sys
+import json
+import math
+import time
+import platform
+import tracemalloc
+
+from sprites import set_headless
+from enemy_info import path, ALL_WAVES
+from enemy import Red, Ceramic
+from projectiles import Projectile, ShrapnelProjectile, HitscanProjectile
+from game import DEFAULT_TICK_RATE, dist_point_to_segment, is_on_path
+from headless import build_game
+from enemy_store import NUMPY_AVAILABLE
+from object_pool import pool_stats, clear_pools
+
+SCREEN_SIZE = 900 # Towers are placed inside the same 900x900 area as the game window
+BENCHMARK_HEALTH = 1000000 # Scenarios are about load, not about winning: leaks must not end them early
+
+# Named scenarios. "waves" are indexes into enemy_info.ALL_WAVES, or "custom_waves" gives the
+# wave data itself. "towers" lists (tower type, count, upgrades); the towers are placed as close
+# to the path as possible (see layout_along_path).
+SCENARIOS = {
+    "wave33_pinks_vs_20_tacks": {
+        "description": "The 140 Pink wave against 20 unupgraded Tack Shooters: many bloons, many short-lived tacks",
+        "waves": [33],
+        "towers": [("Tack Shooter", 20, {})],
+    },
+    "moab_vs_10_maim_snipers": {
+        "description": "The MOAB wave against 10 Maim MOAB Snipers: hitscan shots and the Ceramic/Rainbow cascade",
+        "waves": [37],
+        "towers": [("Sniper Monkey", 10, {1: 3})],
+    },
+    "2000_bloons_vs_50_buckshot_dartlings": {
+        "description": "2000 Pinks, spawned 5 ms apart, against 50 Buckshot Dartling Gunners aiming by script",
+        "custom_waves": [[
+            {"type": "Pink", "path": path, "amount": 2000, "delay_from_start": 0.0, "spawn_delay": 0.005,
+             "is_camo": False, "is_regrowth": False},
+        ]],
+        "towers": [("Dartling Gunner", 50, {3: 3})],
+    },
+    "5000_reds_vs_5_dart_monkeys": {
+        "description": "5000 Reds, spawned 2 ms apart, against 5 Dart Monkeys: bloon movement dominates (where --store pays off)",
+        "custom_waves": [[
+            {"type": "Red", "path": path, "amount": 5000, "delay_from_start": 0.0, "spawn_delay": 0.002,
+             "is_camo": False, "is_regrowth": False},
+        ]],
+        "towers": [("Dart Monkey", 5, {})],
+    },
+    "max_shrapnel_30_shattering_cannons": {
+        "description": "The 250 bloon rush of wave 24 against 30 Shattering Shells cannons: explosions and shrapnel",
+        "waves": [24],
+        "towers": [("Cannon Tower", 30, {3: 2})],
+    },
+}
+
+
+def _bytes_per_instance(factory, count):
+    """Returns the average number of bytes allocated by one call of factory(), with the results kept alive."""
+    instances = [None] * count # Allocated before tracing starts, so the list itself is not counted
+    for _ in range(10): # Warm up, so one-off caches filled by the first calls are not counted
+        factory()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(count):
+        instances[i] = factory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return allocated / count
+
+
+def measure_entity_bytes(count=2000):
+    """
+    Measures how much memory one live entity of each kind takes (including its own containers,
+    e.g. a bloon's rect, but not data it shares, such as its path or sprite).
+
+    Args:
+        count (int, optional): Number of instances created per kind. Defaults to 2000.
+
+    Returns:
+        dict: Bytes per instance for "bloon", "child_bloon", "projectile", "shrapnel" and "hitscan".
+    """
+    set_headless(True) # Bloons must not try to load images
+    parent = Ceramic(path)
+    parent.distance_travelled = 500.0
+    return {
+        'bloon': _bytes_per_instance(lambda: Red(path), count),
+        'child_bloon': _bytes_per_instance(lambda: Red(path, start_distance=parent.distance_travelled), count),
+        'projectile': _bytes_per_instance(lambda: Projectile(None, 100.0, 100.0, (200.0, 150.0), speed=300, damage=1, pierce=2), count),
+        'shrapnel': _bytes_per_instance(lambda: ShrapnelProjectile(None, 100.0, 100.0, (200.0, 150.0), damage=1, pierce=1, speed=250, lifespan=0.5), count),
+        'hitscan': _bytes_per_instance(lambda: HitscanProjectile(None, parent, damage=2), count),
+    }
+
+
+def layout_along_path(towers, spacing=50):
+    """
+    Builds a layout (see headless.build_game) that puts towers on the free spots closest to the path.
+
+    Args:
+        towers (list of tuples): (tower type, count, upgrades) entries, placed in order.
+        spacing (int, optional): Distance between candidate spots, in pixels. Towers have a radius
+            of 25, so 50 is the tightest packing the placement rules allow. Defaults to 50.
+
+    Returns:
+        list of dict: The layout.
+    """
+    half = spacing // 2
+    spots = []
+    for x in range(half, SCREEN_SIZE, spacing):
+        for y in range(half, SCREEN_SIZE, spacing):
+            if not is_on_path(x, y, path, spacing): # Keep the whole tower off the track
+                distance = min(dist_point_to_segment(x, y, x1, y1, x2, y2)
+                               for (x1, y1), (x2, y2) in zip(path, path[1:]))
+                spots.append((distance, x, y))
+    spots.sort()
+
+    layout = []
+    for tower_type, count, upgrades in towers:
+        if count > len(spots):
+            raise ValueError(f"Not enough room for {count} x {tower_type}")
+        for _, x, y in spots[:count]:
+            layout.append({"type": tower_type, "x": x, "y": y, "upgrades": upgrades})
+        spots = spots[count:]
+    return layout
+
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list (fraction between 0 and 1)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def _timing_summary(tick_times):
+    """Mean/p50/p99/max of a list of tick durations (seconds), in milliseconds."""
+    ordered = sorted(tick_times)
+    count = len(ordered)
+    return {
+        'mean': 1000.0 * sum(ordered) / count if count else 0.0,
+        'p50': 1000.0 * _percentile(ordered, 0.50),
+        'p99': 1000.0 * _percentile(ordered, 0.99),
+        'max': 1000.0 * ordered[-1] if count else 0.0,
+    }
+
+
+def run_scenario(name, tick_rate=DEFAULT_TICK_RATE, max_time=None, trace_allocations=False,
+                 use_enemy_store=False, use_projectile_pool=False):
+    """
+    Plays one scenario headless, timing every tick.
+
+    Args:
+        name (str): Key of SCENARIOS.
+        tick_rate (int, optional): Simulation ticks per second. Defaults to game.DEFAULT_TICK_RATE.
+        max_time (float, optional): Stop after this much game time (seconds). Defaults to no limit.
+        trace_allocations (bool, optional): Trace memory with tracemalloc. Makes ticks several times
+            slower, so leave it off when comparing timings. Defaults to False.
+        use_enemy_store (bool, optional): Keep bloons in NumPy arrays (see enemy_store.py). Defaults to False.
+        use_projectile_pool (bool, optional): Simulate projectiles in a NumPy pool (see projectile_pool.py). Defaults to False.
+
+    Returns:
+        dict: The scenario's report: "ms_per_tick" (mean/p50/p99/max), "entities" (peak and mean
+            bloons, projectiles and visual effects), "allocations", "waves" (one entry per wave with
+            its wall time) and "result" (pops, leaks, ...).
+    """
+    scenario = SCENARIOS[name]
+    if "custom_waves" in scenario:
+        waves = scenario["custom_waves"]
+        wave_labels = [f"custom_{index}" for index in range(len(waves))]
+    else:
+        waves = [ALL_WAVES[index] for index in scenario["waves"]]
+        wave_labels = list(scenario["waves"])
+    layout = layout_along_path(scenario["towers"])
+    game, _ = build_game(layout, waves, health=BENCHMARK_HEALTH, tick_rate=tick_rate,
+                         use_enemy_store=use_enemy_store, use_projectile_pool=use_projectile_pool)
+
+    # Counters for this run only
+    clear_pools()
+    gc.collect()
+    gc_before = [stats['collections'] for stats in gc.get_stats()]
+    if trace_allocations:
+        tracemalloc.start()
+
+    tick_times = []
+    wave_ticks = {} # Wave index -> list of tick durations
+    peaks = {'enemies': 0, 'projectiles': 0, 'effects': 0}
+    totals = {'enemies': 0, 'projectiles': 0, 'effects': 0}
+    clock = time.perf_counter
+    started = clock()
+    while not game.finished:
+        if max_time is not None and game.time >= max_time:
+            break
+        wave = game.current_wave_set_index
+        tick_started = clock()
+        game.step()
+        elapsed = clock() - tick_started
+        tick_times.append(elapsed)
+        wave_ticks.setdefault(wave, []).append(elapsed)
+
+        counts = {'enemies': len(game.enemy_list), 'projectiles': game.projectile_count(),
+                  'effects': len(game.visual_effects)}
+        for key, value in counts.items():
+            totals[key] += value
+            if value > peaks[key]:
+                peaks[key] = value
+    wall_time = clock() - started
+
+    allocations = pool_stats()
+    allocations['gc_collections'] = [stats['collections'] - before
+                                     for stats, before in zip(gc.get_stats(), gc_before)]
+    if trace_allocations:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        allocations['traced_current_bytes'] = current
+        allocations['traced_peak_bytes'] = peak
+
+    ticks = len(tick_times)
+    wave_reports = []
+    for index, durations in sorted(wave_ticks.items()):
+        played = game.wave_results[index] if index < len(game.wave_results) else None
+        wave_reports.append({
+            'wave': wave_labels[index] if index < len(wave_labels) else index,
+            'ticks': len(durations),
+            'wall_time': sum(durations),
+            'ms_per_tick': _timing_summary(durations),
+            'pops': played['pops'] if played else game.wave_pops,
+            'leaks': played['leaks'] if played else game.wave_leaks,
+        })
+
+    return {
+        'scenario': name,
+        'description': scenario["description"],
+        'towers': len(layout),
+        'ticks': ticks,
+        'game_time': game.time,
+        'wall_time': wall_time,
+        'ms_per_tick': _timing_summary(tick_times),
+        'entities': {key: {'peak': peaks[key], 'mean': totals[key] / ticks if ticks else 0.0} for key in peaks},
+        'allocations': allocations,
+        'waves': wave_reports,
+        'result': {'pops': game.pops, 'leaks': game.leaks, 'finished': game.finished},
+    }
+
+
+def run_scenarios(names, **options):
+    """
+    Runs several scenarios (see run_scenario, which receives the options) and wraps the reports with
+    details about the machine and settings, so saved reports can be compared later.
+
+    Returns:
+        dict: "meta" and "scenarios", a dict of reports keyed by scenario name.
+    """
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': NUMPY_AVAILABLE,
+            'tick_rate': options.get('tick_rate', DEFAULT_TICK_RATE),
+            'use_enemy_store': options.get('use_enemy_store', False),
+            'use_projectile_pool': options.get('use_projectile_pool', False),
+            'trace_allocations': options.get('trace_allocations', False),
+        },
+        'scenarios': {name: run_scenario(name, **options) for name in names},
+    }
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    if not args:
+        print(json.dumps({'entity_bytes': measure_entity_bytes()}, indent=2))
+        sys.exit(0)
+    if args == ["list"]:
+        for scenario_name, scenario in SCENARIOS.items():
+            print(f"{scenario_name}: {scenario['description']}")
+        sys.exit(0)
+
+    names = list(SCENARIOS) if args == ["all"] else args
+    unknown = [scenario_name for scenario_name in names if scenario_name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenario(s): {', '.join(unknown)}. Run 'python benchmark.py list' to see them.")
+        sys.exit(1)
+    out_path = None
+    for flag in flags:
+        if flag.startswith("--out="):
+            out_path = flag[len("--out="):]
+    report = run_scenarios(names, use_enemy_store="--store" in flags, use_projectile_pool="--pool" in flags,
+                           trace_allocations="--trace-malloc" in flags)
+    if out_path:
+        with open(out_path, "w") as out_file:
+            json.dump(report, out_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
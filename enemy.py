@@ -1,21 +1,67 @@
 import pygame
-import os
 import math
+from sprites import get_bloon_sprite, is_headless, set_headless
+from path_geometry import get_path_geometry
+from object_pool import acquire
+
+# Bloon types that have an image in the 'bloons' folder, in order of strength
+BLOON_TYPES = ["Red", "Blue", "Green", "Yellow", "Pink", "Black", "White", "Purple", "Lead", "Zebra", "Rainbow", "Ceramic", "MOAB"]
+
+def bloon_size(bloon_type, is_regrowth=False):
+    """
+    Returns the (width, height) in pixels used to draw and collide a bloon.
+
+    Args:
+        bloon_type (str): The type of bloon (e.g., "Red", "Blue", "MOAB").
+        is_regrowth (bool, optional): Whether the bloon has regrowth properties. Defaults to False.
+    """
+    # MOABs have their own specific dimensions, overriding others
+    if bloon_type == "MOAB":
+        return 120, 80
+    # Regrowth bloons are bigger, making them visually distinct
+    if is_regrowth:
+        return 45, 60
+    return 30, 40 # Normal Bloon Size
+
+def preload_bloon_sprites():
+    """
+    Fills the shared sprite registry for every bloon look that waves can spawn, so that
+    no image is read from disk in the middle of a wave. Requires the display to be set up.
+    """
+    for bloon_type in BLOON_TYPES:
+        for is_regrowth in (False, True):
+            width, height = bloon_size(bloon_type, is_regrowth)
+            for is_camo in (False, True):
+                get_bloon_sprite(bloon_type, width, height, is_regrowth, is_camo)
 
 class Enemy:
-    # Class attribute to store the camo overlay image.
-    # It's loaded once and shared by all Enemy instances if they are camo.
-    # Initialized to None and loaded in __init__ if a camo bloon is created.
-    _camo_image = None 
-
-    def __init__(self, path, health, speed, money, bloon_type, contains, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
+    # Every instance field is declared up front: instances have no __dict__, which makes them
+    # smaller and attribute access faster. Subclasses declare empty __slots__ to keep it that way.
+    __slots__ = (
+        'path', 'geometry', 'health', 'max_health', 'speed', 'money', 'bloon_type', 'is_regrowth', 'is_camo',
+        'distance_travelled', 'x', 'y', 'current_path_index', 'width', 'height', 'contains', 'radius',
+        'image', 'rect',
+        # Crowd: count identical bloons share this entity (see destroyed)
+        'count', 'crowd_health',
+        # Status effects (Ice Tower, projectile on-hit effects; see status_effects.py)
+        'base_speed', 'status_effects', 'frozen',
+        # Slot in an EnemyStore while the bloon is stored there (see enemy_store.py)
+        '_store', '_slot',
+    )
+
+    def __init__(self, *args, **kwargs):
+        """Initializes an Enemy instance. Takes the same arguments as reset()."""
+        self.reset(*args, **kwargs)
+
+    def reset(self, path, health, speed, money, bloon_type, contains, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
         """
-        Initializes an Enemy instance.
+        (Re)initializes every field of the enemy. Called by __init__, and by object_pool.acquire
+        when a released bloon is recycled, so nothing may be left over from its previous life.
 
         Args:
             path (list of tuples): The path the enemy will follow, as a list of (x, y) coordinates.
             health (int): The health of the enemy.
-            speed (float): The movement speed of the enemy.
+            speed (float): The movement speed of the enemy, in pixels per second.
             money (int): The amount of money awarded when the enemy is defeated.
             bloon_type (str): The type of bloon (e.g., "Red", "Blue", "MOAB").
             contains (list of Enemy classes): A list of Enemy classes that this bloon will spawn when popped.
@@ -24,8 +70,11 @@ class Enemy:
             start_y (float, optional): The starting y-coordinate. Overrides path start if provided with start_x. Defaults to None.
             is_regrowth (bool, optional): Whether the bloon has regrowth properties. Defaults to False.
             is_camo (bool, optional): Whether the bloon has camouflage properties. Defaults to False.
+            start_distance (float, optional): The starting distance along the path, in pixels.
+                Overrides start_pos_index/start_x/start_y if provided. Defaults to None.
         """
         self.path = path
+        self.geometry = get_path_geometry(path) # Shared arc-length tables for this path
         self.health = health
         self.max_health = health # Store max health for health bar calculation
         self.speed = speed
@@ -34,119 +83,85 @@ class Enemy:
         self.is_regrowth = is_regrowth
         self.is_camo = is_camo
         
-        # Initialize current_path_index, x, and y based on arguments
+        # Initialize distance_travelled, the only state that says where the bloon is on the path.
         # This allows bloons to be spawned mid-path (e.g., when a parent bloon is popped)
-        self.current_path_index = start_pos_index
-        if start_x is not None and start_y is not None:
-            self.x = start_x
-            self.y = start_y
+        if start_distance is not None:
+            self.distance_travelled = start_distance
+        elif start_x is not None and start_y is not None:
+            # Project the given point onto the segment it is on
+            self.distance_travelled = self.geometry.distance_of(start_pos_index, start_x, start_y)
         else:
-            # If no specific starting x, y are provided, use the coordinates from the path at the current_path_index
-            self.x, self.y = self.path[self.current_path_index]
-        
-        # Set default dimensions for most bloons (Normal Bloon Size)
-        self.width = 30
-        self.height = 40
-
-        # Adjust size specifically for Regrowth bloons, making them visually distinct
-        if self.is_regrowth:
-            self.width = 45
-            self.height = 60
+            # If no specific starting point is provided, start at the waypoint at start_pos_index
+            self.distance_travelled = self.geometry.cumulative[start_pos_index]
+        # x, y and current_path_index are derived from distance_travelled
+        self.x, self.y, self.current_path_index = self.geometry.position_at(self.distance_travelled)
         
-        # MOABs have their own specific dimensions, overriding others
-        if self.bloon_type == "MOAB":
-            self.width = 120
-            self.height = 80
-
+        # Determine the bloon's dimensions (Normal, Regrowth or MOAB size)
+        self.width, self.height = bloon_size(self.bloon_type, self.is_regrowth)
 
         self.contains = contains # List of Enemy classes this bloon spawns when popped
         self.radius = self.width // 2 # Radius should be based on the determined width for collisions
 
-        # Load the image for the enemy from the 'bloons' folder
-        image_path = os.path.join("bloons", f"{self.bloon_type}.png")
-        try:
-            self.image = pygame.image.load(image_path).convert_alpha()
-            self.image = pygame.transform.scale(self.image, (self.width, self.height))
-        except pygame.error as e:
-            print(f"Warning: Could not load bloon image {image_path} - {e}")
-            self.image = pygame.Surface((self.width, self.height), pygame.SRCALPHA) # Create a blank surface
-            pygame.draw.circle(self.image, (255, 0, 255), (self.width // 2, self.height // 2), self.width // 2) # Magenta placeholder
-
-
-        # Load camo image here if it hasn't been loaded yet and this is a camo bloon
-        if self.is_camo and Enemy._camo_image is None:
-            camo_image_path = os.path.join("bloons", "Camo.png")
-            if os.path.exists(camo_image_path): # Check if the file exists
-                try:
-                    Enemy._camo_image = pygame.image.load(camo_image_path).convert_alpha()
-                except pygame.error as e:
-                    print(f"Warning: Could not load Camo.png - {e}")
-                    Enemy._camo_image = None # Ensure it remains None if loading fails
-            else:
-                print(f"Warning: Camo.png not found at {camo_image_path}, no overlay drawn.")
-                Enemy._camo_image = None # Ensure it remains None if file not found
-
+        # Look up the shared sprite for this bloon's look; it is loaded and scaled only once per process.
+        # Camo bloons get a sprite with the camo overlay already painted on, so they draw in one blit.
+        # In headless mode this is None and the bloon is never drawn.
+        self.image = get_bloon_sprite(self.bloon_type, self.width, self.height, self.is_regrowth, self.is_camo)
 
-        # IMPORTANT: Call update_rect immediately after setting x, y, width, height
-        # to ensure the rect is correct for the first draw/move.
+        # IMPORTANT: Size the rect and call update_rect immediately after setting x, y, width, height
+        # to ensure the rect is correct for the first draw/move. A recycled bloon keeps its Rect object.
+        rect = getattr(self, 'rect', None)
+        if rect is None:
+            self.rect = pygame.Rect(0, 0, self.width, self.height)
+        else:
+            rect.size = (self.width, self.height)
         self.update_rect()
 
-        # Attributes for status effects (e.g., from Ice Tower)
-        self.original_speed = speed # Store original speed for debuffs
-        self.ice_slow_active = False
-        self.ice_slow_expire_time = 0
-        self.ice_slow_source = None # To track which Ice Tower applied the slow
-        self.frozen = False
-        self.freeze_expire_time = 0
-        self.frozen_by_ice_tower = False # Flag to prevent continuous re-freezing
+        # Attributes for status effects (e.g., from Ice Tower). speed and frozen are derived from
+        # status_effects by status_effects.refresh_speed whenever an effect starts or ends.
+        self.count = 1 # Number of identical bloons at this spot; health is the front one's, crowd_health the others'
+        self.crowd_health = health
+        self.base_speed = speed # Speed without any slow
+        self.status_effects = {} # (kind, source) -> [magnitude, expires_at]
+        self.frozen = False # True while a freeze or stun is active
+        self._store = None
+        self._slot = None
 
     def update_rect(self):
         """Updates the pygame.Rect object for collision detection and drawing."""
-        self.rect = self.image.get_rect(center=(self.x, self.y)) # Center the rect at (self.x, self.y)
+        self.rect.center = (self.x, self.y) # Center the rect at (self.x, self.y); moved in place, not reallocated
 
-    def move(self):
-        """Moves the enemy along its predefined path."""
+    def move(self, dt):
+        """
+        Moves the enemy along its predefined path by speed * dt pixels.
+
+        Args:
+            dt (float): Time step in seconds.
+        """
         if self.frozen: # If bloon is frozen, it does not move
             return
 
-        if self.current_path_index < len(self.path) - 1:
-            target_x, target_y = self.path[self.current_path_index + 1]
-            
-            # Calculate direction vector
-            dx = target_x - self.x
-            dy = target_y - self.y
-            dist = math.sqrt(dx**2 + dy**2)
-
-            # Check if bloon is effectively at the target point
-            if dist < self.speed: # If very close to target, jump to next point
-                self.x, self.y = target_x, target_y
-                self.current_path_index += 1
-                # If moved to a new path index, immediately update rect
-                self.update_rect() 
-            else: # Move towards the target
-                self.x += dx / dist * self.speed
-                self.y += dy / dist * self.speed
-                self.update_rect() # Update rect after every movement
+        # Advance along the path and look the new position up in the precomputed tables.
+        # Corners need no special handling: leftover distance simply carries onto the next segment.
+        self.distance_travelled = min(self.distance_travelled + self.speed * dt, self.geometry.total_length)
+        self.x, self.y, self.current_path_index = self.geometry.position_at(self.distance_travelled)
+        self.update_rect() # Update rect after every movement
 
     def take_damage(self, damage_amount):
-        """Reduces the enemy's health by the given amount."""
+        """Reduces the enemy's health by the given amount. In a crowd, only the front bloon is hit."""
         self.health -= damage_amount
 
-    def draw(self, screen):
-        """Draws the enemy on the screen."""
-        screen.blit(self.image, self.rect)
+    def take_area_damage(self, damage_amount):
+        """Damages every bloon of a crowd (explosions, ice blasts). Same as take_damage for a single bloon."""
+        self.health -= damage_amount
+        self.crowd_health -= damage_amount
 
-        # Draw Camo overlay if it's a camo bloon
-        if self.is_camo and Enemy._camo_image:
-            # Scale camo image to fit the current bloon's size
-            camo_scaled_image = pygame.transform.scale(Enemy._camo_image, (self.width, self.height))
-            camo_rect = camo_scaled_image.get_rect(center=(int(self.x), int(self.y)))
-            screen.blit(camo_scaled_image, camo_rect)
-        elif self.is_camo and not Enemy._camo_image:
-            # This print will now only occur if the file wasn't found or loading failed
-            # after the file existence check.
-            print("Warning: Camo bloon present but Camo.png failed to load, no overlay drawn.")
+    def total_health(self):
+        """Health of every bloon in this entity together (what leaking it costs the player)."""
+        return self.health + (self.count - 1) * self.crowd_health
 
+    def draw(self, screen):
+        """Draws the enemy on the screen. Returns the area drawn over (for dirty-rectangle updates)."""
+        drawn = screen.blit(self.image, self.rect) # Camo overlay included (see get_bloon_sprite)
 
         # Draw health bar (optional, for visual feedback)
         health_bar_width = self.width
@@ -154,101 +169,203 @@ class Enemy:
         # Center health bar above the bloon's image
         health_bar_x = self.x - self.width // 2
         health_bar_y = self.y - self.height // 2 - 10
-        pygame.draw.rect(screen, (255, 0, 0), (health_bar_x, health_bar_y, health_bar_width, health_bar_height)) # Red background
-        current_health_width = (self.health / self.max_health) * health_bar_width
+        health_bar = pygame.draw.rect(screen, (255, 0, 0), (health_bar_x, health_bar_y, health_bar_width, health_bar_height)) # Red background
+        # A crowd's bloons overlap; separate bloons would each draw a bar, the last one's on top
+        shown_health = self.crowd_health if self.count > 1 else self.health
+        current_health_width = (shown_health / self.max_health) * health_bar_width
         pygame.draw.rect(screen, (0, 255, 0), (health_bar_x, health_bar_y, current_health_width, health_bar_height)) # Green health
+        return drawn.union(health_bar)
 
-    def destroyed(self, enemy_list: list):
+    def split_front(self, enemy_list: list, grid=None, status_effects=None):
+        """
+        Separates the front bloon of a crowd from the rest, before a hit that affects only the
+        front one (an on-hit slow or stun). The rest become a new entity right behind it in
+        enemy_list and in the grid, where separate bloons would be, with the same effects.
+
+        Args:
+            enemy_list (list): The game's enemies.
+            grid (SpatialHash or EnemyStore, optional): Index of the enemies for the current tick.
+            status_effects (StatusEffects, optional): The game's effect queue, to copy the effects into.
+
+        Returns:
+            Enemy: The rest of the crowd, or None if this entity is a single bloon.
+        """
+        if self.count <= 1:
+            return None
+        # The rest start exactly where the front is (BLOON_CLASSES: a stored bloon's own class is its handle class)
+        rest = acquire(BLOON_CLASSES[self.bloon_type], self.path, start_distance=self.distance_travelled,
+                       is_regrowth=self.is_regrowth, is_camo=self.is_camo)
+        rest.health = self.crowd_health
+        rest.crowd_health = self.crowd_health
+        rest.count = self.count - 1
+        self.count = 1
+        if status_effects is not None:
+            status_effects.copy_effects(self, rest)
+        enemy_list.insert(enemy_list.index(self) + 1, rest)
+        if grid is not None:
+            grid.insert_after(rest, self)
+        return rest
+
+    def destroyed(self, enemy_list: list, crowds=True):
         """
         Handles the logic when an enemy is destroyed.
-        Spawns child bloons at the parent's current position and path progress.
+        Damage beyond what popped it (its health below 0) carries on into its children, layer by
+        layer, in this one call (see resolve_pop): only the bloons that survive are created, at the
+        parent's current position and path progress, with the damage they took already subtracted.
+        Children are recycled from released bloons of the same type where possible (see object_pool.py).
+
+        With crowds on, a run of identical children (same type and health, one after the other) is
+        created as one crowd entity with a count: a MOAB pops into one entity of 4 Ceramics. They sit
+        at the same spot and move in lockstep, and a run keeps the place its bloons would have had
+        in enemy_list, so every hit lands where it would have landed on separate bloons (the first
+        of them). Children that are not next to each other, like the Black, White, Black, White of
+        two Zebras, are not merged. In a crowd only the front bloon pops here, unless area damage
+        emptied the whole crowd; count is lowered by the bloons popped, and if any are left the
+        next one moves to the front and the entity stays in play.
+
+        Args:
+            enemy_list (list): The game's enemies; the children are appended to it.
+            crowds (bool, optional): Merge runs of identical children into crowds. Defaults to True.
+
+        Returns:
+            tuple: (layers popped, the popped bloons included; money they are worth)
         """
-        for BloonType in self.contains:
-            # Pass the current x, y, path index, and also the regrowth/camo properties to the child bloons
-            child_bloon = BloonType(
-                self.path, 
-                start_pos_index=self.current_path_index, 
-                start_x=self.x, 
-                start_y=self.y,
+        survivors = [] # (bloon class, health) per child, in the order separate bloons would spawn them
+        layers, money, _ = resolve_pop(self.contains, -self.health, survivors)
+        layers += 1
+        money += self.money
+        popped = 1
+        if self.count > 1 and self.crowd_health <= 0: # Area damage popped the rest of the crowd too
+            popped = self.count
+            others = self.count - 1
+            other_survivors = []
+            other_layers, other_money, _ = resolve_pop(self.contains, -self.crowd_health, other_survivors)
+            layers += others * (other_layers + 1)
+            money += others * (other_money + self.money)
+            survivors.extend(other_survivors * others)
+
+        groups = [] # [bloon class, health, count]
+        for BloonType, health in survivors:
+            if crowds and groups and groups[-1][0] is BloonType and groups[-1][1] == health:
+                groups[-1][2] += 1
+            else:
+                groups.append([BloonType, health, 1])
+
+        for BloonType, health, count in groups:
+            # Pass the current path progress, and also the regrowth/camo properties to the child bloons
+            child_bloon = acquire(
+                BloonType,
+                self.path,
+                start_distance=self.distance_travelled, # Children start exactly where the parent was
                 is_regrowth=self.is_regrowth, # Pass parent's regrowth status
                 is_camo=self.is_camo # Pass parent's camo status
             )
+            if health < child_bloon.max_health:
+                child_bloon.health = health
+                child_bloon.crowd_health = health
+            child_bloon.count = count
             enemy_list.append(child_bloon)
 
+        self.count -= popped
+        if self.count > 0:
+            self.health = self.crowd_health # The next bloon of the crowd moves to the front
+        return layers, money
+
 # Define specific enemy types inheriting from Enemy
-# (Health, Speed, Money, BloonType, Contains)
+# (Health, Speed in pixels per second, Money, BloonType, Contains)
 
 class Red(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=1, speed=1.0, money=10, bloon_type="Red", contains=[], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo)
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=1, speed=60.0, money=10, bloon_type="Red", contains=[], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance)
 
 
 class Blue(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=1, speed=1.2, money=15, bloon_type="Blue", contains=[Red], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo)
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=1, speed=72.0, money=15, bloon_type="Blue", contains=[Red], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance)
 
 
 class Green(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=1, speed=1.5, money=20, bloon_type="Green", contains=[Blue], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo)
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=1, speed=90.0, money=20, bloon_type="Green", contains=[Blue], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance)
 
 
 class Yellow(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=1, speed=1.8, money=25, bloon_type="Yellow", contains=[Green], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo)
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=1, speed=108.0, money=25, bloon_type="Yellow", contains=[Green], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance)
 
 
 class Pink(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=1, speed=2.2, money=30, bloon_type="Pink", contains=[Yellow], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo)
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=1, speed=132.0, money=30, bloon_type="Pink", contains=[Yellow], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance)
 
 
 class Black(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=2, speed=1.4, money=40, bloon_type="Black", contains=[Pink, Pink], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo) # Immune to explosion
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=2, speed=84.0, money=40, bloon_type="Black", contains=[Pink, Pink], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance) # Immune to explosion
 
 
 class White(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=2, speed=1.6, money=40, bloon_type="White", contains=[Pink, Pink], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo) # Immune to freeze
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=2, speed=96.0, money=40, bloon_type="White", contains=[Pink, Pink], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance) # Immune to freeze
 
 
 class Purple(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=1, speed=2.0, money=50, bloon_type="Purple", contains=[Pink], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo) # Immune to energy, plasma, fire
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=1, speed=120.0, money=50, bloon_type="Purple", contains=[Pink], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance) # Immune to energy, plasma, fire
 
 
 class Lead(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=2, speed=0.8, money=50, bloon_type="Lead", contains=[Red, Red], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo) # Immune to sharp
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=2, speed=48.0, money=50, bloon_type="Lead", contains=[Red, Red], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance) # Immune to sharp
 
 
 class Zebra(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=1, speed=1.8, money=60, bloon_type="Zebra", contains=[Black, White], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo)
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=1, speed=108.0, money=60, bloon_type="Zebra", contains=[Black, White], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance)
 
 
 class Rainbow(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=1, speed=2.2, money=60, bloon_type="Rainbow", contains=[Zebra, Zebra], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo)
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=1, speed=132.0, money=60, bloon_type="Rainbow", contains=[Zebra, Zebra], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance)
 
 
 class Ceramic(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
-        super().__init__(path, health=10, speed=2.5, money=100, bloon_type="Ceramic", contains=[Rainbow, Rainbow], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo)
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
+        super().reset(path, health=10, speed=150.0, money=100, bloon_type="Ceramic", contains=[Rainbow, Rainbow], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance)
 
 
 class MOAB(Enemy):
-    def __init__(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False):
+    __slots__ = ()
+
+    def reset(self, path, start_pos_index=0, start_x=None, start_y=None, is_regrowth=False, is_camo=False, start_distance=None):
         # MOABs typically don't have regrowth/camo properties in BTD6, but the base class
-        # handles the parameters. We'll set its specific size here.
-        super().__init__(path, health=200, speed=1.0, money=500, bloon_type="MOAB", contains=[Ceramic, Ceramic, Ceramic, Ceramic], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo)
-        self.width = 120 # MOAB's explicit width
-        self.height = 80 # MOAB's explicit height
-        self.image = pygame.image.load(os.path.join("bloons", "MOAB.png")).convert_alpha()
-        self.image = pygame.transform.scale(self.image, (self.width, self.height))
-        self.update_rect() # Ensure rect is updated after scaling the image
-        
+        # handles the parameters. Its specific size (120x80) comes from bloon_size().
+        super().reset(path, health=200, speed=60.0, money=500, bloon_type="MOAB", contains=[Ceramic, Ceramic, Ceramic, Ceramic], start_pos_index=start_pos_index, start_x=start_x, start_y=start_y, is_regrowth=is_regrowth, is_camo=is_camo, start_distance=start_distance)
+
     def draw(self, screen):
         # MOAB's draw method has specific rotation logic
         if self.current_path_index < len(self.path) - 1:
@@ -263,22 +380,80 @@ class MOAB(Enemy):
         rotated_image = pygame.transform.rotate(self.image, angle)
         # Get a new rect for the rotated image, centered at the bloon's position
         new_rect = rotated_image.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(rotated_image, new_rect)
-
-        # Draw Camo overlay if it's a camo MOAB (if MOABs can be camo)
-        if self.is_camo and Enemy._camo_image:
-            camo_scaled_image = pygame.transform.scale(Enemy._camo_image, (self.width, self.height))
-            camo_rect = camo_scaled_image.get_rect(center=(int(self.x), int(self.y)))
-            screen.blit(camo_scaled_image, camo_rect)
-        elif self.is_camo and not Enemy._camo_image:
-            print("Warning: Camo MOAB present but Camo.png failed to load, no overlay drawn.")
-
+        drawn = screen.blit(rotated_image, new_rect) # A camo MOAB's overlay is part of its sprite and turns with it
 
         # Draw health bar (optional, for visual feedback)
         health_bar_width = self.width
         health_bar_height = 10
         health_bar_x = self.x - self.width // 2
         health_bar_y = self.y - self.height // 2 - 20 # Position above MOAB
-        pygame.draw.rect(screen, (255, 0, 0), (health_bar_x, health_bar_y, health_bar_width, health_bar_height)) # Red background
-        current_health_width = (self.health / self.max_health) * health_bar_width
-        pygame.draw.rect(screen, (0, 255, 0), (health_bar_x, health_bar_y, current_health_width, health_bar_height)) # Green health
\ No newline at end of file
+        health_bar = pygame.draw.rect(screen, (255, 0, 0), (health_bar_x, health_bar_y, health_bar_width, health_bar_height)) # Red background
+        # A crowd's bloons overlap; separate bloons would each draw a bar, the last one's on top
+        shown_health = self.crowd_health if self.count > 1 else self.health
+        current_health_width = (shown_health / self.max_health) * health_bar_width
+        pygame.draw.rect(screen, (0, 255, 0), (health_bar_x, health_bar_y, current_health_width, health_bar_height)) # Green health
+        return drawn.union(health_bar)
+
+
+# --- Pop cascades ---
+# Per bloon class: (health, money, contains), read once from the class's reset()
+_bloon_layers = {}
+
+_PROBE_PATH = [(0, 0), (1, 0)] # Path for the throwaway bloon bloon_layer() reads a class's values from
+
+
+def bloon_layer(bloon_class):
+    """
+    Returns (health, money, contains) of a bloon class, as set by its reset(). Memoised, so the
+    values are read once per class, from a bloon built without a sprite and outside any pool.
+    """
+    layer = _bloon_layers.get(bloon_class)
+    if layer is None:
+        was_headless = is_headless()
+        set_headless(True) # The probe needs no sprite
+        try:
+            probe = bloon_class(_PROBE_PATH)
+        finally:
+            set_headless(was_headless)
+        layer = (probe.max_health, probe.money, tuple(probe.contains))
+        _bloon_layers[bloon_class] = layer
+    return layer
+
+
+def resolve_pop(contains, overflow, survivors):
+    """
+    Spends the overflow damage of a popped bloon on its children, in spawn order. The first child
+    takes the overflow; if that pops it, what is left carries on into its own children and then
+    into the next child, and so on down the layers. Once the overflow is used up, the remaining
+    children come out whole. No damage is dealt twice: a hit of 13 on a Ceramic (10 health) pops
+    the Ceramic, one Rainbow and one Zebra, and leaves a Black with 1 health.
+
+    Args:
+        contains (list of Enemy classes): Children of the popped bloon.
+        overflow (float): Damage left after the bloon's own health was used up (0 or more).
+        survivors (list): (bloon class, health left) is appended for every descendant that survives,
+            in the order the layers would have spawned them.
+
+    Returns:
+        tuple: (layers popped below the bloon, money they are worth, overflow left over)
+    """
+    layers = 0
+    money = 0
+    for child_class in contains:
+        health, child_money, child_contains = bloon_layer(child_class)
+        if overflow < health:
+            survivors.append((child_class, health - overflow))
+            overflow = 0
+            continue
+        child_layers, grandchild_money, overflow = resolve_pop(child_contains, overflow - health, survivors)
+        layers += 1 + child_layers
+        money += child_money + grandchild_money
+    return layers, money, overflow
+
+
+# Maps the bloon type names used in wave data (enemy_info) to the bloon classes
+BLOON_CLASSES = {
+    "Red": Red, "Blue": Blue, "Green": Green, "Yellow": Yellow, "Pink": Pink,
+    "Black": Black, "White": White, "Purple": Purple, "Lead": Lead,
+    "Zebra": Zebra, "Rainbow": Rainbow, "Ceramic": Ceramic, "MOAB": MOAB
+}
@@ -0,0 +1,319 @@
+# enemy_store.py
+"""
+Optional struct-of-arrays storage for bloons, used by Game(use_enemy_store=True).
+
+The hot per-bloon state (position, path progress, speed, health, flags and type) lives in
+contiguous NumPy arrays, so movement, range queries and area damage are one vectorized
+operation each instead of a Python loop over every bloon. The Enemy objects stay around as
+thin handles: once inserted, reading or writing enemy.x, enemy.health, enemy.speed, ...
+goes straight to the arrays, so towers and projectiles work unchanged.
+
+The store has the same query interface as SpatialHash (insert, remove, query_circle,
+query_segment), so it can be passed wherever a grid is accepted. Its answers come in the same
+order as the spatial hash's (by cell, then in the order the bloons were added), and popped or
+leaked bloons in enemy_list order, so which bloon a dart hits first, and the order children
+spawn in, is the same with or without the store: a game plays out exactly alike either way.
+
+The store pays off when moving the bloons is most of the work: thousands of bloons on screen
+and few towers (benchmark scenario "5000_reds_vs_5_dart_monkeys" runs about 25x faster). It is
+slower when many towers query a few hundred bloons, as in a normal game (ALL_WAVES takes about
+twice as long): every range query scans all the arrays, and every attribute a tower reads goes
+through a handle property.
+
+NumPy is optional: if it is not installed NUMPY_AVAILABLE is False and the game keeps
+using plain Enemy objects.
+"""
+import math
+
+import pygame
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from enemy import BLOON_TYPES
+from spatial_hash import DEFAULT_CELL_SIZE
+
+DEFAULT_CAPACITY = 1024 # Initial number of slots; the arrays double in size whenever they fill up
+
+# Enemy attribute -> EnemyStore array that holds it while the enemy is in a store
+STORED_FIELDS = {
+    'x': 'x',
+    'y': 'y',
+    'distance_travelled': 'distance',
+    'current_path_index': 'segment',
+    'speed': 'speed',
+    'health': 'health',
+    'crowd_health': 'crowd_health',
+    'frozen': 'frozen',
+    'is_camo': 'camo',
+    'is_regrowth': 'regrowth',
+}
+
+# Stored handle classes, one per Enemy subclass, keyed by the Enemy subclass
+_handle_classes = {}
+
+
+def _stored_property(field, array_name):
+    """Builds a property that reads and writes one slot of a store array."""
+    def getter(self):
+        value = getattr(self._store, array_name)[self._slot].item()
+        if array_name in ('health', 'crowd_health') and value.is_integer():
+            return int(value) # Keep whole health values as ints, like a plain Enemy
+        return value
+
+    def setter(self, value):
+        getattr(self._store, array_name)[self._slot] = value
+
+    return property(getter, setter)
+
+
+def _stored_rect(self):
+    """Collision/drawing rect, built from the stored position when asked for."""
+    rect = pygame.Rect(0, 0, self.width, self.height)
+    rect.center = (self.x, self.y)
+    return rect
+
+
+def _handle_class(enemy_class):
+    """
+    Returns a subclass of enemy_class whose stored fields are properties backed by the store.
+    Being a subclass, isinstance checks (e.g., against Lead) keep working on handles.
+    """
+    handle_class = _handle_classes.get(enemy_class)
+    if handle_class is None:
+        namespace = {name: _stored_property(name, array_name) for name, array_name in STORED_FIELDS.items()}
+        namespace['__slots__'] = () # Same layout as enemy_class, so instances can switch between the two
+        namespace['rect'] = property(_stored_rect)
+        namespace['update_rect'] = lambda self: None # The rect is derived on access
+        handle_class = type(enemy_class.__name__, (enemy_class,), namespace)
+        _handle_classes[enemy_class] = handle_class
+    return handle_class
+
+
+class EnemyStore:
+    """
+    Contiguous arrays holding every bloon on one path. Each stored Enemy owns one slot.
+    """
+    def __init__(self, geometry, capacity=DEFAULT_CAPACITY):
+        """
+        Args:
+            geometry (PathGeometry): The path every stored bloon follows.
+            capacity (int, optional): Initial number of slots. Defaults to DEFAULT_CAPACITY.
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("EnemyStore needs NumPy (pip install numpy)")
+        self.geometry = geometry
+
+        # Path tables as arrays. A zero direction is appended for the last waypoint, so a bloon
+        # at the end of the path (segment == last_index) stays exactly on it.
+        self.path_cumulative = np.array(geometry.cumulative, dtype=np.float64)
+        self.path_x = np.array([point[0] for point in geometry.points], dtype=np.float64)
+        self.path_y = np.array([point[1] for point in geometry.points], dtype=np.float64)
+        self.path_dir_x = np.array([d[0] for d in geometry.directions] + [0.0], dtype=np.float64)
+        self.path_dir_y = np.array([d[1] for d in geometry.directions] + [0.0], dtype=np.float64)
+
+        self.capacity = 0
+        self.size = 0 # One past the highest slot ever used; slices [:size] cover every live bloon
+        self.free_slots = [] # Released slots, reused before growing size
+        self.handles = [] # Slot -> Enemy handle (None for free slots)
+        self.next_serial = 0 # Serial number of the next bloon inserted
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """Resizes every array to the given capacity, keeping the existing slots."""
+        def resized(old, dtype):
+            new = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                new[:len(old)] = old
+            return new
+
+        self.x = resized(getattr(self, 'x', None), np.float64)
+        self.y = resized(getattr(self, 'y', None), np.float64)
+        self.distance = resized(getattr(self, 'distance', None), np.float64) # Distance travelled along the path
+        self.segment = resized(getattr(self, 'segment', None), np.int64) # Same as Enemy.current_path_index
+        self.speed = resized(getattr(self, 'speed', None), np.float64)
+        self.health = resized(getattr(self, 'health', None), np.float64)
+        self.crowd_health = resized(getattr(self, 'crowd_health', None), np.float64) # Health of the rest of a crowd
+        self.radius = resized(getattr(self, 'radius', None), np.float64)
+        self.type_id = resized(getattr(self, 'type_id', None), np.int16) # Index into enemy.BLOON_TYPES
+        self.camo = resized(getattr(self, 'camo', None), np.bool_)
+        self.regrowth = resized(getattr(self, 'regrowth', None), np.bool_)
+        self.lead = resized(getattr(self, 'lead', None), np.bool_)
+        self.frozen = resized(getattr(self, 'frozen', None), np.bool_)
+        self.alive = resized(getattr(self, 'alive', None), np.bool_) # True for slots holding a bloon
+        self.serial = resized(getattr(self, 'serial', None), np.int64) # Insertion order, the same as enemy_list order
+        self.handles.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.size - len(self.free_slots)
+
+    # --- Adding and removing bloons ---
+    def insert(self, enemy):
+        """
+        Moves a bloon's state into the store and turns the Enemy object into a handle for its slot.
+        Does nothing if the bloon is already stored.
+        """
+        if enemy._store is self:
+            return
+        if enemy.geometry is not self.geometry and enemy.geometry.points != self.geometry.points:
+            raise ValueError("EnemyStore can only hold bloons that follow its own path")
+
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(self.capacity * 2)
+            slot = self.size
+            self.size += 1
+
+        values = {name: getattr(enemy, name) for name in STORED_FIELDS}
+        self.radius[slot] = enemy.radius
+        self.type_id[slot] = BLOON_TYPES.index(enemy.bloon_type)
+        self.lead[slot] = enemy.bloon_type == "Lead"
+        self.alive[slot] = True
+        self.serial[slot] = self.next_serial
+        self.next_serial += 1
+        self.handles[slot] = enemy
+        enemy._store = self
+        enemy._slot = slot
+        enemy.__class__ = _handle_class(type(enemy))
+        for name, value in values.items():
+            setattr(enemy, name, value)
+
+    def insert_after(self, enemy, anchor):
+        """
+        Stores a bloon right after a stored one in enemy_list order (see Enemy.split_front): every
+        later bloon's serial number moves up by one to make room.
+        """
+        self.insert(enemy)
+        after = self.serial[anchor._slot]
+        n = self.size
+        later = self.alive[:n] & (self.serial[:n] > after)
+        self.serial[:n][later] += 1
+        self.serial[enemy._slot] = after + 1
+
+    def remove(self, enemy):
+        """
+        Frees a bloon's slot and turns the handle back into a plain Enemy holding its last state,
+        so projectiles and towers that still reference it read sensible values.
+        Does nothing if the bloon is not in this store.
+        """
+        if enemy._store is not self:
+            return
+        slot = enemy._slot
+        values = {name: getattr(enemy, name) for name in STORED_FIELDS}
+        enemy.__class__ = enemy.__class__.__bases__[0]
+        for name, value in values.items():
+            setattr(enemy, name, value)
+        enemy._store = None
+        enemy._slot = None
+        enemy.update_rect()
+        self.alive[slot] = False
+        self.handles[slot] = None
+        self.free_slots.append(slot)
+
+    def clear(self):
+        """Removes every bloon from the store."""
+        for enemy in self.handles[:self.size]:
+            if enemy is not None:
+                self.remove(enemy)
+        self.size = 0
+        self.free_slots = []
+
+    def rebuild(self, enemies):
+        """Makes sure every enemy in the list is stored (positions of stored bloons are always current)."""
+        for enemy in enemies:
+            self.insert(enemy)
+
+    # --- Vectorized updates ---
+    def move_all(self, dt):
+        """Moves every bloon that is not frozen by speed * dt pixels along the path."""
+        n = self.size
+        moving = self.alive[:n] & ~self.frozen[:n]
+        distance = self.distance[:n]
+        np.add(distance, self.speed[:n] * dt, out=distance, where=moving)
+        np.minimum(distance, self.geometry.total_length, out=distance)
+
+        # Same lookup as PathGeometry.position_at, for every slot at once
+        segment = np.searchsorted(self.path_cumulative, distance, side='right') - 1
+        np.clip(segment, 0, self.geometry.last_index, out=segment)
+        along = distance - self.path_cumulative[segment]
+        self.x[:n] = self.path_x[segment] + self.path_dir_x[segment] * along
+        self.y[:n] = self.path_y[segment] + self.path_dir_y[segment] * along
+        self.segment[:n] = segment
+
+    def list_order(self, slots):
+        """Sorts slots into the order their bloons have in enemy_list (the order they were inserted)."""
+        return slots[np.argsort(self.serial[slots], kind='stable')]
+
+    def grid_order(self, slots):
+        """
+        Sorts slots into the order a SpatialHash query would return their bloons in: cell by cell,
+        row by row, and in enemy_list order within a cell.
+        """
+        cell_x = np.floor_divide(self.x[slots], DEFAULT_CELL_SIZE)
+        cell_y = np.floor_divide(self.y[slots], DEFAULT_CELL_SIZE)
+        return slots[np.lexsort((self.serial[slots], cell_x, cell_y))]
+
+    def _handles_where(self, mask, order):
+        """Returns the handles of the slots where mask is True, sorted by list_order or grid_order."""
+        handles = self.handles
+        return [handles[slot] for slot in order(np.flatnonzero(mask)).tolist()]
+
+    def leaked_handles(self):
+        """Returns the bloons that reached the end of the path, in enemy_list order."""
+        n = self.size
+        return self._handles_where(self.alive[:n] & (self.segment[:n] == self.geometry.last_index), self.list_order)
+
+    def dead_handles(self):
+        """Returns the bloons whose health dropped to 0 or below, in enemy_list order."""
+        n = self.size
+        return self._handles_where(self.alive[:n] & (self.health[:n] <= 0), self.list_order)
+
+    def range_mask(self, x, y, radius):
+        """Returns a boolean array over slots [:size], True for bloons whose center is within radius of (x, y)."""
+        n = self.size
+        if math.isinf(radius):
+            return self.alive[:n].copy()
+        dx = self.x[:n] - x
+        dy = self.y[:n] - y
+        return self.alive[:n] & (dx * dx + dy * dy <= radius * radius)
+
+    def damage_in_range(self, x, y, radius, damage, can_pop_camo=False):
+        """
+        Deals damage to every bloon within radius of (x, y) in one operation (whole crowds included).
+
+        Returns:
+            int: Number of bloons hit.
+        """
+        mask = self.range_mask(x, y, radius)
+        if not can_pop_camo:
+            mask &= ~self.camo[:self.size]
+        self.health[:self.size][mask] -= damage
+        self.crowd_health[:self.size][mask] -= damage
+        return int(np.count_nonzero(mask))
+
+    # --- SpatialHash-compatible queries ---
+    def query_circle(self, x, y, radius):
+        """Returns the bloons whose center lies within radius of (x, y). radius may be float('inf')."""
+        return self._handles_where(self.range_mask(x, y, radius), self.grid_order)
+
+    def query_segment(self, x1, y1, x2, y2, radius):
+        """Returns the bloons touched by a circle of the given radius swept from (x1, y1) to (x2, y2)."""
+        n = self.size
+        seg_x = x2 - x1
+        seg_y = y2 - y1
+        length_sq = seg_x * seg_x + seg_y * seg_y
+        rel_x = self.x[:n] - x1
+        rel_y = self.y[:n] - y1
+        if length_sq > 0:
+            t = np.clip((rel_x * seg_x + rel_y * seg_y) / length_sq, 0.0, 1.0)
+            rel_x = rel_x - t * seg_x
+            rel_y = rel_y - t * seg_y
+        reach = self.radius[:n] + radius
+        return self._handles_where(self.alive[:n] & (rel_x * rel_x + rel_y * rel_y <= reach * reach), self.grid_order)
@@ -0,0 +1,499 @@
+# game.py
+import pygame
+import math
+import random
+import time
+
+from tower import TOWER_CLASSES, DartlingGunner, SniperMonkey, IceTower, BananaFarm, Tower
+from enemy_info import ALL_WAVES, path as default_path
+from spatial_hash import SpatialHash
+from path_geometry import get_path_geometry
+from enemy_store import EnemyStore, NUMPY_AVAILABLE
+from projectile_pool import ProjectilePool
+from object_pool import acquire, release
+from wave_timeline import compile_waves, SpawnScheduler
+from profiler import frame_profiler
+from placement_mask import PlacementMask
+from status_effects import StatusEffects
+
+DEFAULT_TICK_RATE = 60 # Simulation ticks per second
+MAX_FRAME_TIME = 0.25 # Longest frame (seconds) the simulation catches up on; longer stalls are dropped
+FAST_FORWARD_SPEEDS = (1, 2, 4, None) # Game seconds per real second; None runs as many ticks as the budget allows
+FAST_FORWARD_BUDGET = 0.012 # Wall-clock seconds per frame spent on ticks when fast-forwarding, so input stays responsive
+
+# --- Helper Functions for Collision ---
+def dist_point_to_segment(px, py, x1, y1, x2, y2):
+    """Calculates the shortest distance from a point to a line segment."""
+    line_vec_x, line_vec_y = x2 - x1, y2 - y1
+    line_len_sq = line_vec_x**2 + line_vec_y**2
+    if line_len_sq == 0: # Segment is a point
+        return math.sqrt((px - x1)**2 + (py - y1)**2)
+
+    # Project point onto the line defined by the segment
+    t = ((px - x1) * line_vec_x + (py - y1) * line_vec_y) / line_len_sq
+    t = max(0.0, min(1.0, t)) # Clamp t to [0, 1] to stay within the segment
+
+    closest_x = x1 + t * line_vec_x
+    closest_y = y1 + t * line_vec_y
+    return math.sqrt((px - closest_x)**2 + (py - closest_y)**2)
+
+def is_on_path(x, y, path_points, path_thickness):
+    """Checks if a point is within the path's thickness."""
+    for i in range(len(path_points) - 1):
+        p1 = path_points[i]
+        p2 = path_points[i+1]
+        if dist_point_to_segment(x, y, p1[0], p1[1], p2[0], p2[1]) <= path_thickness / 2:
+            return True
+    return False
+
+def is_overlapping_tower(new_x, new_y, new_radius, existing_towers):
+    """Checks if a proposed tower placement overlaps with any existing tower."""
+    for tower in existing_towers:
+        # Calculate distance between centers
+        dist = math.sqrt((new_x - tower.x)**2 + (new_y - tower.y)**2)
+        # Check if their circles overlap
+        # Assuming tower.radius exists and is roughly consistent with its visual size.
+        if dist < (new_radius + tower.radius):
+            return True
+    return False
+# --- End Helper Functions ---
+
+
+class Game:
+    """
+    Holds the complete state of one game (towers, bloons, money, health, wave progress)
+    and advances it. Simulation and drawing are kept apart: step() never touches a
+    display, so the same logic runs in the window and in headless runs (see headless.py).
+
+    The simulation runs on a fixed timestep: every step() advances exactly 1 / tick_rate
+    seconds, and advance() converts variable frame times into whole ticks. Given the same
+    inputs per tick, the outcome is identical whatever the render frame rate.
+    """
+    def __init__(self, waves=None, money=650, health=100, path=None, path_thickness=30, tower_radius_for_placement=25, tick_rate=DEFAULT_TICK_RATE, use_enemy_store=False, use_projectile_pool=False, use_crowds=True, seed=None):
+        """
+        Initializes a new game.
+
+        Args:
+            waves (list, optional): List of waves, each a list of spawn groups. Defaults to enemy_info.ALL_WAVES.
+            money (int, optional): Starting money. Defaults to 650.
+            health (int, optional): Starting player health. Defaults to 100.
+            path (list of tuples, optional): The path bloons follow. Defaults to enemy_info.path.
+            path_thickness (int, optional): Thickness of the path, used for placement checks. Defaults to 30.
+            tower_radius_for_placement (int, optional): Radius used for tower overlap checks. Defaults to 25.
+            tick_rate (int, optional): Simulation ticks per second. Defaults to DEFAULT_TICK_RATE (60).
+            use_enemy_store (bool, optional): Keep bloon state in NumPy arrays (see enemy_store.py) so movement
+                and range queries are vectorized. Only faster with thousands of bloons and few towers;
+                the game plays out the same either way. Defaults to False.
+            use_projectile_pool (bool, optional): Simulate straight-flying projectiles in one shared NumPy pool
+                (see projectile_pool.py) instead of one object each. Defaults to False.
+            use_crowds (bool, optional): Spawn runs of identical child bloons as one crowd entity
+                (see Enemy.destroyed), e.g. the 4 Ceramics of a MOAB. Fewer entities to move and
+                test; the game plays out the same either way. Defaults to True.
+            seed (int, optional): Seed of the game's random number stream (shrapnel directions, Dartling
+                accuracy, banana offsets). The same seed and inputs replay the same game (see replay.py).
+                Defaults to a seed drawn from the random module.
+        """
+        self.waves = waves if waves is not None else ALL_WAVES
+        self.money = money
+        self.health = health
+        self.path = path if path is not None else default_path
+        self.path_thickness = path_thickness
+        self.tower_radius_for_placement = tower_radius_for_placement
+
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed) # Every random number of the simulation comes from here; towers share it
+        self.recorder = None # ReplayRecorder logging placements, upgrades and the mouse (see replay.py)
+
+        self.tick_rate = tick_rate
+        self.tick_dt = 1.0 / tick_rate # Length of one simulation tick in seconds
+        self.tick_count = 0 # Number of ticks simulated so far
+        self.time = 0.0 # Elapsed game time in seconds (tick_count * tick_dt); drives every cooldown and spawn timer
+        self.accumulator = 0.0 # Frame time not yet consumed by whole ticks
+        self.enemy_list = [] # Active enemies
+        self.enemy_grid = SpatialHash() # Spatial hash of enemy_list, rebuilt every tick after enemies move
+        self.enemy_store = None # Array storage for the bloons when use_enemy_store is on; replaces enemy_grid
+        if use_enemy_store:
+            if NUMPY_AVAILABLE:
+                self.enemy_store = EnemyStore(get_path_geometry(self.path))
+            else:
+                print("Warning: NumPy is not installed, bloons are stored as plain objects.")
+        self.projectile_pool = None # Shared pool for straight-flying projectiles when use_projectile_pool is on
+        if use_projectile_pool:
+            if NUMPY_AVAILABLE:
+                self.projectile_pool = ProjectilePool()
+            else:
+                print("Warning: NumPy is not installed, projectiles are simulated as plain objects.")
+        self.use_crowds = use_crowds
+        self.towers = [] # Placed towers
+        self.status_effects = StatusEffects() # Expiry queue of every slow, freeze and stun, shared by the towers
+        self.placement_mask = None # Raster of valid tower positions, built on first use (see get_placement_mask)
+        self.layout_version = 0 # Bumped whenever a tower is placed or upgraded, so cached drawings of the towers can be refreshed
+        self.visual_effects = [] # Hit markers, explosions, etc. (drawn by the renderer, never by the simulation)
+
+        # Enemy spawning variables
+        self.current_wave_set_index = 0 # Index for the main list of waves
+        self.wave_timelines = compile_waves(self.waves, self.path) # Every wave as a sorted list of spawn events, compiled once
+        self.spawn_scheduler = SpawnScheduler() # Pending spawns of the current wave, by due time
+        self.wave_start_time = 0.0 # Game time the current wave started, in seconds
+        if self.wave_timelines:
+            self.spawn_scheduler.schedule(self.wave_timelines[0], self.wave_start_time)
+
+        # Statistics
+        self.pops = 0 # Bloons popped over the whole game
+        self.leaks = 0 # Bloons that reached the end of the path over the whole game
+        self.wave_pops = 0 # Bloons popped during the current wave
+        self.wave_leaks = 0 # Bloons leaked during the current wave
+        self.wave_results = [] # One dictionary per completed wave (see _finish_wave)
+
+        self.won = False # True once every wave has been cleared
+        self.lost = False # True once health drops to 0 or below
+
+    @property
+    def finished(self):
+        """True when the game has ended, either way."""
+        return self.won or self.lost
+
+    def projectile_count(self):
+        """Number of projectiles in flight, including the ones in the shared projectile pool."""
+        count = sum(len(tower.projectiles) for tower in self.towers if tower.projectiles is not None)
+        if self.projectile_pool is not None:
+            count += len(self.projectile_pool)
+        return count
+
+    # --- Placement and upgrades ---
+    def get_placement_mask(self):
+        """Returns the raster of valid tower positions (see placement_mask.py), building it the first time."""
+        if self.placement_mask is None:
+            self.placement_mask = PlacementMask(self.path, self.path_thickness, self.tower_radius_for_placement)
+            for tower in self.towers:
+                self.placement_mask.add_tower(tower)
+        return self.placement_mask
+
+    def placement_blocker(self, x, y):
+        """
+        Tells what, if anything, stops a tower from being placed at (x, y).
+
+        Returns:
+            str: "path" or "tower", or None if the spot is free.
+        """
+        mask = self.get_placement_mask()
+        if mask.covers(x, y): # Whole-pixel positions on the field: one lookup each
+            if mask.is_on_path(x, y):
+                return "path"
+            if mask.is_overlapping_tower(x, y):
+                return "tower"
+            return None
+        if is_on_path(x, y, self.path, self.path_thickness):
+            return "path"
+        if is_overlapping_tower(x, y, self.tower_radius_for_placement, self.towers):
+            return "tower"
+        return None
+
+    def is_valid_placement(self, x, y):
+        """True if a tower may be placed at (x, y) (off the path and clear of every placed tower)."""
+        return self.placement_blocker(x, y) is None
+
+    def place_tower(self, tower_type, x, y, pay=True):
+        """
+        Places a new tower if the spot is valid and (when pay is True) the player can afford it.
+        Nothing is printed when it can't be placed (headless runs try many spots); callers that
+        want to tell the player why can ask placement_blocker.
+
+        Args:
+            tower_type (str): Name of the tower as shown in the buy menu (e.g., "Dart Monkey").
+            x, y: Position of the tower.
+            pay (bool, optional): Whether the tower's price is deducted from money. Defaults to True.
+
+        Returns:
+            Tower: The placed tower, or None if it could not be placed.
+        """
+        if self.placement_blocker(x, y) is not None:
+            return None
+        tower_class = TOWER_CLASSES.get(tower_type)
+        if tower_class is None:
+            return None
+        new_tower = tower_class(x, y)
+        if pay:
+            if self.money < new_tower.price: # Check if player has enough money
+                return None
+            self.money -= new_tower.price # Deduct cost
+        new_tower.projectile_pool = self.projectile_pool
+        new_tower.status_effects = self.status_effects
+        new_tower.rng = self.rng
+        self.towers.append(new_tower)
+        self.get_placement_mask().add_tower(new_tower)
+        self.layout_version += 1
+        if self.recorder is not None:
+            self.recorder.record_placement(self.tick_count, tower_type, x, y, pay)
+        return new_tower
+
+    def upgrade_tower(self, tower, path, tier, pay=True):
+        """
+        Buys an upgrade for a placed tower if the upgrade rules allow it.
+
+        Returns:
+            bool: True if the upgrade was applied.
+        """
+        upgrade_info = tower.get_upgrade_info(path, tier)
+        if upgrade_info is None or not tower.can_upgrade(path, tier):
+            return False
+        if pay:
+            if self.money < upgrade_info["price"]:
+                return False
+            self.money -= upgrade_info["price"]
+        tower.apply_upgrade(path, tier, self.time)
+        self.layout_version += 1
+        if self.recorder is not None:
+            self.recorder.record_upgrade(self.tick_count, self.towers.index(tower), path, tier, pay)
+        return True
+
+    # --- Simulation ---
+    def advance(self, frame_time, mouse_pos=None, speed=1, budget=None):
+        """
+        Runs as many fixed ticks as fit in the real time that passed since the last frame.
+        Leftover time is kept for the next frame, and stalls longer than MAX_FRAME_TIME are dropped
+        so a slow frame never snowballs into an even slower one.
+
+        For fast-forward, speed scales the time passed (2 runs twice the ticks), and budget caps the
+        wall-clock time spent on ticks. Ticks that don't fit in the budget are dropped rather than
+        carried over, so under load the game just runs slower and the window keeps responding.
+
+        Args:
+            frame_time (float): Real time in seconds since the previous call.
+            mouse_pos (tuple, optional): Mouse position, used for every tick of this frame (see step).
+            speed (float, optional): Game seconds per real second, e.g. 2 or 4. None runs ticks until
+                the budget is used up. Defaults to 1.
+            budget (float, optional): Wall-clock seconds the ticks may take. Defaults to no limit
+                (FAST_FORWARD_BUDGET when speed is None).
+
+        Returns:
+            int: Number of ticks simulated.
+        """
+        if speed is None:
+            if budget is None:
+                budget = FAST_FORWARD_BUDGET
+            self.accumulator = float('inf') # Every tick that fits in the budget
+        else:
+            self.accumulator += min(frame_time, MAX_FRAME_TIME) * speed
+        deadline = time.perf_counter() + budget if budget is not None else None
+        ticks = 0
+        while self.accumulator >= self.tick_dt and not self.finished:
+            self.step(mouse_pos)
+            self.accumulator -= self.tick_dt
+            ticks += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                self.accumulator = min(self.accumulator, self.tick_dt) # Drop the backlog, keep at most one tick
+                break
+        if speed is None:
+            self.accumulator = 0.0
+        return ticks
+
+    def step(self, mouse_pos=None):
+        """
+        Advances the game by exactly one tick (tick_dt seconds).
+
+        Args:
+            mouse_pos (tuple, optional): Current mouse position. Dartling Gunners aim at it and Banana Farm
+                bananas are attracted to it. If None (headless), Dartling Gunners aim at the bloon furthest
+                along the track within their range and bananas are collected at their farm.
+        """
+        if self.finished:
+            return
+        if self.recorder is not None:
+            self.recorder.record_mouse(self.tick_count, mouse_pos)
+        dt = self.tick_dt
+        self.tick_count += 1
+        self.time = self.tick_count * dt # Computed from the tick count, so rounding never drifts
+        current_time = self.time
+
+        # Move enemies and handle those reaching the end
+        with frame_profiler.scope('movement'):
+            self.status_effects.expire(current_time) # Slows and freezes that ran out; speeds are restored before moving
+            store = self.enemy_store
+            if store is not None:
+                store.move_all(dt) # One vectorized update for every bloon
+                leaked = store.leaked_handles()
+            else:
+                leaked = []
+                for enemy in self.enemy_list:
+                    enemy.move(dt)
+                    if enemy.current_path_index == len(enemy.path) - 1: # Enemy reached end of path
+                        leaked.append(enemy)
+            for enemy in leaked:
+                self.health -= enemy.total_health()
+                self.leaks += enemy.count
+                self.wave_leaks += enemy.count
+                self.enemy_list.remove(enemy)
+                if store is not None:
+                    store.remove(enemy)
+                release(enemy) # Nothing refers to it any more; recycle it for a later spawn
+
+        # Spawn after moving: a bloon due during this tick is moved on by exactly the part of the
+        # tick it missed (see _update_spawning), not by that plus a whole tick's movement
+        with frame_profiler.scope('spawning'):
+            self._update_spawning(current_time)
+
+            # Index the enemies' new positions for every range query made during the rest of this tick.
+            # The enemy store answers the same queries straight from its arrays, so it needs no rebuild.
+            if store is not None:
+                grid = store
+            else:
+                grid = self.enemy_grid
+                grid.rebuild(self.enemy_list)
+
+        # Update towers (firing, abilities, etc.)
+        with frame_profiler.scope('towers'):
+            for tower in self.towers:
+                if isinstance(tower, DartlingGunner):
+                    if mouse_pos is not None:
+                        tower.fire(mouse_pos, current_time) # Dartling aims at mouse
+                    else:
+                        target = Tower.find_target(tower, self.enemy_list, grid) # Scripted aim: furthest bloon in range
+                        if target:
+                            tower.fire((target.x, target.y), current_time)
+                elif isinstance(tower, SniperMonkey):
+                    income = tower.update(self.enemy_list, current_time) # Sniper may generate income
+                    if income and income > 0:
+                        self.money += income
+                    tower.fire(self.enemy_list, current_time, self.visual_effects, grid)
+                elif isinstance(tower, IceTower):
+                    tower.update(self.enemy_list, current_time, grid) # Ice Tower has its own update for aura
+                elif isinstance(tower, BananaFarm):
+                    collect_pos = mouse_pos if mouse_pos is not None else (tower.x, tower.y)
+                    money_earned = tower.update(current_time, collect_pos, dt) # Banana Farm generates money
+                    if money_earned > 0:
+                        self.money += money_earned
+                else: # All other shooting towers
+                    tower.fire(self.enemy_list, current_time, grid)
+
+        # Clean up dead enemies and spawn children bloons (keeping the grid in sync)
+        with frame_profiler.scope('cleanup'):
+            if store is not None:
+                dead = store.dead_handles()
+            else:
+                dead = [enemy for enemy in self.enemy_list if enemy.health <= 0]
+            for enemy in dead:
+                first_child_index = len(self.enemy_list)
+                # Spawn the child bloons that survive the leftover damage (see Enemy.destroyed)
+                layers_popped, money_earned = enemy.destroyed(self.enemy_list, self.use_crowds)
+                self.money += money_earned # Player gains money for every layer destroyed
+                self.pops += layers_popped
+                self.wave_pops += layers_popped
+                for child in self.enemy_list[first_child_index:]:
+                    grid.insert(child)
+                if enemy.count > 0:
+                    continue # Bloons of its crowd are left; the entity stays in play
+                self.enemy_list.remove(enemy)
+                grid.remove(enemy)
+                release(enemy) # Released only after leaving the grid/store, so it is back to a plain Enemy
+
+        # Update projectiles for towers that manage them
+        with frame_profiler.scope('projectiles'):
+            if self.projectile_pool is not None:
+                # Every pooled projectile at once. Done first, so shrapnel that explosions add to the pool
+                # below starts flying next tick, as it does in its tower's list when there is no pool
+                self.projectile_pool.update(self.enemy_list, dt, grid)
+            for tower in self.towers:
+                if tower.projectiles is not None and tower.projectile_type is not None:
+                    tower.update_projectiles(self.enemy_list, dt, current_time, self.visual_effects, grid)
+
+        # Remove visual effects whose duration has passed
+        with frame_profiler.scope('effects'):
+            self.visual_effects = [effect for effect in self.visual_effects
+                                   if current_time - effect['creation_time'] <= effect['duration']]
+
+        # --- Game Over Condition ---
+        if self.health <= 0:
+            self.lost = True
+            self._finish_wave()
+
+    def _update_spawning(self, current_time):
+        """
+        Spawns every bloon whose spawn time has come and advances to the next wave when the current one is cleared.
+
+        Several bloons can be due in the same tick (short spawn_delay, or a long tick). A bloon that is due
+        earlier than the current time is moved forward by the time it has missed, so it appears where it
+        would be had it spawned on time and the spacing between bloons does not depend on the tick rate.
+        """
+        if self.current_wave_set_index >= len(self.waves):
+            return
+
+        for due_time, _, bloon_class, path, is_regrowth, is_camo in self.spawn_scheduler.pop_due(current_time):
+            new_enemy = acquire(bloon_class, path, is_regrowth=is_regrowth, is_camo=is_camo)
+            late_by = current_time - due_time
+            if late_by > 0:
+                new_enemy.move(late_by) # Catch up on the missed part of the tick
+            self.enemy_list.append(new_enemy)
+            if self.enemy_store is not None:
+                self.enemy_store.insert(new_enemy)
+
+        # --- Check for Wave Completion and Advance to Next Wave Set ---
+        # If every spawn of the current wave has happened
+        # AND there are no active enemies left on screen
+        if not self.spawn_scheduler and len(self.enemy_list) == 0:
+            self._finish_wave()
+            self.current_wave_set_index += 1
+            self.wave_start_time = current_time # The first group of the new wave uses this as its starting point
+
+            if self.current_wave_set_index >= len(self.waves):
+                self.won = True
+            else:
+                self.spawn_scheduler.schedule(self.wave_timelines[self.current_wave_set_index], self.wave_start_time)
+
+    def _finish_wave(self):
+        """Records the result of the current wave and resets the per-wave counters."""
+        self.wave_results.append({
+            'wave': self.current_wave_set_index,
+            'health': self.health,
+            'money': self.money,
+            'pops': self.wave_pops,
+            'leaks': self.wave_leaks,
+            'time': self.time,
+        })
+        self.wave_pops = 0
+        self.wave_leaks = 0
+
+    # --- Drawing ---
+    def draw(self, screen, dirty_rects=None, tower_bodies=True):
+        """
+        Draws enemies, towers, projectiles and visual effects. The background and HUD are drawn by the caller.
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+            dirty_rects (list, optional): If given, the area of everything drawn is appended to it
+                (for dirty-rectangle updates, see renderer.py).
+            tower_bodies (bool, optional): Whether to draw the tower bodies. False when they are already
+                part of a cached background. Defaults to True.
+
+        Returns:
+            list of pygame.Rect: The areas drawn over (dirty_rects itself, if given).
+        """
+        rects = dirty_rects if dirty_rects is not None else []
+
+        # Draw enemies
+        with frame_profiler.scope('draw_enemies'):
+            for enemy in self.enemy_list:
+                rects.append(enemy.draw(screen))
+
+        # Draw towers and the projectiles they manage
+        with frame_profiler.scope('draw_towers'):
+            for tower in self.towers:
+                # enemy_list is passed for potential range drawing
+                if tower_bodies:
+                    rects.extend(tower.draw(screen, self.enemy_list))
+                else:
+                    rects.extend(tower.draw_extras(screen, self.enemy_list))
+                if tower.projectiles:
+                    rects.extend(tower.draw_projectiles(screen))
+            if self.projectile_pool is not None:
+                rects.extend(self.projectile_pool.draw(screen))
+
+        # Draw visual effects (like hit markers and explosion rings)
+        with frame_profiler.scope('draw_effects'):
+            for effect in self.visual_effects:
+                pos = (int(effect['pos'][0]), int(effect['pos'][1]))
+                if effect['type'] == 'hit_marker':
+                    rects.append(pygame.draw.circle(screen, effect['color'], pos, effect['radius']))
+                elif effect['type'] == 'explosion':
+                    rects.append(pygame.draw.circle(screen, effect['color'], pos, effect['radius'], 2))
+        return rects
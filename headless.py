@@ -0,0 +1,125 @@
+# headless.py
+"""
+Runs games without a window: no display is created and no image is loaded.
+
+Example:
+    from headless import run_headless
+    layout = [
+        {"type": "Tack Shooter", "x": 380, "y": 230, "upgrades": {1: 2, 3: 1}},
+        {"type": "Sniper Monkey", "x": 520, "y": 380},
+    ]
+    result = run_headless(layout)
+    print(result["survived_waves"], result["health"], result["leaks"])
+"""
+import sys
+import time
+import json
+
+from sprites import set_headless
+from enemy_info import ALL_WAVES
+from game import Game, DEFAULT_TICK_RATE
+from replay import ReplayRecorder
+
+
+def build_game(layout, waves=None, money=650, health=100, tick_rate=DEFAULT_TICK_RATE, use_enemy_store=False,
+               use_projectile_pool=False, seed=None, record=False, use_crowds=True):
+    """
+    Creates a Game with the towers of a layout already placed and upgraded, free of charge.
+
+    Args:
+        layout (list of dict): Towers to place. Each entry has "type" (buy menu name, e.g. "Dart Monkey"),
+            "x", "y" and optionally "upgrades", a dict of {path: tier} applied tier by tier.
+        waves (list, optional): Waves to play. Defaults to enemy_info.ALL_WAVES.
+        money (int, optional): Starting money. Defaults to 650.
+        health (int, optional): Starting health. Defaults to 100.
+        tick_rate (int, optional): Simulation ticks per second. Defaults to game.DEFAULT_TICK_RATE.
+        use_enemy_store (bool, optional): Keep bloons in NumPy arrays (see enemy_store.py). Defaults to False.
+        use_projectile_pool (bool, optional): Simulate projectiles in a NumPy pool (see projectile_pool.py). Defaults to False.
+        seed (int, optional): Seed of the game's random number stream. Defaults to a random seed.
+        record (bool, optional): Attach a ReplayRecorder (game.recorder) before the layout is placed, so the
+            game can be saved as a replay (see replay.py). Defaults to False.
+        use_crowds (bool, optional): Spawn identical child bloons as crowds (see Enemy.destroyed). Defaults to True.
+
+    Returns:
+        tuple: (game, layout_cost), where layout_cost is what the towers and upgrades would have cost.
+    """
+    set_headless(True) # Bloons must not try to load images
+    game = Game(waves=waves, money=money, health=health, tick_rate=tick_rate, use_enemy_store=use_enemy_store,
+                use_projectile_pool=use_projectile_pool, use_crowds=use_crowds, seed=seed)
+    if record:
+        ReplayRecorder(game)
+    layout_cost = 0
+    for entry in layout:
+        tower = game.place_tower(entry["type"], entry["x"], entry["y"], pay=False)
+        if tower is None:
+            blocker = game.placement_blocker(entry["x"], entry["y"])
+            reason = f"blocked by the {blocker}" if blocker else "unknown tower type"
+            raise ValueError(f"Cannot place {entry['type']} at ({entry['x']}, {entry['y']}): {reason}")
+        layout_cost += tower.price
+        # JSON layouts have string keys, so normalise paths to ints
+        for path, tiers in sorted((int(p), t) for p, t in entry.get("upgrades", {}).items()):
+            for tier in range(1, tiers + 1):
+                upgrade_info = tower.get_upgrade_info(path, tier)
+                if not game.upgrade_tower(tower, path, tier, pay=False):
+                    raise ValueError(f"Cannot upgrade {entry['type']} path {path} to tier {tier}")
+                layout_cost += upgrade_info["price"]
+    return game, layout_cost
+
+
+def run_headless(layout, waves=None, money=650, health=100, tick_rate=DEFAULT_TICK_RATE, max_time=None, use_enemy_store=False,
+                 use_projectile_pool=False, seed=None, use_crowds=True):
+    """
+    Plays waves against a tower layout as fast as possible and reports how it went.
+
+    Args:
+        layout (list of dict): Towers to place (see build_game).
+        waves (list, optional): Waves to play, e.g. ALL_WAVES[10:20]. Defaults to enemy_info.ALL_WAVES.
+        money (int, optional): Starting money. Defaults to 650.
+        health (int, optional): Starting health. Defaults to 100.
+        tick_rate (int, optional): Simulation ticks per second. Defaults to game.DEFAULT_TICK_RATE.
+        max_time (float, optional): Stop after this much game time (seconds). Defaults to no limit.
+        use_enemy_store (bool, optional): Keep bloons in NumPy arrays (see enemy_store.py). Defaults to False.
+        use_projectile_pool (bool, optional): Simulate projectiles in a NumPy pool (see projectile_pool.py). Defaults to False.
+        seed (int, optional): Seed of the game's random number stream. Defaults to a random seed.
+        use_crowds (bool, optional): Spawn identical child bloons as crowds (see Enemy.destroyed). Defaults to True.
+
+    Returns:
+        dict: "health", "money", "pops", "leaks", "survived_waves", "won", "game_time", "wall_time",
+            "layout_cost" and "waves", a list with one dict per played wave
+            ("wave", "health", "money", "pops", "leaks", "time").
+    """
+    started = time.perf_counter()
+    game, layout_cost = build_game(layout, waves, money, health, tick_rate, use_enemy_store,
+                                   use_projectile_pool, seed, use_crowds=use_crowds)
+    while not game.finished:
+        if max_time is not None and game.time >= max_time:
+            break
+        game.step()
+
+    survived_waves = sum(1 for wave in game.wave_results if wave['health'] > 0)
+    return {
+        'health': game.health,
+        'money': game.money,
+        'pops': game.pops,
+        'leaks': game.leaks,
+        'survived_waves': survived_waves,
+        'won': game.won,
+        'game_time': game.time,
+        'wall_time': time.perf_counter() - started,
+        'layout_cost': layout_cost,
+        'waves': game.wave_results,
+    }
+
+
+if __name__ == "__main__":
+    # Usage: python headless.py layout.json [first_wave last_wave]
+    # Wave numbers are indexes into ALL_WAVES (0 = the first wave); the range is inclusive.
+    if len(sys.argv) < 2:
+        print("Usage: python headless.py layout.json [first_wave last_wave]")
+        sys.exit(1)
+    with open(sys.argv[1]) as layout_file:
+        layout = json.load(layout_file)
+    waves = ALL_WAVES
+    if len(sys.argv) >= 4:
+        waves = ALL_WAVES[int(sys.argv[2]):int(sys.argv[3]) + 1]
+    print(json.dumps(run_headless(layout, waves), indent=2))
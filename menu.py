@@ -1,17 +1,17 @@
 import pygame
 from tower import tower_menu_info, UPGRADES # Import UPGRADES for upgrade info
+from sprites import get_text_surface # Shared cache of rendered text
 
 class Menu:
     """
     Manages the game's menu system, including tower purchasing,
     wave display, money display, and tower upgrade interface.
     """
-    def __init__(self, screen, money):
+    def __init__(self, screen, game):
         self.screen = screen  # Pygame screen surface for drawing
-        self.money = money    # Player's current amount of money
+        self.game = game      # The Game whose money, wave and towers this menu shows and changes
         self.font = pygame.font.Font(None, 36)  # Standard font for text
         self.small_font = pygame.font.Font(None, 24) # Smaller font for details
-        self.current_wave = 1  # Initialize the current wave number
         self.selected_placed_tower = None  # Stores the currently selected tower on the map for upgrades
         # List of dictionaries, each representing a tower available for purchase
         self.towers_to_buy = [
@@ -26,102 +26,152 @@ class Menu:
         ]
         self.selected_tower_to_buy = None # Stores the tower type selected from the buy menu
         self.preview_tower = None # Stores data for the tower preview when placing
+        self.upgrade_buttons = [] # Buttons of the upgrade panel, for click handling
+        self.buy_menu_surface = None # Bottom buy menu, drawn once on first use
+        self.upgrade_panel_surface = None # Upgrade panel of the selected tower, as last built
+        self.upgrade_panel_state = None # What upgrade_panel_surface shows (see _upgrade_panel_state)
+
+    @property
+    def money(self):
+        """Player's current amount of money (owned by the game)."""
+        return self.game.money
+
+    @money.setter
+    def money(self, value):
+        self.game.money = value
+
+    @property
+    def current_wave(self):
+        """The current wave number, starting at 1."""
+        return self.game.current_wave_set_index + 1
 
     def draw_menu(self):
-        """Draws the main tower purchasing menu at the bottom of the screen."""
-        # Draw the main menu background (for buying new towers)
-        pygame.draw.rect(self.screen, (200, 200, 200), (0, 750, 900, 150))
-
-        # Draw each tower to buy and its price
-        for tower in self.towers_to_buy:
-            # Draw the colored rectangle representing the tower
-            pygame.draw.rect(self.screen, tower["color"], (tower["x"], tower["y"], 50, 50))
-            # Render and display the price of the tower
-            price_text = self.font.render(f"${tower['price']}", True, (0, 0, 0))
-            self.screen.blit(price_text, (tower["x"], tower["y"] + 60))
+        """
+        Draws the main tower purchasing menu at the bottom of the screen.
+        Returns the areas drawn over (for dirty-rectangle updates).
+        """
+        # The buy menu never changes, so it is drawn once into its own surface and blitted from then on
+        if self.buy_menu_surface is None:
+            self.buy_menu_surface = pygame.Surface((900, 150)).convert()
+            self.buy_menu_surface.fill((200, 200, 200)) # Main menu background (for buying new towers)
+            # Draw each tower to buy and its price
+            for tower in self.towers_to_buy:
+                # Draw the colored rectangle representing the tower
+                pygame.draw.rect(self.buy_menu_surface, tower["color"], (tower["x"], tower["y"] - 750, 50, 50))
+                # Render and display the price of the tower
+                price_text = get_text_surface(self.font, f"${tower['price']}", (0, 0, 0))
+                self.buy_menu_surface.blit(price_text, (tower["x"], tower["y"] - 750 + 60))
+        menu_rect = self.screen.blit(self.buy_menu_surface, (0, 750))
 
         # Draw the current wave number
-        wave_text = self.font.render(f"Wave: {self.current_wave}", True, (0, 0, 0))
-        self.screen.blit(wave_text, (400, 10))  # Display wave number at the top center
-
-    def increment_wave(self):
-        """Increment the current wave number."""
-        self.current_wave += 1
+        wave_text = get_text_surface(self.font, f"Wave: {self.current_wave}", (0, 0, 0))
+        wave_rect = self.screen.blit(wave_text, (400, 10))  # Display wave number at the top center
+        return [menu_rect, wave_rect]
 
 
-    def draw_upgrade_menu(self):
-        """Draws the upgrade menu for a selected placed tower on the right side of the screen."""
+    def _upgrade_panel_state(self, tower):
+        """
+        Everything the upgrade panel shows about a tower: its identity, each path's tier, the locked
+        path and which upgrades the player can afford. The panel is rebuilt only when this changes.
+        """
+        affordable = []
+        for path in range(1, 4):
+            upgrade_info = tower.get_upgrade_info(path, tower.upgrades.get(path, 0) + 1)
+            affordable.append(bool(upgrade_info) and self.money >= upgrade_info['price'])
+        return (id(tower), tuple(tower.upgrades.get(path, 0) for path in range(1, 4)),
+                tower.upgrades_locked_path, tuple(affordable))
+
+    def _build_upgrade_panel(self, upgrade_menu_rect):
+        """Draws the upgrade panel of the selected tower into upgrade_panel_surface and regenerates upgrade_buttons."""
         self.upgrade_buttons = [] # Clear previous buttons to regenerate them
+        panel = pygame.Surface(upgrade_menu_rect.size).convert()
+        local_rect = panel.get_rect()
+        # Draw a background for the upgrade menu
+        pygame.draw.rect(panel, (180, 180, 180), local_rect) # Light gray background
+        pygame.draw.rect(panel, (100, 100, 100), local_rect, 3) # Border for the menu
+
+        # Display the name of the selected tower
+        tower_name_text = get_text_surface(self.font, f"{self.selected_placed_tower.__class__.__name__}", (0, 0, 0))
+        panel.blit(tower_name_text, (10, 10))
+
+        y_offset = 50 # Initial Y offset for the first upgrade button
+        for path in range(1, 4): # Loop through upgrade paths 1, 2, 3
+            current_tier = self.selected_placed_tower.upgrades.get(path, 0) # Get current tier of the path
+            next_tier = current_tier + 1 # Determine the next tier for potential upgrade
+            # Get information for the next possible upgrade on this path
+            upgrade_info = self.selected_placed_tower.get_upgrade_info(path, next_tier)
+
+            # Define button dimensions and position (on the panel; buttons store screen coordinates)
+            button_x = 10
+            button_y = y_offset
+            button_width = 230
+            button_height = 50
+            button_rect = pygame.Rect(button_x, button_y, button_width, button_height)
+
+            button_color = (100, 100, 200) # Default button color (blueish)
+            text_color = (255, 255, 255) # Default text color (white)
+            button_text = f"Path {path}: " # Start of the button text
+
+            can_afford = False # Flag to check if player can afford the upgrade
+            if upgrade_info:
+                can_afford = self.money >= upgrade_info['price']
+
+            # Determine button text and color based on upgrade status
+            if self.selected_placed_tower.upgrades_locked_path == path:
+                button_text += "LOCKED"
+                button_color = (50, 50, 50) # Dark gray for locked path
+            elif current_tier == 3: # Max tier for an upgrade path
+                button_text += "MAXED"
+                button_color = (50, 150, 50) # Green for maxed out path
+            elif upgrade_info: # If upgrade exists and path is not locked or maxed
+                button_text += f"{upgrade_info['name']} (${upgrade_info['price']})"
+                if not can_afford:
+                    button_color = (150, 100, 100) # Reddish if not enough money
+                else:
+                    button_color = (100, 100, 200) # Default blue if affordable
+            else: # Should not happen if UPGRADES dict is complete, but for safety
+                button_text += "N/A" # Not Available
+                button_color = (70, 70, 70) # Darker gray
+
+            # Draw the upgrade button
+            pygame.draw.rect(panel, button_color, button_rect, border_radius=5)
+            pygame.draw.rect(panel, (50, 50, 50), button_rect, 2, border_radius=5) # Border for button
+
+            # Render and display the button text
+            text_surface = get_text_surface(self.small_font, button_text, text_color)
+            panel.blit(text_surface, (button_x + 5, button_y + 5))
+
+            # Display current tier of the path
+            tier_text = get_text_surface(self.small_font, f"Tier: {current_tier}", (0, 0, 0))
+            panel.blit(tier_text, (button_x + 5, button_y + 30))
+
+            # Store button data for click handling
+            self.upgrade_buttons.append({
+                "rect": button_rect.move(upgrade_menu_rect.topleft), # Pygame Rect for collision detection
+                "path": path,        # Upgrade path number
+                "tier": next_tier,   # Tier this button would upgrade to
+                "upgrade_info": upgrade_info # Full upgrade details
+            })
+            y_offset += 60 # Increment Y offset for the next button
+        self.upgrade_panel_surface = panel
 
-        if self.selected_placed_tower: # Only draw if a tower on the map is selected
-            # Draw a background for the upgrade menu
-            upgrade_menu_rect = pygame.Rect(self.screen.get_width() - 250, 0, 250, self.screen.get_height() - 150)
-            pygame.draw.rect(self.screen, (180, 180, 180), upgrade_menu_rect) # Light gray background
-            pygame.draw.rect(self.screen, (100, 100, 100), upgrade_menu_rect, 3) # Border for the menu
-
-            # Display the name of the selected tower
-            tower_name_text = self.font.render(f"{self.selected_placed_tower.__class__.__name__}", True, (0, 0, 0))
-            self.screen.blit(tower_name_text, (upgrade_menu_rect.x + 10, upgrade_menu_rect.y + 10))
-
-            y_offset = 50 # Initial Y offset for the first upgrade button
-            for path in range(1, 4): # Loop through upgrade paths 1, 2, 3
-                current_tier = self.selected_placed_tower.upgrades.get(path, 0) # Get current tier of the path
-                next_tier = current_tier + 1 # Determine the next tier for potential upgrade
-                # Get information for the next possible upgrade on this path
-                upgrade_info = self.selected_placed_tower.get_upgrade_info(path, next_tier)
-                
-                # Define button dimensions and position
-                button_x = upgrade_menu_rect.x + 10
-                button_y = upgrade_menu_rect.y + y_offset
-                button_width = 230
-                button_height = 50
-                button_rect = pygame.Rect(button_x, button_y, button_width, button_height)
-
-                button_color = (100, 100, 200) # Default button color (blueish)
-                text_color = (255, 255, 255) # Default text color (white)
-                button_text = f"Path {path}: " # Start of the button text
-
-                can_afford = False # Flag to check if player can afford the upgrade
-                if upgrade_info:
-                    can_afford = self.money >= upgrade_info['price']
-
-                # Determine button text and color based on upgrade status
-                if self.selected_placed_tower.upgrades_locked_path == path:
-                    button_text += "LOCKED"
-                    button_color = (50, 50, 50) # Dark gray for locked path
-                elif current_tier == 3: # Max tier for an upgrade path
-                    button_text += "MAXED"
-                    button_color = (50, 150, 50) # Green for maxed out path
-                elif upgrade_info: # If upgrade exists and path is not locked or maxed
-                    button_text += f"{upgrade_info['name']} (${upgrade_info['price']})"
-                    if not can_afford:
-                        button_color = (150, 100, 100) # Reddish if not enough money
-                    else:
-                        button_color = (100, 100, 200) # Default blue if affordable
-                else: # Should not happen if UPGRADES dict is complete, but for safety
-                    button_text += "N/A" # Not Available
-                    button_color = (70, 70, 70) # Darker gray
-
-                # Draw the upgrade button
-                pygame.draw.rect(self.screen, button_color, button_rect, border_radius=5)
-                pygame.draw.rect(self.screen, (50, 50, 50), button_rect, 2, border_radius=5) # Border for button
-
-                # Render and display the button text
-                text_surface = self.small_font.render(button_text, True, text_color)
-                self.screen.blit(text_surface, (button_x + 5, button_y + 5))
-                
-                # Display current tier of the path
-                tier_text = self.small_font.render(f"Tier: {current_tier}", True, (0, 0, 0))
-                self.screen.blit(tier_text, (button_x + 5, button_y + 30))
-
-                # Store button data for click handling
-                self.upgrade_buttons.append({
-                    "rect": button_rect, # Pygame Rect for collision detection
-                    "path": path,        # Upgrade path number
-                    "tier": next_tier,   # Tier this button would upgrade to
-                    "upgrade_info": upgrade_info # Full upgrade details
-                })
-                y_offset += 60 # Increment Y offset for the next button
+    def draw_upgrade_menu(self):
+        """
+        Draws the upgrade menu for a selected placed tower on the right side of the screen.
+        The panel is kept as a surface and only redrawn when the selection, a tier or what the
+        player can afford changes. Returns the areas drawn over (for dirty-rectangle updates).
+        """
+        if not self.selected_placed_tower: # Only draw if a tower on the map is selected
+            self.upgrade_buttons = []
+            self.upgrade_panel_state = None
+            return []
+
+        upgrade_menu_rect = pygame.Rect(self.screen.get_width() - 250, 0, 250, self.screen.get_height() - 150)
+        state = self._upgrade_panel_state(self.selected_placed_tower)
+        if state != self.upgrade_panel_state:
+            self._build_upgrade_panel(upgrade_menu_rect)
+            self.upgrade_panel_state = state
+        return [self.screen.blit(self.upgrade_panel_surface, upgrade_menu_rect)]
 
     def handle_click(self, mouse_pos: tuple, placed_towers: list):
         """
@@ -214,8 +264,8 @@ class Menu:
         # Check if player has enough money and if the upgrade is valid for the tower
         if self.money >= upgrade_price:
             if self.selected_placed_tower.can_upgrade(path_to_upgrade, tier_to_upgrade):
-                self.money -= upgrade_price # Deduct money
-                self.selected_placed_tower.apply_upgrade(path_to_upgrade, tier_to_upgrade) # Apply the upgrade
+                # The game deducts the money and applies the upgrade (and knows the tower's look may have changed)
+                self.game.upgrade_tower(self.selected_placed_tower, path_to_upgrade, tier_to_upgrade)
                 print(f"Upgraded {self.selected_placed_tower.__class__.__name__} to {upgrade_info['name']}")
             else:
                 # Provide feedback if upgrade is not possible
@@ -231,20 +281,27 @@ class Menu:
             print(f"Not enough money for {upgrade_info['name']}. Need ${upgrade_price - self.money} more.")
 
     def draw_money(self):
-        """Draws the player's current money on the top-right corner of the screen."""
+        """Draws the player's current money on the top-right corner of the screen. Returns the area drawn over."""
         # Render the money text
-        money_text = self.font.render(f"Money: ${int(self.money)}", True, (0, 0, 0)) # Cast to int for display
+        money_text = get_text_surface(self.font, f"Money: ${int(self.money)}", (0, 0, 0)) # Cast to int for display; rendered once per amount
         # Blit the text to the screen
-        self.screen.blit(money_text, (700, 10)) # Positioned at top-right
+        return self.screen.blit(money_text, (700, 10)) # Positioned at top-right
 
     def draw_preview(self, mouse_pos):
-        """Draws a transparent preview of the selected tower for placement at the mouse position."""
+        """
+        Draws a transparent preview of the selected tower for placement at the mouse position.
+        Returns the areas drawn over (for dirty-rectangle updates).
+        """
         if self.preview_tower: # Only draw if a tower is selected from the buy menu
-            # Create a color with alpha for transparency (original color + alpha value)
-            preview_color = (*self.preview_tower["color"], 100)  # Add transparency (100 out of 255)
+            # Create a color with alpha for transparency (original color + alpha value); red where the tower can't go
+            if self.game.is_valid_placement(mouse_pos[0], mouse_pos[1]):
+                preview_color = (*self.preview_tower["color"], 100)  # Add transparency (100 out of 255)
+            else:
+                preview_color = (255, 0, 0, 100)
             # Create a new surface for the preview to handle transparency correctly
             preview_surface = pygame.Surface((50, 50), pygame.SRCALPHA) # SRCALPHA allows per-pixel alpha
             # Draw a transparent circle representing the tower's potential placement or range
             pygame.draw.circle(preview_surface, preview_color, (25, 25), 25) # Centered in the 50x50 surface
             # Blit the preview surface to the screen, centered at the mouse cursor
-            self.screen.blit(preview_surface, (mouse_pos[0] - 25, mouse_pos[1] - 25))
\ No newline at end of file
+            return [self.screen.blit(preview_surface, (mouse_pos[0] - 25, mouse_pos[1] - 25))]
+        return []
\ No newline at end of file
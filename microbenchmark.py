@@ -0,0 +1,334 @@
+# microbenchmark.py
+"""
+Times the hot functions of the simulation one by one on synthetic populations (10 to 10,000
+bloons, towers or points), fits how their cost grows with the population and compares the
+numbers against a saved baseline. Nothing here opens a window.
+
+The growth is fitted as time ~ n^k on a log-log scale. A case whose exponent k is 1.5 or more
+is flagged as quadratic: for these functions that always means a nested loop over entities.
+
+Every report also times a fixed reference loop ("calibration_us"). Baseline times are scaled by
+how much faster or slower that loop ran, so a baseline saved on one machine (or on a busy one)
+can still be compared against.
+
+Usage:
+    python microbenchmark.py [CASE ...] [options]
+
+Options:
+    --sizes=10,100,1000,10000   Population sizes to time
+    --save-baseline=FILE        Save the results as the new baseline
+    --baseline=FILE             Compare against a baseline; cases more than 25% slower are regressions
+    --out=FILE                  Write the JSON report to FILE instead of printing it
+
+Exits with status 1 if a case is flagged as quadratic or regressed against the baseline.
+"""
+import sys
+import json
+import math
+import time
+import random
+
+import pygame
+
+from sprites import set_headless
+from enemy_info import path
+from enemy import Red, Blue, Lead, Ceramic
+from tower import DartMonkey, SniperMonkey, IceTower
+from projectiles import Projectile, CannonProjectile
+from spatial_hash import SpatialHash
+from game import is_on_path, is_overlapping_tower
+from path_geometry import get_path_geometry
+from placement_mask import PlacementMask
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+QUADRATIC_EXPONENT = 1.5 # Fitted exponents at or above this are flagged as O(n^2)
+REGRESSION_TOLERANCE = 1.25 # Slower than baseline * this counts as a regression
+MIN_TIME = 0.02 # Each measurement loops the function for at least this long (seconds)
+REPEATS = 3 # Best of this many measurements is kept
+SEED = 1234 # Populations are random, but the same on every run
+
+
+# --- Synthetic populations ---
+def _bloons(n, rng, camo_fraction=0.1):
+    """n bloons of mixed types (camo_fraction of them camo) spread over the whole path."""
+    total_length = get_path_geometry(path).total_length
+    bloon_classes = (Red, Blue, Lead, Ceramic)
+    return [rng.choice(bloon_classes)(path, start_distance=rng.uniform(0.0, total_length * 0.99),
+                                      is_camo=rng.random() < camo_fraction)
+            for _ in range(n)]
+
+
+def _grid_of(enemies):
+    """A spatial hash holding the enemies."""
+    grid = SpatialHash()
+    grid.rebuild(enemies)
+    return grid
+
+
+# --- Cases: each builds its population and returns the call to time ---
+def _case_find_target(n, rng):
+    tower = DartMonkey(450, 375)
+    enemies = _bloons(n, rng)
+    return lambda: tower.find_target(enemies)
+
+
+def _case_find_target_grid(n, rng):
+    tower = DartMonkey(450, 375)
+    enemies = _bloons(n, rng)
+    grid = _grid_of(enemies)
+    return lambda: tower.find_target(enemies, grid)
+
+
+def _case_sniper_find_target(n, rng):
+    tower = SniperMonkey(450, 375)
+    enemies = _bloons(n, rng)
+    return lambda: tower.find_target(enemies)
+
+
+def _make_dart():
+    """A dart that has just moved along a stretch with no bloons, so collision checks find nothing and scan everything."""
+    dart = Projectile(None, 880.0, 20.0, (880.0, 60.0), speed=300, damage=1, pierce=1)
+    dart.move(1.0 / 60.0)
+    return dart
+
+
+def _case_check_collision(n, rng):
+    dart = _make_dart()
+    enemies = _bloons(n, rng)
+    return lambda: dart.check_collision(enemies)
+
+
+def _case_check_collision_grid(n, rng):
+    dart = _make_dart()
+    enemies = _bloons(n, rng)
+    grid = _grid_of(enemies)
+    return lambda: dart.check_collision(enemies, grid)
+
+
+def _case_explode(n, rng):
+    shell = CannonProjectile(None, 450.0, 300.0, (460.0, 300.0), damage=1, pierce=1, aoe_radius=75)
+    enemies = _bloons(n, rng)
+    effects = []
+    def explode():
+        shell.explode(enemies, 0.0, effects)
+        effects.clear()
+    return explode
+
+
+def _case_enemy_move(n, rng):
+    enemies = _bloons(n, rng)
+    def move_all():
+        for enemy in enemies:
+            enemy.move(1.0 / 60.0)
+    return move_all
+
+
+def _case_enemy_draw(n, rng):
+    screen = pygame.Surface((900, 900))
+    enemies = _bloons(n, rng)
+    for enemy in enemies:
+        enemy.image = pygame.Surface((enemy.width, enemy.height), pygame.SRCALPHA) # Headless bloons have no sprite
+    def draw_all():
+        for enemy in enemies:
+            enemy.draw(screen)
+    return draw_all
+
+
+def _case_ice_update(n, rng):
+    tower = IceTower(450, 375)
+    enemies = _bloons(n, rng)
+    clock = [0.0]
+    def update():
+        clock[0] += tower.attack_cooldown # Blast on every call
+        tower.update(enemies, clock[0])
+    return update
+
+
+def _case_is_on_path(n, rng):
+    points = [(rng.uniform(0, 900), rng.uniform(0, 900)) for _ in range(n)]
+    def check_all():
+        for x, y in points:
+            is_on_path(x, y, path, 30)
+    return check_all
+
+
+def _case_is_overlapping_tower(n, rng):
+    towers = [DartMonkey(rng.uniform(0, 900), rng.uniform(0, 900)) for _ in range(n)]
+    return lambda: is_overlapping_tower(-100, -100, 25, towers) # A free spot: every tower is checked
+
+
+def _case_placement_mask(n, rng):
+    mask = PlacementMask(path, 30, 25)
+    points = [(rng.randrange(900), rng.randrange(750)) for _ in range(n)]
+    def check_all():
+        for x, y in points:
+            mask.is_valid(x, y)
+    return check_all
+
+
+# Case name -> (builder, what n counts)
+CASES = {
+    "Tower.find_target": (_case_find_target, "bloons"),
+    "Tower.find_target[grid]": (_case_find_target_grid, "bloons"),
+    "SniperMonkey.find_target": (_case_sniper_find_target, "bloons"),
+    "Projectile.check_collision": (_case_check_collision, "bloons"),
+    "Projectile.check_collision[grid]": (_case_check_collision_grid, "bloons"),
+    "CannonProjectile.explode": (_case_explode, "bloons"),
+    "Enemy.move": (_case_enemy_move, "bloons, all moved"),
+    "Enemy.draw": (_case_enemy_draw, "bloons, all drawn"),
+    "IceTower.update": (_case_ice_update, "bloons"),
+    "is_on_path": (_case_is_on_path, "points, all checked"),
+    "is_overlapping_tower": (_case_is_overlapping_tower, "placed towers"),
+    "PlacementMask.is_valid": (_case_placement_mask, "points, all checked"),
+}
+
+
+# --- Measuring and fitting ---
+def time_call(function, min_time=MIN_TIME, repeats=REPEATS):
+    """
+    Returns the time of one call of function() in seconds: the best of several runs, each long
+    enough (at least min_time) for the clock's resolution not to matter.
+    """
+    clock = time.perf_counter
+    loops = 1
+    while True: # Find how many calls fill min_time
+        started = clock()
+        for _ in range(loops):
+            function()
+        elapsed = clock() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    best = elapsed / loops
+    for _ in range(repeats - 1):
+        started = clock()
+        for _ in range(loops):
+            function()
+        best = min(best, (clock() - started) / loops)
+    return best
+
+
+def fit_scaling(sizes, times):
+    """
+    Fits time ~ c * n^k by least squares on log-log values. Sizes below 100 are left out when there
+    are enough larger ones, since fixed per-call overhead dominates them.
+
+    Returns:
+        dict: "exponent" (k), "complexity" (the nearest of O(1), O(n), O(n^2)) and "quadratic"
+            (True if k >= QUADRATIC_EXPONENT).
+    """
+    points = [(n, t) for n, t in zip(sizes, times) if t > 0]
+    if sum(1 for n, _ in points if n >= 100) >= 2:
+        points = [(n, t) for n, t in points if n >= 100]
+    if len(points) < 2:
+        return {'exponent': None, 'complexity': 'unknown', 'quadratic': False}
+    xs = [math.log(n) for n, _ in points]
+    ys = [math.log(t) for _, t in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    exponent = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread else 0.0
+    if exponent < 0.5:
+        complexity = 'O(1)'
+    elif exponent < QUADRATIC_EXPONENT:
+        complexity = 'O(n)'
+    else:
+        complexity = 'O(n^2)'
+    return {'exponent': exponent, 'complexity': complexity, 'quadratic': exponent >= QUADRATIC_EXPONENT}
+
+
+def run_case(name, sizes=DEFAULT_SIZES):
+    """
+    Times one case at every population size and fits its scaling.
+
+    Returns:
+        dict: "unit" (what n counts), "us_per_call" ({n: microseconds}) and the fit (see fit_scaling).
+    """
+    builder, unit = CASES[name]
+    times = []
+    for n in sizes:
+        function = builder(n, random.Random(SEED + n))
+        times.append(time_call(function))
+    report = {'unit': unit, 'us_per_call': {str(n): t * 1e6 for n, t in zip(sizes, times)}}
+    report.update(fit_scaling(sizes, times))
+    return report
+
+
+def _reference_loop():
+    """Fixed pure-Python workload (float math, attribute access, list building) used to gauge machine speed."""
+    values = []
+    total = 0.0
+    for i in range(2000):
+        total += math.sqrt(i) * 0.5
+        values.append(total)
+    return len(values)
+
+
+def calibrate():
+    """Returns the time of one _reference_loop() call in microseconds."""
+    return time_call(_reference_loop) * 1e6
+
+
+def run_cases(names=None, sizes=DEFAULT_SIZES):
+    """
+    Runs the named cases (all of them by default).
+
+    Returns:
+        dict: "calibration_us" (see calibrate) and "cases", a dict of reports keyed by case name.
+    """
+    set_headless(True) # Bloons must not try to load images
+    calibration = calibrate()
+    cases = {name: run_case(name, sizes) for name in (names or CASES)}
+    return {'calibration_us': (calibration + calibrate()) / 2, 'cases': cases} # Gauged before and after, as load may change
+
+
+def compare_to_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compares results with a baseline (both as returned by run_cases), size by size. Baseline times
+    are first scaled by the ratio of the two calibration times.
+
+    Returns:
+        list of dict: One entry per case and size that is more than tolerance times slower
+            ("case", "n", "baseline_us" (scaled), "current_us", "ratio"). Cases or sizes missing from
+            the baseline are skipped.
+    """
+    speed_factor = results['calibration_us'] / baseline['calibration_us']
+    regressions = []
+    for name, report in results['cases'].items():
+        old_times = baseline['cases'].get(name, {}).get('us_per_call', {})
+        for n, current in report['us_per_call'].items():
+            old = old_times.get(n)
+            if old is None:
+                continue
+            old *= speed_factor
+            if current > old * tolerance:
+                regressions.append({'case': name, 'n': int(n), 'baseline_us': old, 'current_us': current,
+                                    'ratio': current / old})
+    return regressions
+
+
+if __name__ == "__main__":
+    names = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--") and "=" in arg)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        print(f"Unknown case(s): {', '.join(unknown)}. Cases: {', '.join(CASES)}")
+        sys.exit(1)
+    sizes = tuple(int(size) for size in options["sizes"].split(",")) if "sizes" in options else DEFAULT_SIZES
+
+    results = run_cases(names, sizes)
+    output = dict(results)
+    output['quadratic'] = [name for name, report in results['cases'].items() if report['quadratic']]
+    if "baseline" in options:
+        with open(options["baseline"]) as baseline_file:
+            output['regressions'] = compare_to_baseline(results, json.load(baseline_file))
+    if "save-baseline" in options:
+        with open(options["save-baseline"], "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+
+    if "out" in options:
+        with open(options["out"], "w") as out_file:
+            json.dump(output, out_file, indent=2)
+    else:
+        print(json.dumps(output, indent=2))
+    sys.exit(1 if output['quadratic'] or output.get('regressions') else 0)
@@ -0,0 +1,64 @@
+# object_pool.py
+"""
+Process-wide free lists of recycled bloons and projectiles.
+
+Instead of creating a new object for every shot, shrapnel fragment or child bloon, callers
+acquire() one: a released instance of the same class is reinitialised through its reset()
+method, and a new instance is only created when the free list is empty. Objects go back with
+release() once nothing refers to them any more (expired projectiles, popped or leaked bloons).
+
+Every pooled class must accept the same arguments in __init__ and reset(), and reset() must
+set every field, since a recycled object still holds the values of its previous life.
+"""
+
+MAX_FREE_PER_CLASS = 4096 # Released objects beyond this many per class are left to the garbage collector
+
+_free_lists = {} # Class -> list of released instances of exactly that class
+
+# Counters since the last clear_pools(), for benchmarks
+_stats = {'created': 0, 'reused': 0, 'released': 0}
+
+
+def acquire(cls, *args, **kwargs):
+    """
+    Returns an instance of cls initialised with the given arguments, recycling a released one if possible.
+
+    Args:
+        cls (type): The class to instantiate (e.g., Red, TackProjectile).
+        *args, **kwargs: Arguments for cls(...) / reset(...).
+
+    Returns:
+        object: A ready-to-use instance of cls.
+    """
+    free = _free_lists.get(cls)
+    if free:
+        obj = free.pop()
+        obj.reset(*args, **kwargs)
+        _stats['reused'] += 1
+        return obj
+    _stats['created'] += 1
+    return cls(*args, **kwargs)
+
+
+def release(obj):
+    """Hands an object back for reuse. The caller must not use it afterwards, and must release it only once."""
+    free = _free_lists.get(type(obj))
+    if free is None:
+        free = _free_lists[type(obj)] = []
+    if len(free) < MAX_FREE_PER_CLASS:
+        free.append(obj)
+        _stats['released'] += 1
+
+
+def pool_stats():
+    """Returns a copy of the counters: objects created, reused and released, plus how many are waiting in free lists."""
+    stats = dict(_stats)
+    stats['free'] = sum(len(free) for free in _free_lists.values())
+    return stats
+
+
+def clear_pools():
+    """Drops every released object and resets the counters."""
+    _free_lists.clear()
+    for key in _stats:
+        _stats[key] = 0
@@ -0,0 +1,107 @@
+# path_geometry.py
+import math
+from bisect import bisect_right
+
+MAX_PATH_GEOMETRIES = 64 # Geometries kept by get_path_geometry; the least recently used is dropped beyond this
+
+# One PathGeometry per distinct path, keyed by the path's points, so every bloon on a path shares the tables
+_geometries = {} # Path points -> PathGeometry, least recently used first
+
+# The geometry returned last. Every bloon spawned on a path asks for it again, so its points are
+# compared first (against the same tuples, without building a key) before the dict is consulted.
+_last_geometry = None
+
+
+class PathGeometry:
+    """
+    Precomputed arc-length tables for a path given as a list of (x, y) waypoints.
+
+    A position on the path is described by a single number: the distance travelled from the first
+    waypoint. Bloons only store that distance, and turn it back into (x, y) with position_at.
+    """
+    def __init__(self, points):
+        """
+        Args:
+            points (list of tuples): The waypoints of the path, as (x, y) coordinates.
+        """
+        self.points = [tuple(point) for point in points]
+        self.cumulative = [0.0] # cumulative[i] = distance from the first waypoint to waypoint i
+        self.directions = [] # directions[i] = unit vector of segment i (from waypoint i to i + 1)
+        for (x1, y1), (x2, y2) in zip(self.points, self.points[1:]):
+            length = math.hypot(x2 - x1, y2 - y1)
+            self.cumulative.append(self.cumulative[-1] + length)
+            if length > 0:
+                self.directions.append(((x2 - x1) / length, (y2 - y1) / length))
+            else:
+                self.directions.append((0.0, 0.0)) # Zero-length segment: no direction
+        self.total_length = self.cumulative[-1]
+        self.last_index = len(self.points) - 1
+
+    def segment_at(self, distance):
+        """Returns the index of the segment a distance falls on (last_index once the end is reached)."""
+        if distance >= self.total_length:
+            return self.last_index
+        return max(0, bisect_right(self.cumulative, distance) - 1)
+
+    def position_at(self, distance):
+        """
+        Converts a distance travelled into a position on the path.
+
+        Args:
+            distance (float): Distance from the first waypoint, in pixels. Clamped to the path.
+
+        Returns:
+            tuple: (x, y, segment_index), where segment_index is the index of the waypoint the
+                position is past (the same meaning as Enemy.current_path_index).
+        """
+        index = self.segment_at(distance)
+        if index == self.last_index:
+            x, y = self.points[-1]
+            return x, y, index
+        x, y = self.points[index]
+        along = max(0.0, distance - self.cumulative[index])
+        dir_x, dir_y = self.directions[index]
+        return x + dir_x * along, y + dir_y * along, index
+
+    def distance_of(self, segment_index, x, y):
+        """
+        Converts a point known to lie on (or near) a segment into a distance travelled,
+        by projecting it onto that segment.
+
+        Args:
+            segment_index (int): Index of the waypoint the point is past.
+            x, y: The point to convert.
+
+        Returns:
+            float: Distance from the first waypoint, in pixels.
+        """
+        if segment_index >= self.last_index:
+            return self.total_length
+        segment_index = max(0, segment_index)
+        x1, y1 = self.points[segment_index]
+        dir_x, dir_y = self.directions[segment_index]
+        segment_length = self.cumulative[segment_index + 1] - self.cumulative[segment_index]
+        along = (x - x1) * dir_x + (y - y1) * dir_y
+        return self.cumulative[segment_index] + min(max(along, 0.0), segment_length)
+
+
+def get_path_geometry(path):
+    """
+    Returns the shared PathGeometry for a path, building it the first time the path's points are seen.
+    Paths are looked up by their points, never by the list holding them: a list changed in place
+    gets the geometry of its new points, and nothing keeps a caller's list alive.
+    Asking again for the points of the previous call allocates nothing.
+    """
+    global _last_geometry
+    last = _last_geometry
+    if last is not None and path == last.points:
+        return last
+    key = tuple(map(tuple, path))
+    geometry = _geometries.pop(key, None) # Re-inserted below, as the most recently used
+    if geometry is None:
+        geometry = PathGeometry(key)
+        if len(_geometries) >= MAX_PATH_GEOMETRIES:
+            del _geometries[next(iter(_geometries))]
+    _geometries[key] = geometry
+    _last_geometry = geometry
+    return geometry
@@ -0,0 +1,152 @@
+# placement_mask.py
+"""
+Per-pixel raster of where a tower may be placed.
+
+game.is_on_path measures the distance to every path segment and game.is_overlapping_tower
+scans every placed tower, for every click and every hovered frame. PlacementMask answers
+the same two questions for any whole-pixel position on the playing field with one lookup:
+
+    path_blocked[y * width + x]   1 if (x, y) is within path_thickness / 2 of the path
+    tower_cover[y * width + x]    number of placed towers a new tower at (x, y) would overlap
+
+The path layer is built once (vectorized when NumPy is available). Each placed tower adds its
+disc to the tower layer, and removing a tower subtracts it again, so nothing is rebuilt.
+Every pixel is tested with the same formulas as is_on_path and is_overlapping_tower, so the
+mask gives exactly their answers at whole-pixel positions. Positions that are off the field or
+fractional are not covered (see covers()) and are left to those functions.
+"""
+import math
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+FIELD_WIDTH, FIELD_HEIGHT = 900, 750 # The playing field above the buy menu
+
+
+class PlacementMask:
+    """
+    Path and tower-overlap layers over a width x height field, one byte per pixel each.
+    """
+    def __init__(self, path_points, path_thickness, tower_radius, width=FIELD_WIDTH, height=FIELD_HEIGHT):
+        """
+        Args:
+            path_points (list of tuples): The path's waypoints.
+            path_thickness (int): Thickness of the path; tower centers must stay path_thickness / 2 away from it.
+            tower_radius (int): Radius of a new tower, for overlap checks (Game.tower_radius_for_placement).
+            width, height (int, optional): Size of the field covered. Defaults to FIELD_WIDTH x FIELD_HEIGHT.
+        """
+        self.width = width
+        self.height = height
+        self.path_thickness = path_thickness
+        self.tower_radius = tower_radius
+        self.tower_cover = bytearray(width * height) # Towers never overlap, so no pixel is covered by more than a few discs
+        self.path_blocked = self._rasterize_path(path_points, path_thickness / 2)
+
+    # --- Building the layers ---
+    def _segment_box(self, x1, y1, x2, y2, reach):
+        """Pixel ranges (xs, ys) of the field within reach of a segment's bounding box."""
+        x_min = max(0, int(math.floor(min(x1, x2) - reach)))
+        x_max = min(self.width - 1, int(math.ceil(max(x1, x2) + reach)))
+        y_min = max(0, int(math.floor(min(y1, y2) - reach)))
+        y_max = min(self.height - 1, int(math.ceil(max(y1, y2) + reach)))
+        return range(x_min, x_max + 1), range(y_min, y_max + 1)
+
+    def _rasterize_path(self, path_points, half_thickness):
+        """Returns the path layer: 1 for every pixel within half_thickness of a path segment."""
+        width = self.width
+        if NUMPY_AVAILABLE:
+            grid = np.zeros((self.height, width), dtype=np.uint8)
+        else:
+            from game import dist_point_to_segment # Imported here: game imports this module
+            blocked = bytearray(width * self.height)
+        for (x1, y1), (x2, y2) in zip(path_points, path_points[1:]):
+            xs, ys = self._segment_box(x1, y1, x2, y2, half_thickness)
+            if not xs or not ys:
+                continue # Segment lies off the field
+            if NUMPY_AVAILABLE:
+                # Same arithmetic as dist_point_to_segment, for the whole box at once
+                px = np.arange(xs.start, xs.stop, dtype=np.float64)[np.newaxis, :]
+                py = np.arange(ys.start, ys.stop, dtype=np.float64)[:, np.newaxis]
+                line_x, line_y = x2 - x1, y2 - y1
+                line_len_sq = line_x ** 2 + line_y ** 2
+                if line_len_sq == 0:
+                    distance = np.sqrt((px - x1) ** 2 + (py - y1) ** 2)
+                else:
+                    t = np.clip(((px - x1) * line_x + (py - y1) * line_y) / line_len_sq, 0.0, 1.0)
+                    distance = np.sqrt((px - (x1 + t * line_x)) ** 2 + (py - (y1 + t * line_y)) ** 2)
+                grid[ys.start:ys.stop, xs.start:xs.stop] |= distance <= half_thickness
+            else:
+                for y in ys:
+                    row_start = y * width
+                    for x in xs:
+                        if dist_point_to_segment(x, y, x1, y1, x2, y2) <= half_thickness:
+                            blocked[row_start + x] = 1
+        if NUMPY_AVAILABLE:
+            return bytearray(grid.tobytes())
+        return blocked
+
+    def _tower_disc(self, tower):
+        """Yields the index of every pixel where a new tower would overlap the given one (same test as is_overlapping_tower)."""
+        reach = self.tower_radius + tower.radius
+        xs, ys = self._segment_box(tower.x, tower.y, tower.x, tower.y, reach)
+        width = self.width
+        for y in ys:
+            dy_sq = (y - tower.y) ** 2
+            for x in xs:
+                if math.sqrt((x - tower.x) ** 2 + dy_sq) < reach:
+                    yield y * width + x
+
+    def add_tower(self, tower):
+        """Marks the area a newly placed tower blocks."""
+        cover = self.tower_cover
+        for index in self._tower_disc(tower):
+            cover[index] += 1
+
+    def remove_tower(self, tower):
+        """Clears the area of a tower that was taken off the field (the tower must have been added)."""
+        cover = self.tower_cover
+        for index in self._tower_disc(tower):
+            cover[index] -= 1
+
+    # --- Queries ---
+    def covers(self, x, y):
+        """True if (x, y) is a whole-pixel position on the field, i.e., the mask can answer for it."""
+        return x == int(x) and y == int(y) and 0 <= x < self.width and 0 <= y < self.height
+
+    def is_on_path(self, x, y):
+        """Same as game.is_on_path for a covered position."""
+        return self.path_blocked[int(y) * self.width + int(x)] != 0
+
+    def is_overlapping_tower(self, x, y):
+        """Same as game.is_overlapping_tower (with every added tower) for a covered position."""
+        return self.tower_cover[int(y) * self.width + int(x)] != 0
+
+    def is_valid(self, x, y):
+        """True if a tower may be placed at the covered position (x, y)."""
+        index = int(y) * self.width + int(x)
+        return not self.path_blocked[index] and not self.tower_cover[index]
+
+    def valid_positions(self, step=1):
+        """
+        Lists every position where a tower may be placed, on a grid of the given spacing.
+
+        Args:
+            step (int, optional): Spacing of the grid in pixels; 1 lists every pixel. Defaults to 1.
+
+        Returns:
+            list of tuples: (x, y) positions, row by row.
+        """
+        width = self.width
+        path_blocked = self.path_blocked
+        tower_cover = self.tower_cover
+        positions = []
+        for y in range(0, self.height, step):
+            row_start = y * width
+            for x in range(0, width, step):
+                if not path_blocked[row_start + x] and not tower_cover[row_start + x]:
+                    positions.append((x, y))
+        return positions
@@ -0,0 +1,229 @@
+# profiler.py
+"""
+Per-frame timing of the main loop's phases, kept in a fixed-size ring buffer.
+
+Code is instrumented with named scopes:
+
+    with frame_profiler.scope('spawning'):
+        ...
+
+When the profiler is disabled (the default) a scope only checks a flag, so the instrumentation
+can stay in place. When enabled, the time spent in each phase is added to the current frame's
+row; begin_frame() and end_frame() mark frame boundaries (a frame may run several simulation
+ticks, whose times add up). The last RING_SIZE frames are kept, and can be drawn as an overlay
+(draw_overlay) or written to a CSV file (export_csv).
+"""
+import csv
+import time
+
+import pygame
+
+RING_SIZE = 600 # Frames kept (10 seconds at 60 FPS)
+
+# Instrumented phases, in the order they happen in a frame
+PHASES = [
+    'events', 'spawning', 'movement', 'towers', 'cleanup', 'projectiles', 'effects',
+    'draw_background', 'draw_enemies', 'draw_towers', 'draw_effects', 'menu', 'display',
+]
+
+# Bar colors in the overlay, one per phase
+PHASE_COLORS = {
+    'events': (200, 200, 200),
+    'spawning': (255, 220, 0),
+    'movement': (0, 160, 255),
+    'towers': (255, 80, 80),
+    'cleanup': (255, 150, 0),
+    'projectiles': (200, 0, 200),
+    'effects': (120, 60, 0),
+    'draw_background': (60, 120, 60),
+    'draw_enemies': (0, 255, 160),
+    'draw_towers': (150, 150, 255),
+    'draw_effects': (255, 180, 180),
+    'menu': (120, 120, 120),
+    'display': (40, 40, 40),
+}
+
+# Entity counts stored with every frame
+COUNTS = ['enemies', 'projectiles', 'ticks']
+
+FRAME_BUDGET_MS = 1000.0 / 60 # Drawn as a line across the overlay's bars
+
+
+class _Scope:
+    """Context manager timing one phase. One instance per phase is created up front and reused."""
+    __slots__ = ('profiler', 'phase_index', 'started')
+
+    def __init__(self, profiler, phase_index):
+        self.profiler = profiler
+        self.phase_index = phase_index
+        self.started = None
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.started is not None:
+            profiler = self.profiler
+            profiler.phase_times[profiler.index][self.phase_index] += time.perf_counter() - self.started
+            self.started = None
+        return False
+
+
+class FrameProfiler:
+    """
+    Ring buffer of per-phase frame times (in seconds) and entity counts.
+    """
+    def __init__(self, capacity=RING_SIZE):
+        """
+        Args:
+            capacity (int, optional): Number of frames kept. Defaults to RING_SIZE.
+        """
+        self.enabled = False
+        self.capacity = capacity
+        # Rows are allocated once; recording only overwrites numbers in place
+        self.phase_times = [[0.0] * len(PHASES) for _ in range(capacity)]
+        self.counts = [[0] * len(COUNTS) for _ in range(capacity)]
+        self.frame_numbers = [0] * capacity
+        self.index = 0 # Row of the frame being recorded
+        self.frames_recorded = 0 # Completed frames since the last clear()
+        self._scopes = {phase: _Scope(self, i) for i, phase in enumerate(PHASES)}
+        self._overlay_background = None # Translucent panel, created on first draw
+
+    def scope(self, phase):
+        """Returns the context manager that times the given phase (one of PHASES)."""
+        return self._scopes[phase]
+
+    def clear(self):
+        """Forgets every recorded frame."""
+        for row in self.phase_times:
+            row[:] = [0.0] * len(PHASES)
+        self.index = 0
+        self.frames_recorded = 0
+
+    def begin_frame(self):
+        """Starts a new frame: the current row is zeroed, so phase times of this frame add up from 0."""
+        if not self.enabled:
+            return
+        row = self.phase_times[self.index]
+        for i in range(len(row)):
+            row[i] = 0.0
+
+    def end_frame(self, enemies=0, projectiles=0, ticks=0):
+        """
+        Completes the current frame and moves on to the next row of the ring.
+
+        Args:
+            enemies (int, optional): Bloons on screen at the end of the frame.
+            projectiles (int, optional): Projectiles in flight at the end of the frame.
+            ticks (int, optional): Simulation ticks run during the frame.
+        """
+        if not self.enabled:
+            return
+        self.counts[self.index][:] = (enemies, projectiles, ticks)
+        self.frame_numbers[self.index] = self.frames_recorded
+        self.frames_recorded += 1
+        self.index = (self.index + 1) % self.capacity
+
+    def recent_frames(self, count=None):
+        """
+        Returns up to count completed frames, oldest first, as (frame_number, phase_times, counts) tuples.
+        Defaults to every frame in the ring.
+        """
+        available = min(self.frames_recorded, self.capacity)
+        if count is None or count > available:
+            count = available
+        rows = []
+        for back in range(count, 0, -1):
+            i = (self.index - back) % self.capacity
+            rows.append((self.frame_numbers[i], self.phase_times[i], self.counts[i]))
+        return rows
+
+    def worst_frames(self, count=3):
+        """Returns the count slowest frames in the ring, slowest first (same tuples as recent_frames)."""
+        return sorted(self.recent_frames(), key=lambda frame: sum(frame[1]), reverse=True)[:count]
+
+    def export_csv(self, file_path):
+        """
+        Writes every frame in the ring to a CSV file: frame number, total and per-phase milliseconds, then the counts.
+
+        Returns:
+            int: Number of frames written.
+        """
+        frames = self.recent_frames()
+        with open(file_path, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['frame', 'total_ms'] + [f'{phase}_ms' for phase in PHASES] + COUNTS)
+            for frame_number, times, counts in frames:
+                writer.writerow([frame_number, f'{sum(times) * 1000:.3f}'] +
+                                [f'{t * 1000:.3f}' for t in times] + list(counts))
+        return len(frames)
+
+    def draw_overlay(self, screen, font, x=590, y=40, frames_shown=150):
+        """
+        Draws the profiler panel: stacked per-phase bars for recent frames, the average time of each
+        phase, the latest entity counts and the slowest frames in the ring.
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+            font (pygame.font.Font): Small font for the labels.
+            x, y (int, optional): Top-left corner of the panel.
+            frames_shown (int, optional): Number of recent frames drawn as bars (2 pixels each).
+
+        Returns:
+            pygame.Rect: The area of the panel.
+        """
+        width, height = 300, 400
+        if self._overlay_background is None:
+            self._overlay_background = pygame.Surface((width, height), pygame.SRCALPHA)
+            self._overlay_background.fill((0, 0, 0, 170))
+        panel = screen.blit(self._overlay_background, (x, y))
+
+        # Stacked bars, newest on the right. 4 pixels per millisecond, clipped to the bar area.
+        bar_area = 100
+        bar_bottom = y + 10 + bar_area
+        pixels_per_ms = 4
+        frames = self.recent_frames(frames_shown)
+        area_top = bar_bottom - bar_area
+        bar_x = x + 10 + (frames_shown - len(frames)) * 2
+        for _, times, _ in frames:
+            top = bar_bottom
+            for phase, seconds in zip(PHASES, times):
+                bar_height = seconds * 1000 * pixels_per_ms
+                if bar_height < 0.5:
+                    continue
+                bottom = top
+                top = max(area_top, top - bar_height)
+                pygame.draw.rect(screen, PHASE_COLORS[phase], (bar_x, round(top), 2, max(1, round(bottom - top))))
+                if top <= area_top: # The frame is off the scale
+                    break
+            bar_x += 2
+        budget_y = bar_bottom - FRAME_BUDGET_MS * pixels_per_ms
+        pygame.draw.line(screen, (255, 255, 255), (x + 10, budget_y), (x + 10 + frames_shown * 2, budget_y))
+
+        # Legend with each phase's average over the frames shown
+        line_y = bar_bottom + 6
+        frame_count = max(1, len(frames))
+        for i, phase in enumerate(PHASES):
+            average_ms = sum(times[i] for _, times, _ in frames) * 1000 / frame_count
+            pygame.draw.rect(screen, PHASE_COLORS[phase], (x + 10, line_y + 3, 8, 8))
+            screen.blit(font.render(f"{phase}: {average_ms:.2f} ms", True, (255, 255, 255)), (x + 24, line_y))
+            line_y += 15
+
+        # Latest counts and the slowest frames
+        if frames:
+            _, _, counts = frames[-1]
+            text = ", ".join(f"{name} {value}" for name, value in zip(COUNTS, counts))
+            screen.blit(font.render(text, True, (255, 255, 0)), (x + 10, line_y + 4))
+        line_y += 22
+        for frame_number, times, counts in self.worst_frames(3):
+            slowest_phase = PHASES[max(range(len(PHASES)), key=times.__getitem__)]
+            text = f"#{frame_number}: {sum(times) * 1000:.1f} ms (most in {slowest_phase}, {counts[0]} bloons)"
+            screen.blit(font.render(text, True, (255, 160, 160)), (x + 10, line_y))
+            line_y += 15
+        return panel
+
+
+# The profiler shared by the game loop and Game (disabled until toggled on)
+frame_profiler = FrameProfiler()
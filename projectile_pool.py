@@ -0,0 +1,296 @@
+# projectile_pool.py
+"""
+Optional global pool for straight-flying projectiles, used by Game(use_projectile_pool=True).
+
+Darts, tacks, shrapnel, spikes, blades and crossbow bolts only fly in a straight line and lose
+pierce when they hit. The pool keeps them in NumPy arrays, so each tick every pooled projectile
+is moved, swept against the bloons and expired in a handful of vectorized operations instead
+of a Python loop per projectile and per bloon. Projectiles with extra behaviour (explosions,
+on-hit effects, homing, trails) stay in their tower's projectiles list as before.
+
+Towers hand projectiles over through Tower.add_projectile; the pool copies what it needs from
+the projectile object and the object itself is dropped.
+"""
+import math
+
+import pygame
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from enemy import Lead
+from projectiles import (Projectile, DartProjectile, TackProjectile, ShrapnelProjectile,
+                         SpikeProjectile, BladeProjectile, CrossbowProjectile)
+from sprites import get_rotated_sprite, blit_centered
+
+DEFAULT_CAPACITY = 512 # Initial number of slots; the arrays double in size whenever they fill up
+MAX_PAIRS_PER_CHUNK = 1 << 20 # Upper bound on projectile x bloon pairs tested at once, to cap memory use
+
+# Projectile classes the pool can take over (exact types, not subclasses)
+POOLED_TYPES = (Projectile, DartProjectile, TackProjectile, ShrapnelProjectile,
+                SpikeProjectile, BladeProjectile, CrossbowProjectile)
+
+
+class ProjectilePool:
+    """
+    Struct-of-arrays storage for every pooled projectile in the game, whatever tower fired it.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Args:
+            capacity (int, optional): Initial number of slots. Defaults to DEFAULT_CAPACITY.
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("ProjectilePool needs NumPy (pip install numpy)")
+        self.capacity = 0
+        self.size = 0 # One past the highest slot ever used
+        self.free_slots = [] # Released slots, reused before growing size
+        self.looks = [] # Slot -> (projectile class, look tuple) used only for drawing
+        self.owners = [] # Owner id -> tower
+        self._owner_ids = {} # Tower -> owner id
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """Resizes every array to the given capacity, keeping the existing slots."""
+        def resized(old, dtype):
+            new = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                new[:len(old)] = old
+            return new
+
+        self.x = resized(getattr(self, 'x', None), np.float64)
+        self.y = resized(getattr(self, 'y', None), np.float64)
+        self.vx = resized(getattr(self, 'vx', None), np.float64) # Velocity in pixels per second
+        self.vy = resized(getattr(self, 'vy', None), np.float64)
+        self.speed = resized(getattr(self, 'speed', None), np.float64)
+        self.radius = resized(getattr(self, 'radius', None), np.float64)
+        self.damage = resized(getattr(self, 'damage', None), np.float64)
+        self.pierce = resized(getattr(self, 'pierce', None), np.float64)
+        self.age = resized(getattr(self, 'age', None), np.float64)
+        self.lifespan = resized(getattr(self, 'lifespan', None), np.float64)
+        self.distance_traveled = resized(getattr(self, 'distance_traveled', None), np.float64)
+        self.max_distance = resized(getattr(self, 'max_distance', None), np.float64)
+        self.can_pop_lead = resized(getattr(self, 'can_pop_lead', None), np.bool_)
+        self.can_pop_camo = resized(getattr(self, 'can_pop_camo', None), np.bool_)
+        self.angle = resized(getattr(self, 'angle', None), np.float64) # Drawing rotation in degrees at age 0
+        self.spin = resized(getattr(self, 'spin', None), np.float64) # Drawing rotation speed in degrees per second
+        self.owner = resized(getattr(self, 'owner', None), np.int32) # Index into self.owners
+        self.alive = resized(getattr(self, 'alive', None), np.bool_)
+        self.looks.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.size - len(self.free_slots)
+
+    @staticmethod
+    def accepts(projectile):
+        """True if the projectile only flies straight and pops, so the pool can simulate it."""
+        return (type(projectile) in POOLED_TYPES and not projectile.on_hit_effects and
+                not projectile.homing and projectile.trail_length == 0)
+
+    def add(self, projectile):
+        """Copies a projectile into a free slot. The projectile object is not used afterwards."""
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(self.capacity * 2)
+            slot = self.size
+            self.size += 1
+
+        owner_id = self._owner_ids.get(projectile.source_tower)
+        if owner_id is None:
+            owner_id = len(self.owners)
+            self.owners.append(projectile.source_tower)
+            self._owner_ids[projectile.source_tower] = owner_id
+
+        self.x[slot] = projectile.x
+        self.y[slot] = projectile.y
+        self.vx[slot], self.vy[slot] = projectile.velocity
+        self.speed[slot] = projectile.speed
+        self.radius[slot] = projectile.radius
+        self.damage[slot] = projectile.damage
+        self.pierce[slot] = projectile.pierce
+        self.age[slot] = projectile.age
+        self.lifespan[slot] = projectile.lifespan
+        self.distance_traveled[slot] = projectile.distance_traveled
+        self.max_distance[slot] = projectile.max_distance
+        self.can_pop_lead[slot] = projectile.can_pop_lead
+        self.can_pop_camo[slot] = projectile.can_pop_camo
+        self.owner[slot] = owner_id
+        self.alive[slot] = True
+
+        # Remember how to draw it: same cached sprites as the projectile's own draw()
+        projectile_class = type(projectile)
+        if projectile_class is ShrapnelProjectile:
+            look = (projectile.w, projectile.h, projectile.color)
+        elif projectile_class in (SpikeProjectile, BladeProjectile):
+            look = (projectile.radius,)
+        elif projectile_class is CrossbowProjectile:
+            look = ()
+        else:
+            look = (projectile.color, projectile.radius)
+        self.looks[slot] = (projectile_class, look)
+        if projectile_class is CrossbowProjectile:
+            self.angle[slot] = -math.degrees(projectile.direction)
+            self.spin[slot] = 0.0
+        else:
+            self.angle[slot] = getattr(projectile, 'rotation_angle', 0.0)
+            self.spin[slot] = getattr(projectile, 'rotation_speed', 0.0)
+
+    def clear(self):
+        """Removes every projectile from the pool."""
+        self.alive[:] = False
+        self.size = 0
+        self.free_slots = []
+        self.looks = [None] * self.capacity
+
+    def count_for(self, tower):
+        """Returns how many pooled projectiles a tower currently has in flight."""
+        owner_id = self._owner_ids.get(tower)
+        if owner_id is None:
+            return 0
+        n = self.size
+        return int(np.count_nonzero(self.alive[:n] & (self.owner[:n] == owner_id)))
+
+    # --- Simulation ---
+    def _targets_in_box(self, enemies, grid, min_x, min_y, max_x, max_y):
+        """
+        Returns (targets, x, y, radius, camo, lead) for the bloons that may touch the given box.
+        targets is an index array into the EnemyStore when one is passed as the grid, otherwise a list of enemies.
+        """
+        if grid is not None and hasattr(grid, 'handles'): # EnemyStore: cull with one mask over its arrays
+            m = grid.size
+            pad = grid.radius[:m].max() if m else 0.0
+            ex = grid.x[:m]
+            ey = grid.y[:m]
+            inside = grid.alive[:m] & (ex >= min_x - pad) & (ex <= max_x + pad) & (ey >= min_y - pad) & (ey <= max_y + pad)
+            index = grid.grid_order(np.flatnonzero(inside)) # Same order as a SpatialHash query
+            return index, ex[index], ey[index], grid.radius[index], grid.camo[index], grid.lead[index]
+
+        if grid is not None: # SpatialHash: only the cells around the box
+            targets = grid.query_box(min_x, min_y, max_x, max_y)
+        else:
+            targets = enemies
+        count = len(targets)
+        return (targets,
+                np.fromiter((enemy.x for enemy in targets), np.float64, count),
+                np.fromiter((enemy.y for enemy in targets), np.float64, count),
+                np.fromiter((enemy.radius for enemy in targets), np.float64, count),
+                np.fromiter((enemy.is_camo for enemy in targets), np.bool_, count),
+                np.fromiter((isinstance(enemy, Lead) for enemy in targets), np.bool_, count))
+
+    def update(self, enemies, dt, grid=None):
+        """
+        Moves every pooled projectile, applies hits and removes expired projectiles.
+
+        Like Projectile.check_collision, each projectile tests the segment it swept this tick
+        and hits at most one bloon per tick, losing one pierce. Of several bloons touched, it hits
+        the one check_collision would: the first in the order the grid lists candidates. So a game
+        plays out exactly as it does without the pool.
+        Projectiles are tested per owning tower, against the bloons near that tower's projectiles.
+
+        Args:
+            enemies (list): Active enemies.
+            dt (float): Time step in seconds.
+            grid (optional): The game's SpatialHash or EnemyStore, used to find the bloons near each group.
+        """
+        n = self.size
+        if n == 0:
+            return
+        alive = self.alive[:n]
+        start_x = self.x[:n].copy()
+        start_y = self.y[:n].copy()
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+        self.age[:n] += dt
+        self.distance_traveled[:n] += self.speed[:n] * dt
+
+        flying = np.flatnonzero(alive & (self.pierce[:n] > 0))
+        if len(flying) and enemies:
+            # Group the flying projectiles by owner; each group is usually clustered around its tower
+            flying = flying[np.argsort(self.owner[flying], kind='stable')]
+            group_starts = np.flatnonzero(np.diff(self.owner[flying], prepend=-1))
+            for group in np.split(flying, group_starts[1:]):
+                xs = np.concatenate((start_x[group], self.x[group]))
+                ys = np.concatenate((start_y[group], self.y[group]))
+                reach = self.radius[group].max()
+                targets = self._targets_in_box(enemies, grid, xs.min() - reach, ys.min() - reach,
+                                               xs.max() + reach, ys.max() + reach)
+                if len(targets[1]) == 0:
+                    continue
+                chunk = max(1, MAX_PAIRS_PER_CHUNK // len(targets[1]))
+                for begin in range(0, len(group), chunk):
+                    self._collide(group[begin:begin + chunk], start_x, start_y, targets, grid)
+
+        expired = alive & ((self.pierce[:n] <= 0) | (self.age[:n] >= self.lifespan[:n]) |
+                           (self.distance_traveled[:n] >= self.max_distance[:n]))
+        for slot in np.flatnonzero(expired).tolist():
+            self.alive[slot] = False
+            self.looks[slot] = None
+            self.free_slots.append(slot)
+
+    def _collide(self, slots, start_x, start_y, targets, grid):
+        """Swept-circle test of some projectile slots against the candidate bloons, then applies the hits."""
+        targets, enemy_x, enemy_y, enemy_radius, enemy_camo, enemy_lead = targets
+        x1 = start_x[slots][:, None]
+        y1 = start_y[slots][:, None]
+        seg_x = self.x[slots][:, None] - x1
+        seg_y = self.y[slots][:, None] - y1
+        length_sq = seg_x * seg_x + seg_y * seg_y
+        moved = length_sq > 0 # A projectile that did not move cannot hit anything (as in check_collision)
+        safe_length_sq = np.where(moved, length_sq, 1.0)
+
+        rel_x = enemy_x[None, :] - x1
+        rel_y = enemy_y[None, :] - y1
+        t = np.clip((rel_x * seg_x + rel_y * seg_y) / safe_length_sq, 0.0, 1.0)
+        # Same arithmetic as check_collision (closest point first), so touching is decided identically
+        off_x = enemy_x[None, :] - (x1 + t * seg_x)
+        off_y = enemy_y[None, :] - (y1 + t * seg_y)
+        reach = enemy_radius[None, :] + self.radius[slots][:, None]
+        hits = (off_x * off_x + off_y * off_y <= reach * reach) & moved
+        hits &= ~(enemy_lead[None, :] & ~self.can_pop_lead[slots][:, None]) # Lead needs can_pop_lead
+        hits &= ~(enemy_camo[None, :] & ~self.can_pop_camo[slots][:, None]) # Camo needs can_pop_camo
+
+        hit_rows = np.flatnonzero(hits.any(axis=1))
+        if len(hit_rows) == 0:
+            return
+        # First bloon hit in candidate order, as in check_collision
+        first = np.argmax(hits[hit_rows], axis=1)
+        hit_slots = slots[hit_rows]
+        damage = self.damage[hit_slots]
+        self.pierce[hit_slots] -= 1
+
+        if grid is not None and hasattr(grid, 'handles'):
+            np.subtract.at(grid.health, targets[first], damage) # Enemy store: damage every hit bloon at once
+        else:
+            for target_index, amount in zip(first.tolist(), damage.tolist()):
+                if amount.is_integer():
+                    amount = int(amount) # Keep whole health values as ints
+                targets[target_index].take_damage(amount)
+
+    # --- Drawing ---
+    def draw(self, screen):
+        """
+        Draws every pooled projectile with the same look as its projectile class.
+
+        Returns:
+            list of pygame.Rect: The areas drawn over (for dirty-rectangle updates).
+        """
+        rects = []
+        for slot in np.flatnonzero(self.alive[:self.size]).tolist():
+            projectile_class, look = self.looks[slot]
+            x = self.x[slot]
+            y = self.y[slot]
+            if projectile_class in (ShrapnelProjectile, SpikeProjectile, BladeProjectile, CrossbowProjectile):
+                angle = (self.angle[slot] + self.spin[slot] * self.age[slot]) % 360
+                sprite = get_rotated_sprite(projectile_class._render_sprite, look, angle)
+                rects.append(blit_centered(screen, sprite, x, y))
+            else:
+                color, radius = look
+                rects.append(pygame.draw.circle(screen, color, (int(x), int(y)), radius))
+        return rects
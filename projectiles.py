@@ -4,8 +4,22 @@ import math
 import random
 from typing import List, Optional, Dict, Any, Tuple
 from enemy import Lead # Ensure Lead is imported if needed for specific checks
+from status_effects import apply_on_hit_effects
+from sprites import get_rotated_sprite, blit_centered
+from spatial_hash import enemies_in_range
+from object_pool import acquire
 
 class Projectile:
+    # Fields are declared up front (no per-instance __dict__): thousands of darts, tacks and
+    # shrapnel are created per wave, so smaller instances mean less allocation and GC work.
+    __slots__ = (
+        'source_tower', 'x', 'y', 'start_pos', 'target_pos', 'speed', 'damage', 'pierce', 'max_pierce',
+        'lifespan', 'age', 'distance_traveled', 'max_distance', 'can_pop_lead', 'can_pop_camo',
+        'homing', 'aoe_radius', 'turn_rate', 'color', 'radius', 'trail_length', 'trail_points',
+        'on_hit_effects', 'shrapnel_on_explode', 'shrapnel_count', 'shrapnel_damage', 'shrapnel_pierce',
+        'velocity', 'direction',
+    )
+
     def __init__(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
         """
         Base projectile class with BTD6-like properties
@@ -16,6 +30,13 @@ class Projectile:
             target_pos: Position target was at when fired (static target)
             kwargs: Any projectile property like speed, damage, pierce etc.
         """
+        self.reset(source_tower, x, y, target_pos, **kwargs)
+
+    def reset(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
+        """
+        (Re)initialises every field, so a recycled projectile (see object_pool.py) starts as good as new.
+        Subclasses extend this instead of __init__. Takes the same arguments as __init__.
+        """
         # Core properties
         self.source_tower = source_tower # MODIFIED: Keep track of the tower that fired this
         self.x = x
@@ -80,9 +101,10 @@ class Projectile:
             if len(self.trail_points) > self.trail_length:
                 self.trail_points.pop(0)
 
-    def check_collision(self, enemies: List[Any]) -> Optional[Any]:
+    def check_collision(self, enemies: List[Any], grid: Any = None) -> Optional[Any]:
         """
         Check for collision with any enemy in the provided list.
+        If a spatial hash (grid) is given, only enemies near the swept segment are tested.
         """
         line_start = self.start_pos
         line_end = (self.x, self.y)
@@ -93,6 +115,9 @@ class Projectile:
         if line_len_sq == 0:
             return None
 
+        if grid is not None:
+            enemies = grid.query_segment(line_start[0], line_start[1], line_end[0], line_end[1], self.radius)
+
         for enemy in enemies:
             if (isinstance(enemy, Lead) and not self.can_pop_lead) or \
                (enemy.is_camo and not self.can_pop_camo):
@@ -116,86 +141,111 @@ class Projectile:
 
     def draw(self, screen):
         """
-        Draw the projectile on the screen.
+        Draw the projectile on the screen. Returns the area drawn over (for dirty-rectangle updates).
         """
+        trail = None
         if self.trail_length > 0 and len(self.trail_points) > 1:
-            pygame.draw.lines(screen, self.color, False, self.trail_points, 1)
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+            trail = pygame.draw.lines(screen, self.color, False, self.trail_points, 1)
+        drawn = pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+        return drawn if trail is None else drawn.union(trail)
 
-    def apply_effects(self, enemy):
+    def apply_effects(self, enemy, current_time: float):
         """
-        Apply any configured on-hit effects to the enemy.
+        Apply any configured on-hit effects to the enemy (timed effects, see status_effects.py).
         """
-        for effect in self.on_hit_effects:
-            if effect == 'slow':
-                if not hasattr(enemy, 'original_speed'):
-                    enemy.original_speed = enemy.speed
-                enemy.speed = enemy.original_speed * 0.5
-            elif effect == 'stun':
-                enemy.stun_duration = 1.0
+        if self.on_hit_effects:
+            apply_on_hit_effects(self.source_tower.status_effects, enemy, self.on_hit_effects,
+                                 self.source_tower, current_time)
 
 # --- NEW PROJECTILE CLASS ---
 class ShrapnelProjectile(Projectile):
-    def __init__(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
+    __slots__ = ('rotation_angle', 'rotation_speed', 'w', 'h')
+
+    def reset(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
         """ A small fragment that flies out from an impact. """
-        super().__init__(source_tower, x, y, target_pos, **kwargs)
-        self.rotation_angle = random.randint(0, 359)
-        self.rotation_speed = random.randint(-180, 180)
+        super().reset(source_tower, x, y, target_pos, **kwargs)
+        rng = source_tower.rng if source_tower is not None else random # The tower's stream keeps replays exact
+        self.rotation_angle = rng.randint(0, 359)
+        self.rotation_speed = rng.randint(-180, 180)
         # Randomize the shape and color slightly for a "broken parts" look
-        self.w = random.randint(3, 6)
-        self.h = random.randint(3, 6)
-        c = random.randint(80, 120)
+        self.w = rng.randint(3, 6)
+        self.h = rng.randint(3, 6)
+        c = rng.randrange(80, 121, 10) # Grey levels in steps of 10 keep the number of cached looks small
         self.color = (c, c, c)
 
     def move(self, dt: float):
         super().move(dt)
         self.rotation_angle = (self.rotation_angle + self.rotation_speed * dt) % 360
 
+    @staticmethod
+    def _render_sprite(w, h, color):
+        """ Renders the upright fragment: a small grey square/rectangle. """
+        frag_surface = pygame.Surface((w, h), pygame.SRCALPHA)
+        frag_surface.fill(color)
+        return frag_surface
+
     def draw(self, screen):
-        """ Draws a small, rotating grey square/rectangle. """
-        frag_surface = pygame.Surface((self.w, self.h), pygame.SRCALPHA)
-        frag_surface.fill(self.color)
-        rotated_surface = pygame.transform.rotate(frag_surface, self.rotation_angle)
-        new_rect = rotated_surface.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(rotated_surface, new_rect)
+        """ Draws a small, rotating grey square/rectangle using the shared rotation cache. """
+        sprite = get_rotated_sprite(self._render_sprite, (self.w, self.h, self.color), self.rotation_angle)
+        return blit_centered(screen, sprite, self.x, self.y)
 
 class DartProjectile(Projectile):
+    __slots__ = ()
+
     def __init__(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
         super().__init__(source_tower, x, y, target_pos, **kwargs)
 
 class TackProjectile(Projectile):
+    __slots__ = ()
+
     def __init__(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
         super().__init__(source_tower, x, y, target_pos, **kwargs)
 
 class CannonProjectile(Projectile):
-    def __init__(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
-        super().__init__(source_tower, x, y, target_pos, **kwargs)
+    __slots__ = ('explosion_radius',)
+
+    def reset(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
+        super().reset(source_tower, x, y, target_pos, **kwargs)
         self.explosion_radius = kwargs.get('explosion_radius', 80)
 
     def move(self, dt: float):
         super().move(dt)
 
-    def explode(self, screen, enemies: List[Any]):
-        """ Handles the AOE explosion and now also spawns shrapnel if upgraded. """
+    def explode(self, enemies: List[Any], current_time: float, effects_list: list, grid: Any = None):
+        """
+        Handles the AOE explosion and now also spawns shrapnel if upgraded.
+        Uses the spatial hash (grid) to find bloons in the blast when one is given.
+        The explosion ring is not drawn here; it is queued in effects_list for the renderer.
+        """
         if self.aoe_radius > 0:
-            pygame.draw.circle(screen, (255, 165, 0), (int(self.x), int(self.y)), self.explosion_radius, 2)
-            for enemy in enemies:
-                dist = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-                if dist <= self.aoe_radius:
+            effects_list.append({
+                'type': 'explosion',
+                'pos': (self.x, self.y),
+                'color': (255, 165, 0),
+                'radius': self.explosion_radius,
+                'creation_time': current_time,
+                'duration': 0.0 # Shown for a single frame
+            })
+            if not self.on_hit_effects and hasattr(grid, 'damage_in_range'):
+                # The enemy store damages the whole blast in one vectorized operation
+                grid.damage_in_range(self.x, self.y, self.aoe_radius, self.damage, self.can_pop_camo)
+            else:
+                for enemy in enemies_in_range(enemies, self.x, self.y, self.aoe_radius, grid):
                     if enemy.is_camo and not self.can_pop_camo:
                         continue
-                    enemy.take_damage(self.damage)
-                    self.apply_effects(enemy)
+                    enemy.take_area_damage(self.damage) # The blast hits every bloon of a crowd
+                    self.apply_effects(enemy, current_time)
         
         # --- FIXED: Spawn shrapnel from explosion ---
         if self.shrapnel_on_explode and self.shrapnel_count > 0:
             for _ in range(self.shrapnel_count):
-                angle = random.uniform(0, 2 * math.pi)
+                angle = self.source_tower.rng.uniform(0, 2 * math.pi)
                 # Define a target point for the shrapnel to fly towards
                 shrapnel_target_x = self.x + math.cos(angle) * 100
                 shrapnel_target_y = self.y + math.sin(angle) * 100
                 
-                shrapnel = ShrapnelProjectile(
+                shrapnel = acquire(
+                    ShrapnelProjectile,
                     self.source_tower,
                     self.x, self.y,
                     (shrapnel_target_x, shrapnel_target_y),
@@ -204,10 +254,17 @@ class CannonProjectile(Projectile):
                     speed=250, # Shrapnel has its own speed
                     lifespan=0.5 # And lifespan
                 )
-                self.source_tower.projectiles.append(shrapnel)
+                self.source_tower.add_projectile(shrapnel)
 
 class HitscanProjectile:
+    __slots__ = ('source', 'target', 'damage', 'can_pop_lead', 'can_pop_camo', 'on_hit_effects',
+                 'hit_line_color', 'shrapnel_count', 'shrapnel_damage', 'shrapnel_pierce')
+
     def __init__(self, source: Any, target: Any, **kwargs):
+        self.reset(source, target, **kwargs)
+
+    def reset(self, source: Any, target: Any, **kwargs):
+        """ (Re)initialises every field; see Projectile.reset. """
         self.source = source
         self.target = target
         self.damage = kwargs.get('damage', 1)
@@ -220,7 +277,7 @@ class HitscanProjectile:
         self.shrapnel_damage = kwargs.get('shrapnel_damage', 0)
         self.shrapnel_pierce = kwargs.get('shrapnel_pierce', 0)
 
-    def apply_hit(self, screen: pygame.Surface, effects_list: list):
+    def apply_hit(self, current_time: float, effects_list: list):
         """ Immediately apply damage, effects, and now SPAWNS SHRAPNEL. """
         if self.target:
             can_damage_target = True
@@ -230,27 +287,28 @@ class HitscanProjectile:
 
             if can_damage_target:
                 self.target.take_damage(self.damage)
-                for effect in self.on_hit_effects:
-                    # (effect logic remains the same)
-                    pass
+                if self.on_hit_effects:
+                    apply_on_hit_effects(self.source.status_effects, self.target, self.on_hit_effects,
+                                         self.source, current_time)
                 
                 effects_list.append({
                     'type': 'hit_marker',
                     'pos': (self.target.x, self.target.y),
                     'color': (255, 255, 0),
                     'radius': 3,
-                    'creation_time': pygame.time.get_ticks() / 1000.0,
+                    'creation_time': current_time,
                     'duration': 0.15
                 })
 
                 # --- FIXED: Spawn shrapnel on hit ---
                 if self.shrapnel_count > 0:
                     for _ in range(self.shrapnel_count):
-                        angle = random.uniform(0, 2 * math.pi)
+                        angle = self.source.rng.uniform(0, 2 * math.pi)
                         shrapnel_target_x = self.target.x + math.cos(angle) * 100
                         shrapnel_target_y = self.target.y + math.sin(angle) * 100
                         
-                        shrapnel = ShrapnelProjectile(
+                        shrapnel = acquire(
+                            ShrapnelProjectile,
                             self.source, # The source tower
                             self.target.x, self.target.y, # Start from the hit bloon
                             (shrapnel_target_x, shrapnel_target_y),
@@ -259,12 +317,14 @@ class HitscanProjectile:
                             speed=250,
                             lifespan=0.5
                         )
-                        # Add shrapnel to its tower's main projectile list to be updated and drawn
-                        self.source.projectiles.append(shrapnel)
+                        # Hand the shrapnel to its tower to be updated and drawn
+                        self.source.add_projectile(shrapnel)
 
 class SpikeProjectile(Projectile):
-    def __init__(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
-        super().__init__(source_tower, x, y, target_pos, **kwargs)
+    __slots__ = ('rotation_angle', 'rotation_speed')
+
+    def reset(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
+        super().reset(source_tower, x, y, target_pos, **kwargs)
         self.radius = kwargs.get('radius', 15)
         self.color = kwargs.get('color', (100, 50, 0))
         self.pierce = kwargs.get('pierce', 22)
@@ -275,28 +335,34 @@ class SpikeProjectile(Projectile):
         super().move(dt)
         self.rotation_angle = (self.rotation_angle + self.rotation_speed * dt) % 360
 
-    def draw(self, screen):
-        size = self.radius * 2
+    @staticmethod
+    def _render_sprite(radius):
+        """ Renders the upright spike ball: a grey disc with 8 spikes around it. """
+        size = radius * 2
         spike_surface = pygame.Surface((size, size), pygame.SRCALPHA)
-        center = (self.radius, self.radius)
-        pygame.draw.circle(spike_surface, (128, 128, 128), center, self.radius * 0.7)
-        pygame.draw.circle(spike_surface, (80, 80, 80), center, self.radius * 0.7, 1)
+        center = (radius, radius)
+        pygame.draw.circle(spike_surface, (128, 128, 128), center, radius * 0.7)
+        pygame.draw.circle(spike_surface, (80, 80, 80), center, radius * 0.7, 1)
         num_spikes = 8
         for i in range(num_spikes):
             angle = (i / num_spikes) * 2 * math.pi
-            outer_point = (center[0] + self.radius * math.cos(angle), center[1] + self.radius * math.sin(angle))
+            outer_point = (center[0] + radius * math.cos(angle), center[1] + radius * math.sin(angle))
             angle_left, angle_right = angle - 0.2, angle + 0.2
-            inner_base_l = (center[0] + self.radius * 0.6 * math.cos(angle_left), center[1] + self.radius * 0.6 * math.sin(angle_left))
-            inner_base_r = (center[0] + self.radius * 0.6 * math.cos(angle_right), center[1] + self.radius * 0.6 * math.sin(angle_right))
+            inner_base_l = (center[0] + radius * 0.6 * math.cos(angle_left), center[1] + radius * 0.6 * math.sin(angle_left))
+            inner_base_r = (center[0] + radius * 0.6 * math.cos(angle_right), center[1] + radius * 0.6 * math.sin(angle_right))
             pygame.draw.polygon(spike_surface, (128, 128, 128), [outer_point, inner_base_l, inner_base_r])
             pygame.draw.polygon(spike_surface, (80, 80, 80), [outer_point, inner_base_l, inner_base_r], 1)
-        rotated_surface = pygame.transform.rotate(spike_surface, self.rotation_angle)
-        new_rect = rotated_surface.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(rotated_surface, new_rect)
+        return spike_surface
+
+    def draw(self, screen):
+        sprite = get_rotated_sprite(self._render_sprite, (self.radius,), self.rotation_angle)
+        return blit_centered(screen, sprite, self.x, self.y)
 
 class CrossbowProjectile(Projectile):
-    def __init__(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
-        super().__init__(source_tower, x, y, target_pos, **kwargs)
+    __slots__ = ()
+
+    def reset(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
+        super().reset(source_tower, x, y, target_pos, **kwargs)
         self.speed = kwargs.get('speed', 400)
         self.damage = kwargs.get('damage', 3)
         self.pierce = kwargs.get('pierce', 4)
@@ -305,7 +371,9 @@ class CrossbowProjectile(Projectile):
         self.color = kwargs.get('color', (50, 50, 50))
         self.radius = kwargs.get('radius', 6)
 
-    def draw(self, screen):
+    @staticmethod
+    def _render_sprite():
+        """ Renders the upright (pointing right) crossbow bolt. """
         bolt_len, bolt_width, center_y = 20, 4, 10
         bolt_surface = pygame.Surface((bolt_len, bolt_len), pygame.SRCALPHA)
         shaft_color = (80, 54, 41)
@@ -315,14 +383,18 @@ class CrossbowProjectile(Projectile):
         pygame.draw.polygon(bolt_surface, head_color, head_points)
         pygame.draw.line(bolt_surface, shaft_color, (0, center_y-2), (4, center_y-4), 2)
         pygame.draw.line(bolt_surface, shaft_color, (0, center_y+2), (4, center_y+4), 2)
+        return bolt_surface
+
+    def draw(self, screen):
         angle = -math.degrees(self.direction)
-        rotated_surface = pygame.transform.rotate(bolt_surface, angle)
-        new_rect = rotated_surface.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(rotated_surface, new_rect)
+        sprite = get_rotated_sprite(self._render_sprite, (), angle)
+        return blit_centered(screen, sprite, self.x, self.y)
 
 class BladeProjectile(Projectile):
-    def __init__(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
-        super().__init__(source_tower, x, y, target_pos, **kwargs)
+    __slots__ = ('rotation_angle', 'rotation_speed')
+
+    def reset(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
+        super().reset(source_tower, x, y, target_pos, **kwargs)
         self.radius = kwargs.get('radius', 8)
         self.color = kwargs.get('color', (150, 150, 150))
         self.pierce = kwargs.get('pierce', 6)
@@ -333,8 +405,10 @@ class BladeProjectile(Projectile):
         super().move(dt)
         self.rotation_angle = (self.rotation_angle + self.rotation_speed * dt) % 360
 
-    def draw(self, screen):
-        size, center = self.radius * 2.5, self.radius * 1.25
+    @staticmethod
+    def _render_sprite(radius):
+        """ Renders the upright blade: two crossed grey bars. """
+        size, center = radius * 2.5, radius * 1.25
         blade_surface = pygame.Surface((size, size), pygame.SRCALPHA)
         blade_color, blade_outline = (192, 192, 192), (105, 105, 105)
         blade1_rect, blade2_rect = pygame.Rect(0, center - 2, size, 4), pygame.Rect(center - 2, 0, 4, size)
@@ -342,20 +416,26 @@ class BladeProjectile(Projectile):
         pygame.draw.rect(blade_surface, blade_color, blade2_rect)
         pygame.draw.rect(blade_surface, blade_outline, blade1_rect, 1)
         pygame.draw.rect(blade_surface, blade_outline, blade2_rect, 1)
-        rotated_surface = pygame.transform.rotate(blade_surface, self.rotation_angle)
-        new_rect = rotated_surface.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(rotated_surface, new_rect)
+        return blade_surface
+
+    def draw(self, screen):
+        sprite = get_rotated_sprite(self._render_sprite, (self.radius,), self.rotation_angle)
+        return blit_centered(screen, sprite, self.x, self.y)
 
 class RocketProjectile(Projectile):
-    def __init__(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
-        super().__init__(source_tower, x, y, target_pos, **kwargs)
+    __slots__ = ()
+
+    def reset(self, source_tower: Any, x: float, y: float, target_pos: Tuple[float, float], **kwargs):
+        super().reset(source_tower, x, y, target_pos, **kwargs)
         self.aoe_radius = kwargs.get('aoe_radius', 25)
         self.damage = kwargs.get('damage', 2)
         self.color = kwargs.get('color', (200, 50, 0))
         self.radius = kwargs.get('radius', 8)
         self.trail_length = kwargs.get('trail_length', 10)
 
-    def draw(self, screen):
+    @staticmethod
+    def _render_sprite():
+        """ Renders the upright (pointing right) rocket. """
         acid_green, black = (124, 252, 0), (0, 0, 0)
         rocket_len, rocket_h = 20, 12
         rocket_surface = pygame.Surface((rocket_len, rocket_h), pygame.SRCALPHA)
@@ -368,24 +448,30 @@ class RocketProjectile(Projectile):
         pygame.draw.line(rocket_surface, acid_green, (0, 9), (4, 12), 2)
         pygame.draw.line(rocket_surface, black, (0, 3), (4, 0), 1)
         pygame.draw.line(rocket_surface, black, (0, 9), (4, 12), 1)
+        return rocket_surface
+
+    def draw(self, screen):
         angle = -math.degrees(self.direction)
-        rotated_surface = pygame.transform.rotate(rocket_surface, angle)
-        new_rect = rotated_surface.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(rotated_surface, new_rect)
-
-    def check_collision(self, enemies: List[Any]) -> Optional[Any]:
-        hit_enemy = super().check_collision(enemies)
-        if hit_enemy:
-            self.explode(pygame.display.get_surface(), enemies)
-        return hit_enemy
-    
-    def explode(self, screen, enemies: List[Any]):
+        sprite = get_rotated_sprite(self._render_sprite, (), angle)
+        return blit_centered(screen, sprite, self.x, self.y)
+
+    def explode(self, enemies: List[Any], current_time: float, effects_list: list, grid: Any = None):
+        """ Deals AOE damage around the rocket and queues its explosion ring in effects_list. """
         if self.aoe_radius > 0:
-            pygame.draw.circle(screen, (255, 200, 0), (int(self.x), int(self.y)), self.aoe_radius, 2)
-            for enemy in enemies:
-                dist = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-                if dist <= self.aoe_radius:
+            effects_list.append({
+                'type': 'explosion',
+                'pos': (self.x, self.y),
+                'color': (255, 200, 0),
+                'radius': self.aoe_radius,
+                'creation_time': current_time,
+                'duration': 0.0 # Shown for a single frame
+            })
+            if not self.on_hit_effects and hasattr(grid, 'damage_in_range'):
+                # The enemy store damages the whole blast in one vectorized operation
+                grid.damage_in_range(self.x, self.y, self.aoe_radius, self.damage, self.can_pop_camo)
+            else:
+                for enemy in enemies_in_range(enemies, self.x, self.y, self.aoe_radius, grid):
                     if enemy.is_camo and not self.can_pop_camo:
                         continue
-                    enemy.take_damage(self.damage)
-                    self.apply_effects(enemy)
\ No newline at end of file
+                    enemy.take_area_damage(self.damage) # The blast hits every bloon of a crowd
+                    self.apply_effects(enemy, current_time)
\ No newline at end of file
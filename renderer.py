@@ -0,0 +1,83 @@
+# renderer.py
+"""
+Dirty-rectangle rendering for the game window.
+
+Everything that never moves (the grass, the path and the bodies of placed towers) is drawn once
+into a cached background surface. Each frame then:
+
+    renderer.begin_frame()       # Paints the background back over last frame's moving sprites
+    ...draw bloons, projectiles, effects and the HUD, collecting the rects they return...
+    renderer.end_frame(rects)    # Sends only those areas (and last frame's) to the display
+
+The background is re-rendered, and the whole window flipped once, whenever the game's
+layout_version changes (a tower was placed or upgraded).
+"""
+import pygame
+
+
+class FrameRenderer:
+    """
+    Keeps the cached background and the rects drawn in the previous frame.
+    """
+    def __init__(self, screen, game, background_color, path_color):
+        """
+        Args:
+            screen (pygame.Surface): The display surface.
+            game (Game): The game whose path and towers make up the background.
+            background_color (tuple): RGB color of the grass.
+            path_color (tuple): RGB color of the path.
+        """
+        self.screen = screen
+        self.game = game
+        self.background_color = background_color
+        self.path_color = path_color
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.layout_version = None # Layout the background was rendered for; None forces the first render
+        self.previous_rects = [] # Areas drawn over last frame, to be restored and updated this frame
+        self.full_update = True # Whether the next end_frame() must flip the whole window
+
+    def render_background(self):
+        """Draws the grass, the path and every tower body into the cached background."""
+        background = self.background
+        background.fill(self.background_color)
+        path = self.game.path
+        for i in range(len(path) - 1):
+            pygame.draw.line(background, self.path_color, path[i], path[i + 1], self.game.path_thickness)
+        for tower in self.game.towers:
+            tower.draw_body(background)
+        self.layout_version = self.game.layout_version
+
+    def begin_frame(self):
+        """
+        Restores the background under everything drawn last frame, or repaints the whole window if
+        the layout changed since the background was rendered.
+        """
+        if self.layout_version != self.game.layout_version:
+            self.render_background()
+            self.screen.blit(self.background, (0, 0))
+            self.full_update = True
+            return
+        screen = self.screen
+        background = self.background
+        for rect in self.previous_rects:
+            screen.blit(background, rect, rect)
+
+    def end_frame(self, rects):
+        """
+        Updates the display: the areas drawn this frame plus those restored from last frame (where
+        sprites have moved away from).
+
+        Args:
+            rects (list of pygame.Rect): Areas drawn over this frame. None entries are ignored.
+        """
+        rects = [rect for rect in rects if rect]
+        if self.full_update:
+            pygame.display.flip()
+            self.full_update = False
+        else:
+            pygame.display.update(self.previous_rects + rects)
+        self.previous_rects = rects
+
+    def invalidate(self):
+        """Forces a full background render and flip on the next frame (e.g., after the window was uncovered)."""
+        self.layout_version = None
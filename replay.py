@@ -0,0 +1,241 @@
+# replay.py
+"""
+Recording and exact playback of games, for reproducing slow frames and timing the same game
+before and after a change.
+
+A replay is a small JSON document:
+
+    header     the Game's settings (waves, path, money, health, tick rate, ...) and its seed
+    commands   [tick, "place", tower_type, x, y, pay] and [tick, "upgrade", tower_index, path, tier, pay]
+    mouse      [tick, x, y] each time the mouse position changed ([tick, None, None]: no mouse)
+    result     tick_count, health, money, pops and leaks when the recording stopped
+
+A game that was already under way when recording began (e.g., resumed with --load) has its
+state in the header as well: header["snapshot"] is save_snapshot's data, base64-encoded, and
+playback starts from it instead of from a new game.
+
+The tick of an input is Game.tick_count when it happened: commands are applied, and the mouse
+position is used, right before the step that moves tick_count past it. The simulation only
+depends on those inputs and on its seed (fixed timestep, every random number from Game.rng), so
+playing them back reproduces the game exactly, as fast as the machine allows and without a window.
+
+Usage:
+    python "TowerDefense(main).py" --record=game.replay.json [--seed=N] [--load=game.save]
+    python replay.py game.replay.json [--store] [--pool] [--out=report.json]
+"""
+import sys
+import time
+import json
+import heapq
+import base64
+
+from sprites import set_headless
+from game import Game
+from snapshot import save_snapshot, load_snapshot
+
+REPLAY_VERSION = 1
+RESULT_FIELDS = ('tick_count', 'health', 'money', 'pops', 'leaks') # Compared after playback
+SLOWEST_TICKS = 10 # Slowest ticks listed in a playback report
+
+
+class ReplayRecorder:
+    """
+    Logs a game's inputs as they happen. Attaches itself to the game (Game.recorder), which then
+    reports every placement, upgrade and per-tick mouse position.
+    """
+    def __init__(self, game):
+        """
+        Args:
+            game (Game): The game to record. If it has already started (ticks run or towers placed),
+                a snapshot of it goes into the header and playback starts from there.
+        """
+        self.game = game
+        self.header = {
+            'version': REPLAY_VERSION,
+            'seed': game.seed,
+            'waves': game.waves,
+            'path': game.path,
+            'path_thickness': game.path_thickness,
+            'tower_radius_for_placement': game.tower_radius_for_placement,
+            'money': game.money,
+            'health': game.health,
+            'tick_rate': game.tick_rate,
+            'use_enemy_store': game.enemy_store is not None,
+            'use_projectile_pool': game.projectile_pool is not None,
+            'use_crowds': game.use_crowds,
+        }
+        if game.tick_count > 0 or game.towers:
+            self.header['snapshot'] = base64.b64encode(save_snapshot(game)).decode('ascii')
+        self.commands = []
+        self.mouse = []
+        self.last_mouse = None # Last position logged, as [x, y]
+        game.recorder = self
+
+    def record_placement(self, tick, tower_type, x, y, pay):
+        """Logs a tower placed by Game.place_tower."""
+        self.commands.append([tick, 'place', tower_type, x, y, pay])
+
+    def record_upgrade(self, tick, tower_index, path, tier, pay):
+        """Logs an upgrade bought by Game.upgrade_tower (tower_index: position in Game.towers)."""
+        self.commands.append([tick, 'upgrade', tower_index, path, tier, pay])
+
+    def record_mouse(self, tick, mouse_pos):
+        """Logs the mouse position used by a tick, if it differs from the last one logged."""
+        position = [None, None] if mouse_pos is None else [mouse_pos[0], mouse_pos[1]]
+        if position != self.last_mouse:
+            self.mouse.append([tick] + position)
+            self.last_mouse = position
+
+    def to_dict(self):
+        """Returns the replay so far, with the game's current state as its result."""
+        game = self.game
+        return {
+            'header': self.header,
+            'commands': self.commands,
+            'mouse': self.mouse,
+            'result': {field: getattr(game, field) for field in RESULT_FIELDS},
+        }
+
+    def save(self, file_path):
+        """
+        Writes the replay to a JSON file.
+
+        Returns:
+            int: Number of inputs written (commands plus mouse changes).
+        """
+        with open(file_path, 'w') as replay_file:
+            json.dump(self.to_dict(), replay_file, separators=(',', ':'))
+        return len(self.commands) + len(self.mouse)
+
+
+def load_replay(file_path):
+    """Reads a replay written by ReplayRecorder.save."""
+    with open(file_path) as replay_file:
+        replay = json.load(replay_file)
+    version = replay['header'].get('version')
+    if version != REPLAY_VERSION:
+        raise ValueError(f"Unsupported replay version {version} (expected {REPLAY_VERSION})")
+    # JSON turns the path's points into lists; the game expects tuples
+    header = replay['header']
+    header['path'] = [tuple(point) for point in header['path']]
+    for wave in header['waves']:
+        for group in wave:
+            if 'path' in group:
+                group['path'] = [tuple(point) for point in group['path']]
+    return replay
+
+
+def _apply_command(game, command):
+    """Places or upgrades a tower as a replay command says; raises ValueError if the game refuses."""
+    tick, kind = command[0], command[1]
+    if kind == 'place':
+        tower_type, x, y, pay = command[2:]
+        if game.place_tower(tower_type, x, y, pay=pay) is None:
+            raise ValueError(f"Replay diverged at tick {tick}: cannot place {tower_type} at ({x}, {y})")
+    elif kind == 'upgrade':
+        tower_index, path, tier, pay = command[2:]
+        if tower_index >= len(game.towers) or not game.upgrade_tower(game.towers[tower_index], path, tier, pay=pay):
+            raise ValueError(f"Replay diverged at tick {tick}: cannot upgrade tower {tower_index} path {path} to tier {tier}")
+    else:
+        raise ValueError(f"Unknown replay command: {kind}")
+
+
+def play_replay(replay, use_enemy_store=None, use_projectile_pool=None):
+    """
+    Plays a replay back without a window, one tick after another as fast as possible, and times every tick.
+
+    Args:
+        replay (dict): A replay, as returned by load_replay or ReplayRecorder.to_dict.
+        use_enemy_store (bool, optional): Overrides the recorded setting. The outcome can then
+            differ slightly (floating point sums in another order). Defaults to the recorded setting.
+            A replay that starts from a snapshot can't override it.
+        use_projectile_pool (bool, optional): Overrides the recorded setting, like use_enemy_store.
+
+    Returns:
+        dict: "result" (the fields of RESULT_FIELDS after playback), "expected" (the recorded ones),
+            "matches", "ticks", "wall_time", "ticks_per_second" and "slowest_ticks", a list of
+            {"tick", "ms", "enemies"} for the SLOWEST_TICKS slowest ticks.
+    """
+    header = replay['header']
+    if use_enemy_store is None:
+        use_enemy_store = header['use_enemy_store']
+    if use_projectile_pool is None:
+        use_projectile_pool = header['use_projectile_pool']
+    set_headless(True) # Bloons must not try to load images
+    if 'snapshot' in header:
+        # The snapshot holds the bloons and projectiles in the recorded backends' own form
+        if (use_enemy_store, use_projectile_pool) != (header['use_enemy_store'], header['use_projectile_pool']):
+            raise ValueError("A replay that starts from a snapshot plays with the backends it was recorded with")
+        game = load_snapshot(base64.b64decode(header['snapshot']), waves=header['waves'])
+    else:
+        game = Game(waves=header['waves'], money=header['money'], health=header['health'], path=header['path'],
+                    path_thickness=header['path_thickness'],
+                    tower_radius_for_placement=header['tower_radius_for_placement'], tick_rate=header['tick_rate'],
+                    use_enemy_store=use_enemy_store, use_projectile_pool=use_projectile_pool,
+                    use_crowds=header.get('use_crowds', True), seed=header['seed'])
+
+    commands = replay['commands']
+    mouse = replay['mouse']
+    expected = replay.get('result')
+    end_tick = expected['tick_count'] if expected else None
+    next_command = 0
+    next_mouse = 0
+    mouse_pos = None
+    tick_times = [] # (seconds, tick, bloons on screen) per tick
+    started = time.perf_counter()
+    while not game.finished and (end_tick is None or game.tick_count < end_tick):
+        tick = game.tick_count
+        while next_command < len(commands) and commands[next_command][0] <= tick:
+            _apply_command(game, commands[next_command])
+            next_command += 1
+        while next_mouse < len(mouse) and mouse[next_mouse][0] <= tick:
+            _, x, y = mouse[next_mouse]
+            mouse_pos = None if x is None else (x, y)
+            next_mouse += 1
+        tick_started = time.perf_counter()
+        game.step(mouse_pos)
+        tick_times.append((time.perf_counter() - tick_started, game.tick_count, len(game.enemy_list)))
+    # Inputs given after the last tick (e.g., a tower bought just before quitting) still count
+    while next_command < len(commands) and commands[next_command][0] <= game.tick_count:
+        _apply_command(game, commands[next_command])
+        next_command += 1
+    wall_time = time.perf_counter() - started
+
+    result = {field: getattr(game, field) for field in RESULT_FIELDS}
+    return {
+        'result': result,
+        'expected': expected,
+        'matches': expected is None or result == expected,
+        'ticks': game.tick_count,
+        'wall_time': wall_time,
+        'ticks_per_second': game.tick_count / wall_time if wall_time > 0 else 0.0,
+        'slowest_ticks': [{'tick': tick, 'ms': seconds * 1000, 'enemies': enemies}
+                          for seconds, tick, enemies in heapq.nlargest(SLOWEST_TICKS, tick_times)],
+    }
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    if len(args) != 1:
+        print("Usage: python replay.py game.replay.json [--store] [--pool] [--out=report.json]")
+        sys.exit(1)
+    out_path = None
+    for flag in flags:
+        if flag.startswith("--out="):
+            out_path = flag[len("--out="):]
+    try:
+        report = play_replay(load_replay(args[0]),
+                             use_enemy_store=True if "--store" in flags else None,
+                             use_projectile_pool=True if "--pool" in flags else None)
+    except ValueError as error: # Unsupported version, diverged input, or a backend a snapshot can't change
+        print(error)
+        sys.exit(1)
+    if out_path:
+        with open(out_path, "w") as out_file:
+            json.dump(report, out_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if not report['matches']:
+        print("Playback did not reproduce the recorded result.")
+        sys.exit(1)
@@ -0,0 +1,596 @@
+# snapshot.py
+"""
+Versioned binary snapshots of a game's complete state, for saving, loading and autosaves.
+
+A snapshot is a header (MAGIC, SNAPSHOT_VERSION) followed by sections, each a 4-byte tag,
+a 4-byte length and its payload:
+
+    GAME   money, health, wave progress, statistics, timers and the random stream's state
+    PATH   every distinct path in use (the game's own and any a wave names), as point arrays
+    SPWN   the pending spawns of the current wave (SpawnScheduler's heap)
+    TOWR   every tower: type, position and its attributes (upgrades, projectile_config, cooldowns, bananas, ...)
+    ENMY   every bloon in enemy_list order, one fixed-size record each
+    EFCT   every active status effect, and the expiry queue's entries
+    PROJ   every projectile a tower has in flight, one fixed-size record each (plus per-class extras)
+    STOR   the enemy store's slot layout and arrays, if the game uses one
+    POOL   the shared projectile pool's arrays, if the game uses one
+
+Bloons, effects, projectiles and spawns are packed with precompiled struct formats, one
+record per entity, so saving 2,000 entities takes a few milliseconds. Towers and the game's
+own fields are few, so they are written with a small tagged encoding of plain values
+(None, bool, int, float, str, list, tuple, dict) that keeps their exact Python types. No live
+object is pickled: references (a projectile's tower, an effect's bloon) are stored as indexes.
+
+Visual effects (hit markers, explosion rings) last a frame or two and are not saved.
+Restoring rebuilds the game with the same waves (enemy_info.ALL_WAVES unless others are given);
+with the same waves, a restored game plays on exactly like the one that was saved.
+
+Usage:
+    data = save_snapshot(game)        # bytes
+    game = load_snapshot(data)
+    write_snapshot(game, "autosave.tds")
+    game = read_snapshot("autosave.tds")
+"""
+import os
+import heapq
+import struct
+
+from enemy import BLOON_TYPES, BLOON_CLASSES
+from tower import TOWER_CLASSES
+from projectiles import (Projectile, DartProjectile, TackProjectile, CannonProjectile, ShrapnelProjectile,
+                         SpikeProjectile, CrossbowProjectile, BladeProjectile, RocketProjectile, HitscanProjectile)
+from object_pool import acquire
+from status_effects import SLOW, FREEZE, STUN
+from enemy_info import ALL_WAVES
+from projectile_pool import np
+from game import Game
+
+MAGIC = b'TDSN'
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct('<4sH')
+_SECTION = struct.Struct('<4sI')
+
+# Ids written to the file; only ever append to these, so older snapshots keep their meaning
+PROJECTILE_TYPES = (Projectile, DartProjectile, TackProjectile, CannonProjectile, ShrapnelProjectile,
+                    SpikeProjectile, CrossbowProjectile, BladeProjectile, RocketProjectile)
+EFFECT_KINDS = (SLOW, FREEZE, STUN)
+ON_HIT_EFFECTS = ('slow', 'stun') # Bit i of a projectile's effect mask is ON_HIT_EFFECTS[i]
+
+# Bloon: type, path, flags (regrowth, camo, frozen), segment, crowd count,
+# health, crowd_health, speed, base_speed, distance_travelled, x, y
+_ENEMY = struct.Struct('<BHBII7d')
+_ENEMY_REGROWTH, _ENEMY_CAMO, _ENEMY_FROZEN = 1, 2, 4
+
+# Status effect in a bloon's table: bloon index, kind, source tower, magnitude, expires_at
+_EFFECT = struct.Struct('<IBhdd')
+# Entry of the expiry queue: expires_at, sequence, bloon index, kind, source tower
+_EFFECT_ENTRY = struct.Struct('<dQIBh')
+
+# Pending spawn: due_time, sequence, bloon type, path, flags (regrowth, camo)
+_SPAWN = struct.Struct('<dQBHB')
+
+# Projectile: type, tower, flags (lead, camo, homing, shrapnel_on_explode), on-hit effect mask, color,
+# then the PROJECTILE_FLOATS and PROJECTILE_INTS below
+PROJECTILE_FLOATS = ('x', 'y', 'speed', 'damage', 'pierce', 'max_pierce', 'lifespan', 'age', 'distance_traveled',
+                     'max_distance', 'aoe_radius', 'turn_rate', 'radius', 'shrapnel_damage', 'direction')
+PROJECTILE_INTS = ('trail_length', 'shrapnel_count', 'shrapnel_pierce')
+_PROJECTILE = struct.Struct(f'<BHBB3B6d{len(PROJECTILE_FLOATS)}d{len(PROJECTILE_INTS)}i')
+# Fields some projectile classes add, and their struct codes
+PROJECTILE_EXTRAS = {
+    CannonProjectile: (('explosion_radius', 'd'),),
+    ShrapnelProjectile: (('rotation_angle', 'd'), ('rotation_speed', 'd'), ('w', 'i'), ('h', 'i')),
+    SpikeProjectile: (('rotation_angle', 'd'), ('rotation_speed', 'd')),
+    BladeProjectile: (('rotation_angle', 'd'), ('rotation_speed', 'd')),
+}
+_PROJECTILE_EXTRAS = {cls: (tuple(name for name, _ in fields), struct.Struct('<' + ''.join(code for _, code in fields)))
+                      for cls, fields in PROJECTILE_EXTRAS.items()}
+# Numbers that are whole in practice; they come back as ints when whole, so types don't drift after a load
+_WHOLE_FIELDS = ('damage', 'pierce', 'max_pierce', 'aoe_radius', 'radius', 'shrapnel_damage')
+
+# Game attributes saved as they are (tagged values)
+GAME_FIELDS = ('seed', 'money', 'health', 'tick_rate', 'tick_count', 'accumulator', 'path_thickness',
+               'tower_radius_for_placement', 'current_wave_set_index', 'wave_start_time', 'pops', 'leaks',
+               'wave_pops', 'wave_leaks', 'wave_results', 'won', 'lost', 'layout_version')
+
+# Tower attributes that are references to shared game objects, restored from the game instead
+_TOWER_SHARED = ('projectiles', 'projectile_pool', 'status_effects', 'rng')
+
+# Per-bloon fields packed into ENMY records, as Enemy attributes and as the EnemyStore arrays holding them
+_ENEMY_COLUMNS = ('is_regrowth', 'is_camo', 'frozen', 'current_path_index', 'health', 'crowd_health', 'speed',
+                  'distance_travelled', 'x', 'y')
+_STORE_COLUMNS = ('regrowth', 'camo', 'frozen', 'segment', 'health', 'crowd_health', 'speed', 'distance', 'x', 'y')
+
+# Enemy store arrays, saved raw (free slots keep stale values that vectorized queries still see)
+STORE_ARRAYS = ('x', 'y', 'distance', 'segment', 'speed', 'health', 'crowd_health', 'radius', 'type_id',
+                'camo', 'regrowth', 'lead', 'frozen', 'alive')
+
+# Projectile pool arrays, saved raw
+POOL_ARRAYS = ('x', 'y', 'vx', 'vy', 'speed', 'radius', 'damage', 'pierce', 'age', 'lifespan',
+               'distance_traveled', 'max_distance', 'can_pop_lead', 'can_pop_camo', 'angle', 'spin', 'owner', 'alive')
+
+
+# --- Tagged values ---
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+
+
+def _pack_value(value, out):
+    """Appends the tagged encoding of a plain value (None, bool, int, float, str, list, tuple, dict) to out."""
+    if value is None:
+        out.append(b'N')
+    elif value is True:
+        out.append(b'T')
+    elif value is False:
+        out.append(b'F')
+    elif isinstance(value, int):
+        out.append(b'i' + _I64.pack(value))
+    elif isinstance(value, float):
+        out.append(b'f' + _F64.pack(value))
+    elif isinstance(value, str):
+        encoded = value.encode('utf-8')
+        out.append(b's' + _U32.pack(len(encoded)) + encoded)
+    elif isinstance(value, (list, tuple)):
+        out.append((b'l' if isinstance(value, list) else b't') + _U32.pack(len(value)))
+        for item in value:
+            _pack_value(item, out)
+    elif isinstance(value, dict):
+        out.append(b'd' + _U32.pack(len(value)))
+        for key, item in value.items():
+            _pack_value(key, out)
+            _pack_value(item, out)
+    else:
+        raise TypeError(f"Cannot save a value of type {type(value).__name__}")
+
+
+def _unpack_value(data, offset):
+    """Reads one tagged value. Returns (value, offset just past it)."""
+    tag = data[offset:offset + 1]
+    offset += 1
+    if tag == b'N':
+        return None, offset
+    if tag == b'T':
+        return True, offset
+    if tag == b'F':
+        return False, offset
+    if tag == b'i':
+        return _I64.unpack_from(data, offset)[0], offset + 8
+    if tag == b'f':
+        return _F64.unpack_from(data, offset)[0], offset + 8
+    if tag == b's':
+        length = _U32.unpack_from(data, offset)[0]
+        offset += 4
+        return bytes(data[offset:offset + length]).decode('utf-8'), offset + length
+    if tag in (b'l', b't'):
+        length = _U32.unpack_from(data, offset)[0]
+        offset += 4
+        items = []
+        for _ in range(length):
+            item, offset = _unpack_value(data, offset)
+            items.append(item)
+        return (items if tag == b'l' else tuple(items)), offset
+    if tag == b'd':
+        length = _U32.unpack_from(data, offset)[0]
+        offset += 4
+        items = {}
+        for _ in range(length):
+            key, offset = _unpack_value(data, offset)
+            items[key], offset = _unpack_value(data, offset)
+        return items, offset
+    raise ValueError(f"Corrupt snapshot: unknown value tag {tag!r}")
+
+
+def _tagged(value):
+    """Tagged encoding of one value, as bytes."""
+    out = []
+    _pack_value(value, out)
+    return b''.join(out)
+
+
+def _whole(value):
+    """Returns value as an int if it is a whole float (health, damage, ... are ints unless halved)."""
+    return int(value) if value.is_integer() else value
+
+
+# --- Saving ---
+def save_snapshot(game):
+    """
+    Serialises a game's complete state.
+
+    Args:
+        game (Game): The game to save (between ticks).
+
+    Returns:
+        bytes: The snapshot.
+    """
+    tower_ids = {tower: i for i, tower in enumerate(game.towers)}
+    enemy_ids = {enemy: i for i, enemy in enumerate(game.enemy_list)}
+    paths = [game.path] # Path table; index 0 is always the game's own path
+    point_ids = {tuple(map(tuple, game.path)): 0} # Path points -> index: equal paths are saved once
+    path_ids = {} # id(path list) -> index, so each list's points are compared only once per save
+
+    def path_id(path):
+        index = path_ids.get(id(path))
+        if index is None:
+            points = tuple(map(tuple, path))
+            index = point_ids.get(points)
+            if index is None:
+                index = point_ids[points] = len(paths)
+                paths.append(path)
+            path_ids[id(path)] = index # Every list seen is alive until the save ends, so its id stays unique
+        return index
+
+    sections = []
+
+    # GAME: plain fields plus the random stream
+    state = {field: getattr(game, field) for field in GAME_FIELDS}
+    state['rng_state'] = game.rng.getstate()
+    state['wave_count'] = len(game.waves)
+    state['use_enemy_store'] = game.enemy_store is not None
+    state['use_projectile_pool'] = game.projectile_pool is not None
+    state['use_crowds'] = game.use_crowds
+    state['spawn_sequence'] = game.spawn_scheduler.sequence
+    state['effect_sequence'] = game.status_effects.sequence
+    sections.append((b'GAME', _tagged(state)))
+
+    # SPWN
+    spawns = [_SPAWN.pack(due_time, sequence, BLOON_TYPES.index(bloon_class.__name__), path_id(path),
+                          (_ENEMY_REGROWTH if is_regrowth else 0) | (_ENEMY_CAMO if is_camo else 0))
+              for due_time, sequence, bloon_class, path, is_regrowth, is_camo in game.spawn_scheduler.queue]
+
+    # TOWR: each tower's own attributes, minus the shared game objects
+    towers = []
+    tower_names = {tower_class: name for name, tower_class in TOWER_CLASSES.items()}
+    for tower in game.towers:
+        attributes = {name: value for name, value in vars(tower).items() if name not in _TOWER_SHARED}
+        projectile_type = attributes.get('projectile_type')
+        if projectile_type is not None:
+            attributes['projectile_type'] = projectile_type.__name__
+        towers.append((tower_names[type(tower)], attributes))
+    sections.append((b'TOWR', _tagged(towers)))
+
+    # ENMY and the status effects in the bloons' tables. Bloons in an EnemyStore are read straight
+    # from its arrays (one gather per field) instead of through their handles' properties.
+    enemy_list = game.enemy_list
+    store = game.enemy_store
+    if store is not None and all(enemy._store is store for enemy in enemy_list):
+        slots = np.fromiter((enemy._slot for enemy in enemy_list), np.int64, len(enemy_list))
+        columns = [getattr(store, name)[slots].tolist() for name in _STORE_COLUMNS]
+    else:
+        columns = [[getattr(enemy, name) for enemy in enemy_list] for name in _ENEMY_COLUMNS]
+    regrowth, camo, frozen, segment, health, crowd_health, speed, distance, x, y = columns
+    type_ids = {bloon_type: i for i, bloon_type in enumerate(BLOON_TYPES)}
+    enemies = []
+    effects = []
+    for index, enemy in enumerate(enemy_list):
+        flags = ((_ENEMY_REGROWTH if regrowth[index] else 0) | (_ENEMY_CAMO if camo[index] else 0) |
+                 (_ENEMY_FROZEN if frozen[index] else 0))
+        enemies.append(_ENEMY.pack(type_ids[enemy.bloon_type], path_id(enemy.path), flags, segment[index], enemy.count,
+                                   health[index], crowd_health[index], speed[index], enemy.base_speed,
+                                   distance[index], x[index], y[index]))
+        for (kind, source), (magnitude, expires_at) in enemy.status_effects.items():
+            effects.append(_EFFECT.pack(index, EFFECT_KINDS.index(kind), tower_ids.get(source, -1), magnitude, expires_at))
+    sections.append((b'ENMY', _U32.pack(len(enemies)) + b''.join(enemies)))
+    if store is not None:
+        sections.append((b'STOR', _save_store(store, enemy_list)))
+
+    # EFCT: table entries, then the expiry queue (entries of bloons no longer in play are dropped)
+    entries = []
+    for expires_at, sequence, enemy, (kind, source) in game.status_effects.queue:
+        index = enemy_ids.get(enemy)
+        if index is not None:
+            entries.append(_EFFECT_ENTRY.pack(expires_at, sequence, index, EFFECT_KINDS.index(kind),
+                                              tower_ids.get(source, -1)))
+    sections.append((b'EFCT', _U32.pack(len(effects)) + b''.join(effects) +
+                     _U32.pack(len(entries)) + b''.join(entries)))
+
+    # PROJ: projectiles held by the towers
+    projectiles = []
+    for tower_index, tower in enumerate(game.towers):
+        for projectile in tower.projectiles or ():
+            projectile_class = type(projectile)
+            flags = ((1 if projectile.can_pop_lead else 0) | (2 if projectile.can_pop_camo else 0) |
+                     (4 if projectile.homing else 0) | (8 if projectile.shrapnel_on_explode else 0))
+            effect_mask = 0
+            for effect in projectile.on_hit_effects:
+                effect_mask |= 1 << ON_HIT_EFFECTS.index(effect)
+            record = _PROJECTILE.pack(
+                PROJECTILE_TYPES.index(projectile_class), tower_index, flags, effect_mask, *projectile.color,
+                projectile.start_pos[0], projectile.start_pos[1], projectile.target_pos[0], projectile.target_pos[1],
+                projectile.velocity[0], projectile.velocity[1],
+                *[getattr(projectile, name) for name in PROJECTILE_FLOATS],
+                *[getattr(projectile, name) for name in PROJECTILE_INTS])
+            extras = _PROJECTILE_EXTRAS.get(projectile_class)
+            if extras is not None:
+                names, extra_struct = extras
+                record += extra_struct.pack(*[getattr(projectile, name) for name in names])
+            projectiles.append(record)
+    sections.append((b'PROJ', _U32.pack(len(projectiles)) + b''.join(projectiles)))
+
+    # POOL
+    pool = game.projectile_pool
+    if pool is not None:
+        sections.append((b'POOL', _save_pool(pool, tower_ids)))
+
+    # PATH once every path in use is known (sections are looked up by tag, so their order doesn't matter)
+    sections.append((b'PATH', _tagged([[tuple(point) for point in path] for path in paths])))
+    sections.append((b'SPWN', _U32.pack(len(spawns)) + b''.join(spawns)))
+
+    out = [_HEADER.pack(MAGIC, SNAPSHOT_VERSION)]
+    for tag, payload in sections:
+        out.append(_SECTION.pack(tag, len(payload)))
+        out.append(payload)
+    return b''.join(out)
+
+
+def _save_arrays(owner, names, n):
+    """Packs the first n items of each of an object's NumPy arrays, raw, each after its length."""
+    out = []
+    for name in names:
+        raw = getattr(owner, name)[:n].tobytes()
+        out.append(_U32.pack(len(raw)) + raw)
+    return b''.join(out)
+
+
+def _save_store(store, enemy_list):
+    """Packs an EnemyStore's slot layout (each bloon's slot, the free slots) and its arrays."""
+    header = {'size': store.size, 'free_slots': store.free_slots}
+    slots = struct.pack(f'<{len(enemy_list)}I', *[enemy._slot for enemy in enemy_list])
+    return _tagged(header) + slots + _save_arrays(store, STORE_ARRAYS, store.size)
+
+
+def _save_pool(pool, tower_ids):
+    """Packs a ProjectilePool: its arrays up to size, free slots, owners and a table of distinct looks."""
+    n = pool.size
+    looks = [] # Distinct (class id, look) pairs
+    look_ids = {}
+    slot_looks = []
+    for look in pool.looks[:n]:
+        if look is None:
+            slot_looks.append(-1)
+            continue
+        key = (PROJECTILE_TYPES.index(look[0]), look[1])
+        index = look_ids.get(key)
+        if index is None:
+            index = look_ids[key] = len(looks)
+            looks.append(key)
+        slot_looks.append(index)
+    header = {
+        'size': n,
+        'free_slots': pool.free_slots,
+        'owners': [tower_ids.get(tower, -1) for tower in pool.owners],
+        'looks': looks,
+        'slot_looks': slot_looks,
+    }
+    return _tagged(header) + _save_arrays(pool, POOL_ARRAYS, n)
+
+
+# --- Loading ---
+def _read_sections(data):
+    """Checks the header and returns {tag: payload} (as memoryviews)."""
+    data = memoryview(data)
+    if len(data) < _HEADER.size:
+        raise ValueError("Not a game snapshot (too short)")
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a game snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})")
+    sections = {}
+    offset = _HEADER.size
+    while offset < len(data):
+        tag, length = _SECTION.unpack_from(data, offset)
+        offset += _SECTION.size
+        sections[tag] = data[offset:offset + length]
+        offset += length
+    return sections
+
+
+def _records(payload, record_struct, offset=0):
+    """Reads a count followed by that many fixed-size records. Returns (list of tuples, offset past them)."""
+    count = _U32.unpack_from(payload, offset)[0]
+    offset += 4
+    end = offset + count * record_struct.size
+    return list(record_struct.iter_unpack(payload[offset:end])), end
+
+
+def load_snapshot(data, waves=None):
+    """
+    Rebuilds a game from a snapshot.
+
+    Args:
+        data (bytes): A snapshot from save_snapshot.
+        waves (list, optional): The waves the saved game was playing. Defaults to enemy_info.ALL_WAVES.
+
+    Returns:
+        Game: The restored game, ready to step.
+    """
+    sections = _read_sections(data)
+    state, _ = _unpack_value(sections[b'GAME'], 0)
+    waves = waves if waves is not None else ALL_WAVES
+    if len(waves) != state['wave_count']:
+        raise ValueError(f"Snapshot was saved with {state['wave_count']} waves, got {len(waves)}")
+
+    # Paths: the saved game's own path comes first; a path equal to an existing one reuses that list
+    saved_paths, _ = _unpack_value(sections[b'PATH'], 0)
+    game = Game(waves=waves, money=state['money'], health=state['health'], path=saved_paths[0],
+                path_thickness=state['path_thickness'], tower_radius_for_placement=state['tower_radius_for_placement'],
+                tick_rate=state['tick_rate'], use_enemy_store=state['use_enemy_store'],
+                use_projectile_pool=state['use_projectile_pool'], use_crowds=state.get('use_crowds', True),
+                seed=state['seed'])
+    known_paths = [game.path] + [group['path'] for wave in waves for group in wave if 'path' in group]
+    paths = []
+    for saved in saved_paths:
+        paths.append(next((path for path in known_paths if [tuple(point) for point in path] == saved), saved))
+
+    for field in GAME_FIELDS:
+        setattr(game, field, state[field])
+    game.time = game.tick_count * game.tick_dt
+    game.layout_version += 1 # Anything drawn for the fresh game is out of date
+
+    # Pending spawns
+    queue, _ = _records(sections[b'SPWN'], _SPAWN)
+    game.spawn_scheduler.queue = [
+        (due_time, sequence, BLOON_CLASSES[BLOON_TYPES[type_id]], paths[path_index],
+         bool(flags & _ENEMY_REGROWTH), bool(flags & _ENEMY_CAMO))
+        for due_time, sequence, type_id, path_index, flags in queue]
+    heapq.heapify(game.spawn_scheduler.queue)
+    game.spawn_scheduler.sequence = state['spawn_sequence']
+
+    # Towers: created fresh, then given their saved attributes and the game's shared objects
+    projectile_classes = {cls.__name__: cls for cls in PROJECTILE_TYPES + (HitscanProjectile,)}
+    saved_towers, _ = _unpack_value(sections[b'TOWR'], 0)
+    for tower_type, attributes in saved_towers:
+        tower = TOWER_CLASSES[tower_type](attributes['x'], attributes['y'])
+        if attributes.get('projectile_type') is not None:
+            attributes['projectile_type'] = projectile_classes[attributes['projectile_type']]
+        vars(tower).update(attributes)
+        tower.projectile_pool = game.projectile_pool
+        tower.status_effects = game.status_effects
+        tower.rng = game.rng
+        game.towers.append(tower)
+    towers = game.towers
+
+    # Bloons, in their saved order (targeting and popping order depend on it)
+    saved_enemies, _ = _records(sections[b'ENMY'], _ENEMY)
+    enemy_list = game.enemy_list
+    for (type_id, path_index, flags, segment, count, health, crowd_health, speed, base_speed,
+         distance, x, y) in saved_enemies:
+        enemy = acquire(BLOON_CLASSES[BLOON_TYPES[type_id]], paths[path_index], start_distance=distance,
+                        is_regrowth=bool(flags & _ENEMY_REGROWTH), is_camo=bool(flags & _ENEMY_CAMO))
+        enemy.current_path_index = segment
+        enemy.x = x
+        enemy.y = y
+        enemy.update_rect()
+        enemy.count = count
+        enemy.health = _whole(health)
+        enemy.crowd_health = _whole(crowd_health)
+        enemy.speed = speed
+        enemy.base_speed = base_speed
+        enemy.frozen = bool(flags & _ENEMY_FROZEN)
+        enemy_list.append(enemy)
+
+    # Status effects: the bloons' tables, then the expiry queue as it was
+    payload = sections[b'EFCT']
+    saved_effects, offset = _records(payload, _EFFECT)
+    for index, kind_id, source, magnitude, expires_at in saved_effects:
+        enemy_list[index].status_effects[(EFFECT_KINDS[kind_id], towers[source] if source >= 0 else None)] = \
+            [magnitude, expires_at]
+    saved_entries, _ = _records(payload, _EFFECT_ENTRY, offset)
+    game.status_effects.queue = [
+        (expires_at, sequence, enemy_list[index], (EFFECT_KINDS[kind_id], towers[source] if source >= 0 else None))
+        for expires_at, sequence, index, kind_id, source in saved_entries]
+    heapq.heapify(game.status_effects.queue)
+    game.status_effects.sequence = state['effect_sequence']
+
+    # Projectiles in flight, back in their towers' lists
+    payload = sections[b'PROJ']
+    count = _U32.unpack_from(payload, 0)[0]
+    offset = 4
+    for _ in range(count):
+        record = _PROJECTILE.unpack_from(payload, offset)
+        offset += _PROJECTILE.size
+        class_id, tower_index, flags, effect_mask, red, green, blue = record[:7]
+        start_x, start_y, target_x, target_y, velocity_x, velocity_y = record[7:13]
+        floats = record[13:13 + len(PROJECTILE_FLOATS)]
+        ints = record[13 + len(PROJECTILE_FLOATS):]
+        projectile_class = PROJECTILE_TYPES[class_id]
+        tower = towers[tower_index]
+        projectile = acquire(projectile_class, tower, start_x, start_y, (target_x, target_y))
+        for name, value in zip(PROJECTILE_FLOATS, floats):
+            setattr(projectile, name, _whole(value) if name in _WHOLE_FIELDS else value)
+        for name, value in zip(PROJECTILE_INTS, ints):
+            setattr(projectile, name, value)
+        projectile.start_pos = (start_x, start_y)
+        projectile.velocity = [velocity_x, velocity_y]
+        projectile.color = (red, green, blue)
+        projectile.can_pop_lead = bool(flags & 1)
+        projectile.can_pop_camo = bool(flags & 2)
+        projectile.homing = bool(flags & 4)
+        projectile.shrapnel_on_explode = bool(flags & 8)
+        projectile.on_hit_effects = [effect for bit, effect in enumerate(ON_HIT_EFFECTS) if effect_mask & (1 << bit)]
+        extras = _PROJECTILE_EXTRAS.get(projectile_class)
+        if extras is not None:
+            names, extra_struct = extras
+            for name, value in zip(names, extra_struct.unpack_from(payload, offset)):
+                setattr(projectile, name, value)
+            offset += extra_struct.size
+        tower.projectiles.append(projectile)
+
+    if b'POOL' in sections and game.projectile_pool is not None:
+        _load_pool(game.projectile_pool, sections[b'POOL'], towers)
+
+    # Bloons go into the array store last, with their final values, each in the slot it had
+    if game.enemy_store is not None:
+        if b'STOR' in sections:
+            _load_store(game.enemy_store, sections[b'STOR'], enemy_list)
+        else:
+            for enemy in enemy_list:
+                game.enemy_store.insert(enemy)
+    game.rng.setstate(state['rng_state']) # Last: recreating shrapnel above draws from the stream
+    return game
+
+
+def _load_arrays(owner, names, n, payload, offset):
+    """Fills the first n items of each of an object's NumPy arrays from _save_arrays output. Returns the offset past it."""
+    for name in names:
+        length = _U32.unpack_from(payload, offset)[0]
+        offset += 4
+        array = getattr(owner, name)
+        array[:n] = np.frombuffer(payload[offset:offset + length], dtype=array.dtype)
+        offset += length
+    return offset
+
+
+def _load_store(store, payload, enemy_list):
+    """Inserts restored bloons into a fresh EnemyStore at their saved slots, then restores its arrays."""
+    header, offset = _unpack_value(payload, 0)
+    n = header['size']
+    slots = struct.unpack_from(f'<{len(enemy_list)}I', payload, offset)
+    offset += 4 * len(enemy_list)
+    while store.capacity < n:
+        store._grow(store.capacity * 2)
+    store.size = n
+    store.free_slots = list(reversed(slots)) # insert() takes free slots from the end: each bloon gets its own
+    for enemy in enemy_list:
+        store.insert(enemy)
+    store.free_slots = header['free_slots']
+    _load_arrays(store, STORE_ARRAYS, n, payload, offset)
+
+
+def _load_pool(pool, payload, towers):
+    """Fills a fresh ProjectilePool from a POOL section."""
+    header, offset = _unpack_value(payload, 0)
+    n = header['size']
+    while pool.capacity < n:
+        pool._grow(pool.capacity * 2)
+    _load_arrays(pool, POOL_ARRAYS, n, payload, offset)
+    pool.size = n
+    pool.free_slots = header['free_slots']
+    pool.owners = [towers[index] if index >= 0 else None for index in header['owners']]
+    pool._owner_ids = {tower: owner_id for owner_id, tower in enumerate(pool.owners) if tower is not None}
+    looks = [(PROJECTILE_TYPES[class_id], tuple(look)) for class_id, look in header['looks']]
+    pool.looks[:n] = [looks[index] if index >= 0 else None for index in header['slot_looks']]
+
+
+# --- Files ---
+def write_snapshot(game, file_path):
+    """
+    Saves a game to a file. The snapshot is written next to it first and then swapped in, so a
+    crash mid-save never leaves a half-written autosave behind.
+
+    Returns:
+        int: Size of the snapshot in bytes.
+    """
+    data = save_snapshot(game)
+    temporary_path = file_path + '.tmp'
+    with open(temporary_path, 'wb') as snapshot_file:
+        snapshot_file.write(data)
+    os.replace(temporary_path, file_path)
+    return len(data)
+
+
+def read_snapshot(file_path, waves=None):
+    """Loads a game saved with write_snapshot (see load_snapshot)."""
+    with open(file_path, 'rb') as snapshot_file:
+        return load_snapshot(snapshot_file.read(), waves)
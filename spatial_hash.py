@@ -0,0 +1,132 @@
+# spatial_hash.py
+import math
+
+DEFAULT_CELL_SIZE = 64 # Cell size in pixels; a bit bigger than a Regrowth bloon
+
+
+class SpatialHash:
+    """
+    Uniform grid that buckets enemies by the cell their center is in, so range queries only
+    look at the few cells around the query instead of every enemy on the map.
+
+    The game rebuilds the grid once per tick after enemies move, then keeps it in sync while
+    bloons are popped (remove) and children are spawned (insert) during the same tick.
+    """
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {} # (cell_x, cell_y) -> list of enemies whose center lies in that cell
+        self.max_radius = 0 # Largest enemy radius inserted, used to pad segment queries
+
+    def _cell_of(self, x, y):
+        """Returns the (cell_x, cell_y) key of the cell containing (x, y)."""
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def clear(self):
+        """Removes every enemy from the grid."""
+        self.cells.clear()
+        self.max_radius = 0
+
+    def insert(self, enemy):
+        """Adds an enemy to the cell containing its current position."""
+        key = self._cell_of(enemy.x, enemy.y)
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [enemy]
+        else:
+            bucket.append(enemy)
+        if enemy.radius > self.max_radius:
+            self.max_radius = enemy.radius
+
+    def insert_after(self, enemy, anchor):
+        """Adds an enemy at the same spot as anchor, right after it in their cell (see Enemy.split_front)."""
+        bucket = self.cells.get(self._cell_of(anchor.x, anchor.y))
+        if bucket is None or anchor not in bucket:
+            self.insert(enemy)
+            return
+        bucket.insert(bucket.index(anchor) + 1, enemy)
+        if enemy.radius > self.max_radius:
+            self.max_radius = enemy.radius
+
+    def remove(self, enemy):
+        """Removes an enemy that has not moved since it was inserted. Does nothing if it is not in the grid."""
+        bucket = self.cells.get(self._cell_of(enemy.x, enemy.y))
+        if bucket is not None and enemy in bucket:
+            bucket.remove(enemy)
+
+    def rebuild(self, enemies):
+        """Clears the grid and inserts every enemy at its current position."""
+        self.clear()
+        for enemy in enemies:
+            self.insert(enemy)
+
+    def _buckets_in_box(self, min_x, min_y, max_x, max_y):
+        """Yields the non-empty buckets of all cells overlapping the given box."""
+        min_cx, min_cy = self._cell_of(min_x, min_y)
+        max_cx, max_cy = self._cell_of(max_x, max_y)
+        cells = self.cells
+        for cy in range(min_cy, max_cy + 1):
+            for cx in range(min_cx, max_cx + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield bucket
+
+    def query_circle(self, x, y, radius):
+        """
+        Returns the enemies whose center lies within radius of (x, y).
+
+        Args:
+            x, y: Center of the query circle.
+            radius (float): Radius of the query circle. May be float('inf') for global range.
+
+        Returns:
+            list: Matching enemies.
+        """
+        if math.isinf(radius):
+            return [enemy for bucket in self.cells.values() for enemy in bucket]
+        radius_sq = radius * radius
+        result = []
+        for bucket in self._buckets_in_box(x - radius, y - radius, x + radius, y + radius):
+            for enemy in bucket:
+                dx = enemy.x - x
+                dy = enemy.y - y
+                if dx * dx + dy * dy <= radius_sq:
+                    result.append(enemy)
+        return result
+
+    def query_box(self, min_x, min_y, max_x, max_y):
+        """
+        Returns the enemies that may touch the given box: everything in the cells it overlaps,
+        padded by the largest enemy radius. Callers do the exact per-enemy test.
+
+        Returns:
+            list: Candidate enemies.
+        """
+        pad = self.max_radius
+        result = []
+        for bucket in self._buckets_in_box(min_x - pad, min_y - pad, max_x + pad, max_y + pad):
+            result.extend(bucket)
+        return result
+
+    def query_segment(self, x1, y1, x2, y2, radius):
+        """
+        Returns the enemies that may touch a circle of the given radius swept from (x1, y1) to (x2, y2).
+        The search is padded by the largest enemy radius; callers do the exact per-enemy test.
+
+        Returns:
+            list: Candidate enemies.
+        """
+        pad = radius + self.max_radius
+        result = []
+        for bucket in self._buckets_in_box(min(x1, x2) - pad, min(y1, y2) - pad, max(x1, x2) + pad, max(y1, y2) + pad):
+            result.extend(bucket)
+        return result
+
+
+def enemies_in_range(enemies, x, y, radius, grid=None):
+    """
+    Returns the enemies whose center is within radius of (x, y).
+    Uses the spatial hash when one is given, otherwise scans the whole list.
+    """
+    if grid is not None:
+        return grid.query_circle(x, y, radius)
+    return [enemy for enemy in enemies if math.sqrt((enemy.x - x)**2 + (enemy.y - y)**2) <= radius]
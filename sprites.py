@@ -0,0 +1,167 @@
+# sprites.py
+import pygame
+import os
+from collections import OrderedDict
+
+BLOON_IMAGE_DIR = "bloons" # Folder that holds one PNG per bloon type (e.g., "Red.png")
+CAMO_OVERLAY = "Camo" # Image in BLOON_IMAGE_DIR painted over camo bloons
+
+# When True, no image is ever loaded or created, so entities can be simulated without a display
+_headless = False
+
+# Process-wide registry of ready-to-blit bloon sprites.
+# Keyed by (bloon_type, width, height, is_regrowth, is_camo) so every bloon with the same look
+# shares a single Surface instead of loading, decoding and scaling its own copy of the PNG.
+_bloon_sprites = {}
+
+# Unscaled images as decoded from disk, keyed by bloon type. Each PNG is read at most once.
+_raw_bloon_images = {}
+
+# Number of pre-rendered orientations per rotating sprite (one copy every 360 / ROTATION_STEPS degrees)
+ROTATION_STEPS = 64
+
+# Upright sprites drawn by a render function, keyed by (render function, look arguments)
+_upright_sprites = {}
+
+# Rotated copies of the upright sprites, keyed by (render function, look arguments, steps, step index).
+# Copies are created the first time an orientation is needed and then reused by every projectile.
+_rotated_sprites = {}
+
+# Most text surfaces kept by get_text_surface; the least recently used one is dropped beyond this
+TEXT_CACHE_SIZE = 256
+
+# Rendered text, keyed by (font, text, color), oldest use first
+_text_surfaces = OrderedDict()
+
+
+def set_headless(enabled=True):
+    """Turns headless mode on or off. In headless mode sprite lookups return None."""
+    global _headless
+    _headless = enabled
+
+
+def is_headless():
+    """Returns True if sprites are disabled because the game runs without a display."""
+    return _headless
+
+
+def _load_raw_bloon_image(bloon_type):
+    """
+    Loads the unscaled image for a bloon type from the 'bloons' folder, or returns the cached copy.
+    Returns None if the file is missing or cannot be decoded.
+    """
+    if bloon_type in _raw_bloon_images:
+        return _raw_bloon_images[bloon_type]
+
+    image_path = os.path.join(BLOON_IMAGE_DIR, f"{bloon_type}.png")
+    try:
+        image = pygame.image.load(image_path).convert_alpha()
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Warning: Could not load bloon image {image_path} - {e}")
+        image = None
+    _raw_bloon_images[bloon_type] = image # Failed loads are cached too, so the warning is printed once
+    return image
+
+
+def get_bloon_sprite(bloon_type, width, height, is_regrowth=False, is_camo=False):
+    """
+    Returns the shared sprite for a bloon look, building it on first use. Camo sprites have the
+    camo overlay painted on when they are built, so a camo bloon is drawn in a single blit. If an
+    image is missing, the warning is printed once and the sprite is built without it.
+
+    Args:
+        bloon_type (str): The type of bloon (e.g., "Red", "Blue", "MOAB").
+        width (int): Width of the sprite in pixels.
+        height (int): Height of the sprite in pixels.
+        is_regrowth (bool, optional): Whether the sprite is for a regrowth bloon. Defaults to False.
+        is_camo (bool, optional): Whether the sprite is for a camo bloon. Defaults to False.
+
+    Returns:
+        pygame.Surface: The scaled sprite, or None in headless mode. Callers must treat it as read-only, since it is shared.
+    """
+    if _headless:
+        return None
+    key = (bloon_type, width, height, is_regrowth, is_camo)
+    sprite = _bloon_sprites.get(key)
+    if sprite is None:
+        raw_image = _load_raw_bloon_image(bloon_type)
+        if raw_image is not None:
+            sprite = pygame.transform.scale(raw_image, (width, height))
+        else:
+            sprite = pygame.Surface((width, height), pygame.SRCALPHA) # Create a blank surface
+            pygame.draw.circle(sprite, (255, 0, 255), (width // 2, height // 2), width // 2) # Magenta placeholder
+        if is_camo:
+            camo_overlay = _load_raw_bloon_image(CAMO_OVERLAY)
+            if camo_overlay is not None:
+                sprite.blit(pygame.transform.scale(camo_overlay, (width, height)), (0, 0))
+        _bloon_sprites[key] = sprite
+    return sprite
+
+
+def get_rotated_sprite(render, look, angle, steps=ROTATION_STEPS):
+    """
+    Returns a shared, pre-rotated copy of a procedurally drawn sprite.
+
+    The angle is snapped to the nearest of `steps` fixed orientations, so each look is drawn and
+    rotated at most `steps` times per process instead of once per projectile per frame.
+
+    Args:
+        render (callable): Function that draws the upright sprite, called as render(*look).
+        look (tuple): Hashable arguments that fully describe the sprite's appearance (e.g., its radius).
+        angle (float): Rotation in degrees, counter-clockwise (same convention as pygame.transform.rotate).
+        steps (int, optional): Number of orientations to quantize to. Defaults to ROTATION_STEPS.
+
+    Returns:
+        pygame.Surface: The rotated sprite. Callers must treat it as read-only, since it is shared.
+    """
+    step = int(round(angle * steps / 360.0)) % steps
+    key = (render, look, steps, step)
+    sprite = _rotated_sprites.get(key)
+    if sprite is None:
+        upright = _upright_sprites.get((render, look))
+        if upright is None:
+            upright = render(*look)
+            _upright_sprites[(render, look)] = upright
+        sprite = pygame.transform.rotate(upright, step * 360.0 / steps)
+        _rotated_sprites[key] = sprite
+    return sprite
+
+
+def blit_centered(screen, sprite, x, y):
+    """Blits a sprite so that its center lands on (x, y). Returns the area drawn over."""
+    return screen.blit(sprite, (int(x) - sprite.get_width() // 2, int(y) - sprite.get_height() // 2))
+
+
+def get_text_surface(font, text, color):
+    """
+    Returns a shared, anti-aliased rendering of text, rasterising it only the first time the same
+    font, string and color are asked for. Labels that change (money, health, tiers) are rendered
+    once per distinct value; the TEXT_CACHE_SIZE most recently used renderings are kept.
+
+    Args:
+        font (pygame.font.Font): The font to render with.
+        text (str): The string to render.
+        color (tuple): RGB color of the text.
+
+    Returns:
+        pygame.Surface: The rendered text. Callers must treat it as read-only, since it is shared.
+    """
+    key = (font, text, color)
+    surface = _text_surfaces.get(key)
+    if surface is None:
+        surface = font.render(text, True, color)
+        _text_surfaces[key] = surface
+        if len(_text_surfaces) > TEXT_CACHE_SIZE:
+            _text_surfaces.popitem(last=False) # Drop the least recently used rendering
+    else:
+        _text_surfaces.move_to_end(key)
+    return surface
+
+
+def clear_sprite_cache():
+    """Drops every cached sprite and text rendering (e.g., after the display mode changes)."""
+    _bloon_sprites.clear()
+    _raw_bloon_images.clear()
+    _upright_sprites.clear()
+    _rotated_sprites.clear()
+    _text_surfaces.clear()
@@ -0,0 +1,147 @@
+# status_effects.py
+"""
+Timed status effects on bloons (slow, freeze, stun) and the heap that expires them.
+
+Every bloon carries a small table of its active effects, enemy.status_effects:
+
+    {(kind, source): [magnitude, expires_at]}
+
+One entry per kind of effect and per tower that applied it, so a tower re-applying its own
+effect only pushes the expiry time back. A bloon's speed and frozen flag are never edited by
+the towers; they are derived from the table (see refresh_speed) whenever it changes:
+
+    speed  = base_speed * the strongest slow's magnitude (slows don't stack)
+    frozen = True while any freeze or stun is active
+
+StatusEffects keeps one min-heap of (expires_at, sequence, enemy, key) for the whole game, and
+expire() pops only the effects that are due, so expiry costs nothing for bloons whose effects
+are still running. Refreshing an effect does not touch the heap: when its old heap entry comes
+up, the entry is pushed again with the new expiry time. Entries of effects that were removed,
+or of bloons that were popped and recycled, find nothing in the table and are dropped.
+"""
+import heapq
+
+# Effect kinds
+SLOW = 'slow'
+FREEZE = 'freeze'
+STUN = 'stun'
+
+# Projectile on-hit effects (Projectile.on_hit_effects)
+ON_HIT_SLOW_FACTOR = 0.5 # Speed multiplier of an on-hit 'slow'
+ON_HIT_SLOW_DURATION = 2.0 # Seconds
+ON_HIT_STUN_DURATION = 1.0 # Seconds
+
+# An aura (Arctic Wind) re-applies its slow every tick while a bloon is inside; the slow runs out
+# this many seconds after the bloon leaves
+AURA_LINGER = 0.25
+
+
+def refresh_speed(enemy):
+    """Recomputes a bloon's speed and frozen flag from its active effects."""
+    speed_factor = 1.0
+    frozen = False
+    for (kind, _), (magnitude, _) in enemy.status_effects.items():
+        if kind == SLOW:
+            if magnitude < speed_factor:
+                speed_factor = magnitude
+        else: # FREEZE or STUN
+            frozen = True
+    enemy.speed = enemy.base_speed * speed_factor
+    enemy.frozen = frozen
+
+
+class StatusEffects:
+    """
+    Expiry queue of every timed effect in one game.
+    """
+    def __init__(self):
+        self.queue = [] # Heap of (expires_at, sequence, enemy, key)
+        self.sequence = 0 # Tie-breaker, so enemies never have to be compared
+
+    def __len__(self):
+        return len(self.queue)
+
+    def apply(self, enemy, kind, magnitude, source, expires_at):
+        """
+        Puts an effect on a bloon, or refreshes it if the same source already applied this kind.
+        A refreshed effect keeps the later of the two expiry times and takes the new magnitude.
+
+        Args:
+            enemy (Enemy): The bloon affected.
+            kind (str): SLOW, FREEZE or STUN.
+            magnitude (float): Speed multiplier for SLOW (e.g., 0.67); unused for FREEZE and STUN.
+            source: Whatever applied the effect (usually a tower).
+            expires_at (float): Game time the effect ends.
+        """
+        key = (kind, source)
+        table = enemy.status_effects
+        entry = table.get(key)
+        if entry is None:
+            table[key] = [magnitude, expires_at]
+            heapq.heappush(self.queue, (expires_at, self.sequence, enemy, key))
+            self.sequence += 1
+            refresh_speed(enemy)
+            return
+        if expires_at > entry[1]:
+            entry[1] = expires_at # The heap entry is pushed back when it comes up (see expire)
+        if magnitude != entry[0]:
+            entry[0] = magnitude
+            refresh_speed(enemy)
+
+    def remove(self, enemy, kind, source):
+        """Ends an effect early. Its heap entry is dropped when it comes up."""
+        if enemy.status_effects.pop((kind, source), None) is not None:
+            refresh_speed(enemy)
+
+    def expire(self, current_time):
+        """
+        Ends every effect whose expiry time has passed.
+
+        Returns:
+            int: Number of effects that ended.
+        """
+        queue = self.queue
+        ended = 0
+        while queue and queue[0][0] < current_time:
+            expires_at, _, enemy, key = heapq.heappop(queue)
+            entry = enemy.status_effects.get(key)
+            if entry is None:
+                continue # Removed early, or the bloon was popped and recycled
+            if entry[1] > expires_at: # Refreshed since it was queued
+                heapq.heappush(queue, (entry[1], self.sequence, enemy, key))
+                self.sequence += 1
+                continue
+            del enemy.status_effects[key]
+            refresh_speed(enemy)
+            ended += 1
+        return ended
+
+    def copy_effects(self, enemy, other):
+        """Puts every effect of one bloon on another as well, with the same sources and expiry times (see Enemy.split_front)."""
+        for key, (magnitude, expires_at) in enemy.status_effects.items():
+            other.status_effects[key] = [magnitude, expires_at]
+            heapq.heappush(self.queue, (expires_at, self.sequence, other, key))
+            self.sequence += 1
+        refresh_speed(other)
+
+    def clear(self):
+        """Drops every queued expiry (the bloons' tables are left as they are)."""
+        self.queue = []
+
+
+def apply_on_hit_effects(status_effects, enemy, on_hit_effects, source, current_time):
+    """
+    Applies a projectile's on-hit effects ('slow', 'stun') to the bloon it hit.
+
+    Args:
+        status_effects (StatusEffects): The game's effect queue.
+        enemy (Enemy): The bloon hit.
+        on_hit_effects (list of str): The projectile's on_hit_effects.
+        source: The tower that fired the projectile.
+        current_time (float): Current game time in seconds.
+    """
+    for effect in on_hit_effects:
+        if effect == 'slow':
+            status_effects.apply(enemy, SLOW, ON_HIT_SLOW_FACTOR, source, current_time + ON_HIT_SLOW_DURATION)
+        elif effect == 'stun':
+            status_effects.apply(enemy, STUN, 0, source, current_time + ON_HIT_STUN_DURATION)
@@ -0,0 +1,15 @@
+# conftest.py
+"""
+Shared setup for the tests: the game modules live in the repository root, and no test opens a
+real window (pygame's dummy video driver stands in for the display).
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sprites import set_headless
+
+set_headless(True) # Bloons must not try to load images; tests that draw switch it off themselves
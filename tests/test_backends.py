@@ -0,0 +1,42 @@
+# test_backends.py
+"""
+The optional NumPy backends (enemy store, projectile pool) must not change how a game plays out.
+"""
+import pytest
+
+from enemy_info import ALL_WAVES
+from headless import run_headless
+
+pytest.importorskip("numpy")
+
+# Every kind of tower; pierce, shrapnel, explosions and freezes all hit crowded, co-located bloons
+LAYOUT = [
+    {"type": "Tack Shooter", "x": 380, "y": 230, "upgrades": {1: 2, 3: 1}},
+    {"type": "Sniper Monkey", "x": 520, "y": 380, "upgrades": {1: 1, 3: 2}},
+    {"type": "Dart Monkey", "x": 225, "y": 525, "upgrades": {2: 2, 3: 2}},
+    {"type": "Cannon Tower", "x": 675, "y": 525, "upgrades": {1: 1, 3: 2}},
+    {"type": "Dartling Gunner", "x": 380, "y": 380},
+    {"type": "Ice Tower", "x": 520, "y": 520},
+    {"type": "Banana Farm", "x": 100, "y": 100},
+]
+# Ceramics, Blacks and Whites, Zebras and Leads: waves with layered bloons popping into each other
+WAVES = [ALL_WAVES[index] for index in (0, 17, 20, 23, 28)]
+RESULT_FIELDS = ('survived_waves', 'won', 'health', 'money', 'pops', 'leaks', 'game_time')
+
+
+def _result(**options):
+    """Plays WAVES with LAYOUT and the same seed; returns the fields that must match, and the per-wave results."""
+    report = run_headless(LAYOUT, WAVES, seed=1, **options)
+    return {field: report[field] for field in RESULT_FIELDS}, report['waves']
+
+
+def test_enemy_store_plays_like_plain_objects():
+    assert _result(use_enemy_store=True) == _result()
+
+
+def test_projectile_pool_plays_like_projectile_objects():
+    assert _result(use_projectile_pool=True) == _result()
+
+
+def test_store_and_pool_together_play_like_plain_objects():
+    assert _result(use_enemy_store=True, use_projectile_pool=True) == _result()
@@ -0,0 +1,34 @@
+# test_batch.py
+"""
+Batch runs (batch.py): results are written as games finish, bad layouts are reported instead of
+stopping the batch, and a rerun skips the jobs already done.
+"""
+import json
+
+from batch import make_jobs, run_batch, run_job
+
+GOOD = [{"type": "Tack Shooter", "x": 380, "y": 230, "upgrades": {"1": 1}}]
+ON_PATH = [{"type": "Dart Monkey", "x": 0, "y": 300}]
+BAD_TIER = [{"type": "Dart Monkey", "x": 225, "y": 525, "upgrades": {"1": "2"}}] # Tier given as a string
+
+
+def test_bad_layouts_are_reported_not_raised():
+    jobs = make_jobs({"on_path": ON_PATH, "bad_tier": BAD_TIER}, wave_ranges=[(0, 0)])
+    on_path, bad_tier = [run_job(job) for job in jobs]
+    assert "blocked by the path" in on_path['error']
+    assert bad_tier['error'].startswith("TypeError(")
+
+
+def test_run_batch_writes_results_and_resumes(tmp_path):
+    out_path = str(tmp_path / "results.jsonl")
+    jobs = make_jobs({"good": GOOD, "bad_tier": BAD_TIER}, wave_ranges=[(0, 0), (1, 1)], max_time=5.0)
+    summary = run_batch(jobs, out_path, workers=1)
+    assert (summary['finished'], summary['errors'], summary['skipped']) == (4, 2, 0)
+    with open(out_path) as results_file:
+        results = {result['job']: result for result in map(json.loads, results_file)}
+    assert set(results) == {"good:0-0", "good:1-1", "bad_tier:0-0", "bad_tier:1-1"}
+    assert results["good:0-0"]['layout_cost'] > 0 and 'error' not in results["good:0-0"]
+    assert len(results["good:1-1"]['money_curve']) == results["good:1-1"]['waves_played']
+
+    summary = run_batch(jobs, out_path, workers=1) # Everything is already in the file
+    assert (summary['finished'], summary['skipped']) == (0, 4)
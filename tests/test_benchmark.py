@@ -0,0 +1,46 @@
+# test_benchmark.py
+"""
+benchmark: scenario layouts stay off the path, and a scenario's report adds up.
+"""
+import json
+import math
+
+import pytest
+
+from benchmark import SCENARIOS, layout_along_path, run_scenario, _percentile, _timing_summary
+from enemy_info import path
+from game import is_on_path, DEFAULT_TICK_RATE
+
+
+def test_percentile_is_nearest_rank():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert _percentile(values, 0.5) == 2.0
+    assert _percentile(values, 0.99) == 4.0
+    assert _percentile([], 0.5) == 0.0
+    assert _timing_summary([0.001, 0.003]) == pytest.approx({'mean': 2.0, 'p50': 1.0, 'p99': 3.0, 'max': 3.0})
+
+
+def test_layout_along_path_places_every_tower_off_the_path():
+    layout = layout_along_path([("Tack Shooter", 20, {}), ("Dart Monkey", 5, {1: 1})])
+    assert len(layout) == 25
+    assert [tower["type"] for tower in layout].count("Dart Monkey") == 5
+    spots = [(tower["x"], tower["y"]) for tower in layout]
+    assert len(set(spots)) == len(spots)
+    assert not any(is_on_path(x, y, path, 50) for x, y in spots)
+    with pytest.raises(ValueError):
+        layout_along_path([("Tack Shooter", 10000, {})])
+
+
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_scenario_report_adds_up(name):
+    report = run_scenario(name, max_time=3.0)
+    json.dumps(report) # Reports are saved as JSON
+    assert report['scenario'] == name
+    assert report['ticks'] == math.ceil(3.0 * DEFAULT_TICK_RATE) or report['result']['finished']
+    assert sum(wave['ticks'] for wave in report['waves']) == report['ticks']
+    assert report['wall_time'] >= sum(wave['wall_time'] for wave in report['waves'])
+    timing = report['ms_per_tick']
+    assert 0.0 < timing['p50'] <= timing['p99'] <= timing['max']
+    assert report['entities']['enemies']['peak'] > 0
+    assert report['entities']['enemies']['mean'] <= report['entities']['enemies']['peak']
+    assert report['result']['pops'] == sum(wave['pops'] for wave in report['waves'])
@@ -0,0 +1,103 @@
+# test_crowds.py
+"""
+Crowds (identical child bloons sharing one entity, see Enemy.destroyed) must not change how a
+game plays out: every hit has to land where it would on separate bloons.
+"""
+import pytest
+
+import enemy
+from enemy import Zebra, Black, White, Ceramic
+from enemy_info import ALL_WAVES, path
+from headless import build_game, run_headless
+from spatial_hash import SpatialHash
+from status_effects import StatusEffects, SLOW
+
+# Pierce towers and a cannon, with a Sniper: single-target hits and blasts on stacked bloons
+PIERCE_LAYOUT = [
+    {"type": "Tack Shooter", "x": 380, "y": 230, "upgrades": {1: 3}},
+    {"type": "Dart Monkey", "x": 225, "y": 525, "upgrades": {1: 3}},
+    {"type": "Dart Monkey", "x": 520, "y": 380, "upgrades": {3: 3}},
+    {"type": "Dartling Gunner", "x": 380, "y": 380, "upgrades": {2: 3}},
+    {"type": "Sniper Monkey", "x": 675, "y": 525, "upgrades": {1: 2}},
+]
+# Rainbows, Zebras and Ceramics up to the MOAB: crowds of Zebras, Pinks, Ceramics and Rainbows
+CROWD_WAVES = [ALL_WAVES[index] for index in (32, 34, 35, 36, 37)]
+RESULT_FIELDS = ('survived_waves', 'won', 'health', 'money', 'pops', 'leaks', 'game_time')
+
+
+def _play(game):
+    while not game.finished:
+        game.step()
+    return {'health': game.health, 'money': game.money, 'pops': game.pops, 'leaks': game.leaks,
+            'waves': game.wave_results}
+
+
+def test_pierce_towers_pop_the_same_with_and_without_crowds():
+    with_crowds = run_headless(PIERCE_LAYOUT, CROWD_WAVES, seed=1)
+    without_crowds = run_headless(PIERCE_LAYOUT, CROWD_WAVES, seed=1, use_crowds=False)
+    for field in RESULT_FIELDS:
+        assert with_crowds[field] == without_crowds[field], field
+    assert with_crowds['waves'] == without_crowds['waves']
+
+
+def test_area_popped_crowd_spawns_children_in_plain_order():
+    """Two Zebras popped by one blast leave Black, White, Black, White, as two separate Zebras would."""
+    zebras = Zebra(path)
+    zebras.count = 2
+    zebras.take_area_damage(1)
+    children = []
+    assert zebras.destroyed(children) == (2, 120)
+    assert [(type(child), child.count) for child in children] == [(Black, 1), (White, 1), (Black, 1), (White, 1)]
+    assert zebras.count == 0
+
+
+def test_runs_of_identical_children_become_one_crowd():
+    for crowds, counts in ((True, [2]), (False, [1, 1])): # The two Rainbows of a Ceramic
+        ceramic = Ceramic(path)
+        ceramic.take_damage(10)
+        children = []
+        ceramic.destroyed(children, crowds)
+        assert [child.count for child in children] == counts
+
+
+def test_split_front_keeps_order_and_effects():
+    effects = StatusEffects()
+    ahead, crowd, behind = Ceramic(path, start_distance=100), Ceramic(path, start_distance=50), Ceramic(path, start_distance=50)
+    crowd.count = 3
+    crowd.take_area_damage(4)
+    crowd.take_damage(2)
+    effects.apply(crowd, SLOW, 0.5, "ice", 10.0)
+    enemies = [ahead, crowd, behind]
+    grid = SpatialHash()
+    grid.rebuild(enemies)
+
+    rest = crowd.split_front(enemies, grid, effects)
+    assert enemies == [ahead, crowd, rest, behind]
+    assert grid.query_circle(crowd.x, crowd.y, 1) == [crowd, rest, behind]
+    assert (crowd.count, crowd.health) == (1, 4)
+    assert (rest.count, rest.health, rest.crowd_health) == (2, 6, 6)
+    assert (rest.x, rest.y, rest.speed) == (crowd.x, crowd.y, crowd.speed)
+    effects.expire(11.0)
+    assert rest.speed == rest.base_speed
+    assert behind.split_front(enemies, grid, effects) is None
+
+
+@pytest.mark.parametrize("use_enemy_store", [False, True])
+def test_single_target_effects_split_crowds(monkeypatch, use_enemy_store):
+    """A slowing dart or sniper shot slows only the bloon it hits, not the rest of its crowd."""
+    if use_enemy_store:
+        pytest.importorskip("numpy")
+    splits = []
+    split_front = enemy.Enemy.split_front
+    monkeypatch.setattr(enemy.Enemy, "split_front",
+                        lambda self, *args: splits.append(split_front(self, *args)) or splits[-1])
+
+    results = []
+    for use_crowds in (True, False):
+        game, _ = build_game(PIERCE_LAYOUT[1:], CROWD_WAVES[3:], seed=1, use_crowds=use_crowds,
+                             use_enemy_store=use_enemy_store)
+        for tower in game.towers:
+            tower.projectile_config['on_hit_effects'] = ['slow']
+        results.append(_play(game))
+    assert results[0] == results[1]
+    assert any(rest is not None for rest in splits)
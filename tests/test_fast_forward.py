@@ -0,0 +1,55 @@
+# test_fast_forward.py
+"""
+Game.advance: fast-forward speeds scale the ticks run per frame, and the tick budget caps them.
+"""
+import pytest
+
+import game as game_module
+from game import MAX_FRAME_TIME, FAST_FORWARD_BUDGET
+from enemy_info import ALL_WAVES
+from headless import build_game
+
+
+def _game():
+    return build_game([{"type": "Dart Monkey", "x": 225, "y": 525}], ALL_WAVES[:5], health=1000)[0]
+
+
+@pytest.fixture
+def game():
+    return _game()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake perf_counter that moves 1 ms every time it is read, as if each tick took 1 ms."""
+    now = [0.0]
+
+    def perf_counter():
+        now[0] += 0.001
+        return now[0]
+    monkeypatch.setattr(game_module.time, 'perf_counter', perf_counter)
+    return now
+
+
+@pytest.mark.parametrize("speed, ticks", [(1, 5), (2, 10), (4, 21)])
+def test_speed_scales_the_ticks_per_frame(game, speed, ticks):
+    assert game.advance(0.09, speed=speed) == ticks
+    assert game.time == pytest.approx(ticks * game.tick_dt)
+    assert 0.0 <= game.accumulator < game.tick_dt # The rest of the frame is carried over
+
+
+def test_stalls_are_capped_before_scaling(game):
+    assert game.advance(5.0, speed=4) == _game().advance(MAX_FRAME_TIME, speed=4) > 0
+
+
+def test_budget_drops_the_backlog(game, clock):
+    assert game.advance(MAX_FRAME_TIME, speed=4, budget=0.0055) == 6 # The tick that runs past 5.5 ms is the last
+    assert game.accumulator <= game.tick_dt # Dropped, not carried into the next frame
+    assert game.advance(0.0, speed=4, budget=0.0055) <= 1
+
+
+def test_max_speed_runs_until_the_budget_is_spent(game, clock):
+    ticks = game.advance(0.0, speed=None)
+    assert ticks == round(FAST_FORWARD_BUDGET / 0.001) # The 12th tick ends exactly at the deadline
+    assert game.accumulator == 0.0
+    assert game.advance(0.0, speed=None, budget=0.0025) == 3
@@ -0,0 +1,44 @@
+# test_microbenchmark.py
+"""
+microbenchmark: the scaling fit, the baseline comparison and every case's setup.
+"""
+import pytest
+
+from microbenchmark import CASES, fit_scaling, compare_to_baseline, run_cases
+
+SIZES = (100, 1000, 10000)
+
+
+@pytest.mark.parametrize("power, complexity", [(0, 'O(1)'), (1, 'O(n)'), (2, 'O(n^2)')])
+def test_fit_scaling_finds_the_exponent(power, complexity):
+    fit = fit_scaling(SIZES, [1e-6 * n ** power for n in SIZES])
+    assert fit['exponent'] == pytest.approx(power)
+    assert fit['complexity'] == complexity
+    assert fit['quadratic'] == (power == 2)
+
+
+def test_fit_scaling_ignores_overhead_bound_small_sizes():
+    fit = fit_scaling((10,) + SIZES, [1.0] + [1e-6 * n for n in SIZES])
+    assert fit['exponent'] == pytest.approx(1.0)
+    assert fit_scaling((10,), [1e-6])['complexity'] == 'unknown'
+
+
+def _results(calibration, times):
+    return {'calibration_us': calibration, 'cases': {'case': {'us_per_call': times}}}
+
+
+def test_baseline_is_scaled_by_calibration():
+    baseline = _results(10.0, {'100': 4.0, '1000': 40.0})
+    # The machine is twice as slow: twice the time is no regression, but more than 2.5x is
+    assert compare_to_baseline(_results(20.0, {'100': 8.0, '1000': 80.0}), baseline) == []
+    regressions = compare_to_baseline(_results(20.0, {'100': 8.0, '1000': 120.0, '10000': 1.0}), baseline)
+    assert regressions == [{'case': 'case', 'n': 1000, 'baseline_us': 80.0, 'current_us': 120.0, 'ratio': 1.5}]
+
+
+def test_every_case_runs():
+    results = run_cases(sizes=(10, 20))
+    assert results['calibration_us'] > 0
+    assert set(results['cases']) == set(CASES)
+    for report in results['cases'].values():
+        assert set(report['us_per_call']) == {'10', '20'}
+        assert all(time > 0 for time in report['us_per_call'].values())
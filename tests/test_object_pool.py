@@ -0,0 +1,62 @@
+# test_object_pool.py
+"""
+object_pool: released bloons and projectiles come back from acquire() fully reinitialised.
+"""
+import pytest
+
+import object_pool
+from object_pool import acquire, release, pool_stats, clear_pools
+from enemy import Red, Ceramic
+from enemy_info import path
+from projectiles import DartProjectile, TackProjectile
+
+
+@pytest.fixture(autouse=True)
+def _empty_pools():
+    clear_pools()
+    yield
+    clear_pools()
+
+
+def test_released_object_is_reused_as_new():
+    dart = acquire(DartProjectile, None, 10.0, 10.0, (50.0, 10.0), pierce=5, damage=3)
+    dart.pierce = 0
+    dart.age = 1.5
+    release(dart)
+    again = acquire(DartProjectile, None, 20.0, 30.0, (60.0, 30.0))
+    fresh = DartProjectile(None, 20.0, 30.0, (60.0, 30.0))
+    assert again is dart
+    for field in ('x', 'y', 'pierce', 'max_pierce', 'damage', 'age', 'velocity', 'trail_points'):
+        assert getattr(again, field) == getattr(fresh, field)
+    assert pool_stats() == {'created': 1, 'reused': 1, 'released': 1, 'free': 0}
+
+
+def test_recycled_bloon_forgets_its_previous_life():
+    bloon = acquire(Ceramic, path, start_distance=300.0)
+    bloon.take_damage(4)
+    bloon.status_effects['slow'] = 'stale'
+    release(bloon)
+    again = acquire(Ceramic, path)
+    fresh = Ceramic(path)
+    assert again is bloon
+    for field in ('health', 'max_health', 'distance_travelled', 'x', 'y', 'speed', 'count', 'status_effects', 'frozen'):
+        assert getattr(again, field) == getattr(fresh, field)
+
+
+def test_free_lists_are_per_class_and_bounded(monkeypatch):
+    monkeypatch.setattr(object_pool, 'MAX_FREE_PER_CLASS', 2)
+    darts = [DartProjectile(None, 0.0, 0.0, (1.0, 0.0)) for _ in range(3)]
+    for dart in darts:
+        release(dart)
+    assert pool_stats()['free'] == 2 # The third dart was left to the garbage collector
+    tack = acquire(TackProjectile, None, 0.0, 0.0, (1.0, 0.0))
+    assert type(tack) is TackProjectile and tack not in darts
+    assert acquire(Red, path) not in darts
+
+
+def test_clear_pools_drops_objects_and_counters():
+    release(acquire(Red, path))
+    clear_pools()
+    assert pool_stats() == {'created': 0, 'reused': 0, 'released': 0, 'free': 0}
+    assert acquire(Red, path) is not None
+    assert pool_stats()['created'] == 1
@@ -0,0 +1,72 @@
+# test_placement.py
+"""
+Tower placement: what blocks a spot, and that the checks stay quiet for headless tooling.
+"""
+from game import Game
+from enemy_info import path
+
+
+def test_refused_placements_print_nothing(capsys):
+    game = Game(seed=0)
+    x, y = path[1]
+    assert game.place_tower("Dart Monkey", x, y, pay=False) is None # On the path
+    assert game.place_tower("Dart Monkey", 100, 100, pay=False) is not None
+    assert game.place_tower("Dart Monkey", 110, 100, pay=False) is None # On the first tower
+    assert game.place_tower("No Such Tower", 300, 100, pay=False) is None
+    assert capsys.readouterr().out == ""
+
+
+def test_upgrades_and_abilities_print_nothing(capsys):
+    quiet_wave = [{"type": "Red", "amount": 1, "delay_from_start": 100.0, "spawn_delay": 1.0}]
+    game = Game(waves=[quiet_wave], seed=0)
+    tower = game.place_tower("Ice Tower", 100, 100, pay=False)
+    for path_number, tier in ((1, 1), (3, 1), (3, 2)): # Locks path 2, unlocks Absolute Zero
+        assert game.upgrade_tower(tower, path_number, tier, pay=False)
+    while game.time <= tower.ability_cooldown and not game.finished:
+        game.step()
+    assert tower.upgrades_locked_path == 2
+    assert tower.last_ability_time > 0 # Absolute Zero went off
+    assert capsys.readouterr().out == ""
+
+
+def _mask_disagreements(mask, towers, step):
+    """Positions (on a grid of the given spacing) where the mask and the exact checks differ."""
+    import game
+    wrong = []
+    for y in range(0, mask.height, step):
+        for x in range(0, mask.width, step):
+            exact = (game.is_on_path(x, y, path, 30), game.is_overlapping_tower(x, y, 25, towers))
+            if (mask.is_on_path(x, y), mask.is_overlapping_tower(x, y)) != exact:
+                wrong.append((x, y))
+    return wrong
+
+
+def test_placement_mask_matches_exact_checks():
+    game = Game(seed=0)
+    for x, y in ((100, 100), (380, 230), (151, 100), (640, 500), (899, 749)):
+        game.place_tower("Dart Monkey", x, y, pay=False)
+    mask = game.get_placement_mask()
+    assert len(game.towers) == 5
+    assert _mask_disagreements(mask, game.towers, step=3) == []
+    removed = game.towers.pop(1)
+    mask.remove_tower(removed)
+    assert _mask_disagreements(mask, game.towers, step=3) == []
+
+
+def test_placement_mask_without_numpy_matches(monkeypatch):
+    import placement_mask
+    from placement_mask import PlacementMask
+    with_numpy = PlacementMask(path, 30, 25, width=300, height=200)
+    monkeypatch.setattr(placement_mask, "NUMPY_AVAILABLE", False)
+    without_numpy = PlacementMask(path, 30, 25, width=300, height=200)
+    assert any(with_numpy.path_blocked)
+    assert without_numpy.path_blocked == with_numpy.path_blocked
+
+
+def test_off_field_and_fractional_positions_use_exact_checks():
+    game = Game(seed=0)
+    x, y = path[1]
+    assert game.placement_blocker(x + 0.5, y) == "path"
+    assert game.placement_blocker(950, 100) is None # Right of the field, not covered by the mask
+    game.place_tower("Dart Monkey", 100, 100, pay=False)
+    assert game.placement_blocker(120.5, 100) == "tower"
@@ -0,0 +1,43 @@
+# test_pop_cascade.py
+"""
+Overflow damage carrying into a popped bloon's children (enemy.resolve_pop, Enemy.destroyed).
+"""
+import pytest
+
+from enemy import BLOON_CLASSES, Ceramic, Black, White, Zebra, Rainbow, bloon_layer, resolve_pop
+from enemy_info import path
+
+
+def _total_health(bloon_class):
+    """Damage needed to pop a bloon and every layer inside it."""
+    health, _, contains = bloon_layer(bloon_class)
+    return health + sum(_total_health(child) for child in contains)
+
+
+def test_ceramic_overflow_pops_one_branch():
+    ceramic = Ceramic(path)
+    ceramic.take_damage(13)
+    children = []
+    assert ceramic.destroyed(children) == (3, 220) # Ceramic, Rainbow, Zebra
+    assert [(type(child), child.health, child.count) for child in children] == [
+        (Black, 1, 1), (White, 2, 1), (Zebra, 1, 1), (Rainbow, 1, 1)]
+
+
+def test_exact_pop_spawns_whole_children():
+    survivors = []
+    assert resolve_pop([Rainbow, Rainbow], 0, survivors) == (0, 0, 0)
+    assert survivors == [(Rainbow, 1), (Rainbow, 1)]
+
+
+@pytest.mark.parametrize("name", sorted(BLOON_CLASSES))
+@pytest.mark.parametrize("overflow", [0, 1, 2.5, 7, 30, 1000])
+def test_overflow_is_spent_once(name, overflow):
+    """Every point of overflow pops a layer or damages a survivor, never both, and none is dealt twice."""
+    bloon_class = BLOON_CLASSES[name]
+    contains = bloon_layer(bloon_class)[2]
+    survivors = []
+    layers, money, left = resolve_pop(contains, overflow, survivors)
+    remaining = sum(health + _total_health(child) - bloon_layer(child)[0] for child, health in survivors)
+    spent = sum(_total_health(child) for child in contains) - remaining
+    assert spent == pytest.approx(overflow - left)
+    assert left == 0 or not survivors
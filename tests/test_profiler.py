@@ -0,0 +1,65 @@
+# test_profiler.py
+"""
+FrameProfiler: phase times add up per frame, the ring keeps the latest frames and the CSV export.
+"""
+import csv
+
+import pytest
+
+import profiler
+from profiler import FrameProfiler, PHASES, COUNTS
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake perf_counter that only moves when the test advances it."""
+    now = [0.0]
+    monkeypatch.setattr(profiler.time, 'perf_counter', lambda: now[0])
+    return now
+
+
+def _frame(frame_profiler, clock, towers_ms, enemies=0):
+    frame_profiler.begin_frame()
+    for _ in range(2): # Two ticks in the frame; their times add up
+        with frame_profiler.scope('towers'):
+            clock[0] += towers_ms / 2000
+    frame_profiler.end_frame(enemies=enemies, projectiles=1, ticks=2)
+
+
+def test_disabled_profiler_records_nothing(clock):
+    frame_profiler = FrameProfiler(capacity=4)
+    _frame(frame_profiler, clock, 5.0)
+    assert frame_profiler.recent_frames() == []
+    assert frame_profiler.phase_times[0] == [0.0] * len(PHASES)
+
+
+def test_ring_keeps_the_latest_frames_in_order(clock):
+    frame_profiler = FrameProfiler(capacity=3)
+    frame_profiler.enabled = True
+    for i in range(5):
+        _frame(frame_profiler, clock, float(i + 1), enemies=i)
+    frames = frame_profiler.recent_frames()
+    assert [number for number, _, _ in frames] == [2, 3, 4]
+    towers = PHASES.index('towers')
+    assert [times[towers] for _, times, _ in frames] == pytest.approx([0.003, 0.004, 0.005])
+    assert [counts for _, _, counts in frames] == [[2, 1, 2], [3, 1, 2], [4, 1, 2]]
+    assert [number for number, _, _ in frame_profiler.recent_frames(2)] == [3, 4]
+    assert [number for number, _, _ in frame_profiler.worst_frames(2)] == [4, 3]
+    frame_profiler.clear()
+    assert frame_profiler.recent_frames() == []
+
+
+def test_export_csv(clock, tmp_path):
+    frame_profiler = FrameProfiler(capacity=8)
+    frame_profiler.enabled = True
+    _frame(frame_profiler, clock, 2.0, enemies=7)
+    _frame(frame_profiler, clock, 4.0, enemies=9)
+    out = tmp_path / "frames.csv"
+    assert frame_profiler.export_csv(out) == 2
+    with open(out, newline='') as csv_file:
+        rows = list(csv.DictReader(csv_file))
+    assert list(rows[0]) == ['frame', 'total_ms'] + [f'{phase}_ms' for phase in PHASES] + COUNTS
+    assert [row['frame'] for row in rows] == ['0', '1']
+    assert [float(row['total_ms']) for row in rows] == [2.0, 4.0]
+    assert [float(row['towers_ms']) for row in rows] == [2.0, 4.0]
+    assert [row['enemies'] for row in rows] == ['7', '9']
@@ -0,0 +1,84 @@
+# test_renderer.py
+"""
+FrameRenderer: only the areas drawn this frame and last frame reach the display, and a layout
+change repaints and flips the whole window.
+"""
+from types import SimpleNamespace
+
+import pygame
+import pytest
+
+from renderer import FrameRenderer
+
+GRASS = (0, 120, 0)
+PATH = (150, 100, 50)
+SPRITE = (255, 0, 0)
+
+
+class _TowerBody:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+    def draw_body(self, surface):
+        pygame.draw.circle(surface, (0, 0, 255), (self.x, self.y), 5)
+
+
+@pytest.fixture
+def display(monkeypatch):
+    """A dummy 200x200 window whose flips and updates are recorded instead of shown."""
+    pygame.display.init()
+    screen = pygame.display.set_mode((200, 200))
+    calls = []
+    monkeypatch.setattr(pygame.display, 'flip', lambda: calls.append('flip'))
+    monkeypatch.setattr(pygame.display, 'update', lambda rects: calls.append([pygame.Rect(r) for r in rects]))
+    yield screen, calls
+    pygame.display.quit()
+
+
+def _game():
+    return SimpleNamespace(path=[(0, 100), (200, 100)], path_thickness=20, towers=[], layout_version=0)
+
+
+def test_only_dirty_rects_are_updated(display):
+    screen, calls = display
+    renderer = FrameRenderer(screen, _game(), GRASS, PATH)
+
+    renderer.begin_frame()
+    assert screen.get_at((10, 10))[:3] == GRASS and screen.get_at((10, 100))[:3] == PATH
+    renderer.end_frame([])
+    assert calls == ['flip'] # The first frame shows the whole background
+
+    first = screen.fill(SPRITE, (20, 20, 10, 10))
+    renderer.end_frame([first, None])
+    assert calls[-1] == [first]
+
+    renderer.begin_frame()
+    assert screen.get_at((25, 25))[:3] == GRASS # The sprite moved away; the grass is back
+    second = screen.fill(SPRITE, (30, 20, 10, 10))
+    renderer.end_frame([second])
+    assert calls[-1] == [first, second] # The old area is updated too, or the sprite would stay on screen
+    assert len(calls) == 3
+
+
+def test_layout_change_rerenders_the_background(display):
+    screen, calls = display
+    game = _game()
+    renderer = FrameRenderer(screen, game, GRASS, PATH)
+    renderer.begin_frame()
+    renderer.end_frame([])
+
+    game.towers.append(_TowerBody(50, 50))
+    renderer.begin_frame()
+    renderer.end_frame([])
+    assert screen.get_at((50, 50))[:3] == GRASS # Same layout_version: the cached background is kept
+
+    game.layout_version += 1
+    renderer.begin_frame()
+    assert screen.get_at((50, 50))[:3] == (0, 0, 255)
+    renderer.end_frame([])
+    assert calls == ['flip', [], 'flip']
+
+    renderer.invalidate()
+    renderer.begin_frame()
+    renderer.end_frame([])
+    assert calls[-1] == 'flip'
@@ -0,0 +1,68 @@
+# test_replay.py
+"""
+Recording games and playing them back exactly (replay.py), from a new game or a resumed one.
+"""
+import math
+
+import pytest
+
+from enemy_info import ALL_WAVES
+from headless import build_game
+from replay import ReplayRecorder, load_replay, play_replay
+from snapshot import save_snapshot, load_snapshot
+
+LAYOUT = [
+    {"type": "Tack Shooter", "x": 380, "y": 230, "upgrades": {1: 2}},
+    {"type": "Cannon Tower", "x": 675, "y": 525, "upgrades": {3: 2}},
+    {"type": "Dartling Gunner", "x": 380, "y": 380},
+]
+WAVES = ALL_WAVES[:4]
+
+
+def _play_with_inputs(game, until_tick):
+    """Steps a game with a moving mouse, buying and upgrading a tower on the way."""
+    while not game.finished and game.tick_count < until_tick:
+        tick = game.tick_count
+        if tick == 200:
+            game.place_tower("Dart Monkey", 225, 525)
+        if tick == 400:
+            game.upgrade_tower(game.towers[-1], 2, 1)
+        mouse = (int(300 + 100 * math.sin(tick / 50)), int(300 + 100 * math.cos(tick / 70))) if tick % 3 else None
+        game.step(mouse)
+
+
+def _save_and_play(recorder, tmp_path, **overrides):
+    file_path = tmp_path / "game.replay.json"
+    assert recorder.save(file_path) == len(recorder.commands) + len(recorder.mouse)
+    return play_replay(load_replay(file_path), **overrides)
+
+
+def test_replay_round_trip(tmp_path):
+    game, _ = build_game(LAYOUT, WAVES, money=5000, seed=7, record=True)
+    _play_with_inputs(game, 900)
+    assert game.recorder.commands[-2:] == [[200, 'place', "Dart Monkey", 225, 525, True], [400, 'upgrade', 3, 2, 1, True]]
+    report = _save_and_play(game.recorder, tmp_path)
+    assert report['matches']
+    assert report['result']['tick_count'] == 900
+    assert report['result']['pops'] == game.pops > 0
+
+
+def test_recording_a_resumed_game_starts_from_its_snapshot(tmp_path):
+    game, _ = build_game(LAYOUT, WAVES, money=5000, seed=7)
+    _play_with_inputs(game, 150)
+    resumed = load_snapshot(save_snapshot(game), waves=WAVES)
+    recorder = ReplayRecorder(resumed)
+    assert 'snapshot' in recorder.header
+    _play_with_inputs(resumed, 900)
+    report = _save_and_play(recorder, tmp_path)
+    assert report['matches']
+    assert report['result'] == {'tick_count': 900, 'health': resumed.health, 'money': resumed.money,
+                                'pops': resumed.pops, 'leaks': resumed.leaks}
+
+
+def test_snapshot_replay_keeps_its_backends(tmp_path):
+    pytest.importorskip("numpy")
+    game, _ = build_game(LAYOUT, WAVES, seed=7)
+    game.step()
+    with pytest.raises(ValueError, match="snapshot"):
+        _save_and_play(ReplayRecorder(game), tmp_path, use_enemy_store=True)
@@ -0,0 +1,31 @@
+# test_slots.py
+"""
+Bloons and projectiles declare their fields in __slots__: no instance carries a __dict__, so a
+misspelt attribute fails loudly instead of quietly growing the object.
+"""
+import pytest
+
+from enemy import BLOON_CLASSES
+from enemy_info import path
+from projectiles import HitscanProjectile
+from snapshot import PROJECTILE_TYPES
+
+
+def _assert_slotted(instance):
+    assert not hasattr(instance, '__dict__')
+    with pytest.raises(AttributeError):
+        instance.not_a_field = 1
+
+
+@pytest.mark.parametrize("bloon_class", list(BLOON_CLASSES.values()), ids=list(BLOON_CLASSES))
+def test_bloons_have_no_instance_dict(bloon_class):
+    _assert_slotted(bloon_class(path))
+
+
+@pytest.mark.parametrize("projectile_class", PROJECTILE_TYPES, ids=lambda cls: cls.__name__)
+def test_projectiles_have_no_instance_dict(projectile_class):
+    _assert_slotted(projectile_class(None, 100.0, 100.0, (200.0, 100.0)))
+
+
+def test_hitscan_has_no_instance_dict():
+    _assert_slotted(HitscanProjectile(None, BLOON_CLASSES["Red"](path)))
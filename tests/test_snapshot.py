@@ -0,0 +1,103 @@
+# test_snapshot.py
+"""
+Saving and restoring a game mid-wave (snapshot.py): a restored game must play on exactly like
+the one that was saved, with every backend.
+"""
+import sys
+import itertools
+import tracemalloc
+
+import pytest
+
+import path_geometry
+from enemy import Red
+from enemy_info import ALL_WAVES, path
+from headless import build_game
+from path_geometry import get_path_geometry
+from snapshot import save_snapshot, load_snapshot, write_snapshot, read_snapshot
+
+LAYOUT = [
+    {"type": "Tack Shooter", "x": 380, "y": 230, "upgrades": {1: 2, 3: 1}},
+    {"type": "Sniper Monkey", "x": 520, "y": 380, "upgrades": {1: 1, 3: 2}},
+    {"type": "Cannon Tower", "x": 675, "y": 525, "upgrades": {1: 1, 3: 2}},
+    {"type": "Dartling Gunner", "x": 380, "y": 380},
+    {"type": "Ice Tower", "x": 250, "y": 340},
+    {"type": "Banana Farm", "x": 100, "y": 100},
+]
+WAVES = [ALL_WAVES[index] for index in (17, 23, 28)]
+
+
+def _finish(game):
+    while not game.finished:
+        game.step()
+    return (game.tick_count, game.health, game.money, game.pops, game.leaks, game.wave_results)
+
+
+@pytest.mark.parametrize("options", [{}, {"use_enemy_store": True, "use_projectile_pool": True}])
+def test_restored_game_plays_on_like_the_saved_one(options):
+    if options:
+        pytest.importorskip("numpy")
+    game, _ = build_game(LAYOUT, WAVES, seed=3, **options)
+    while not (len(game.enemy_list) >= 8 and game.projectile_count() and len(game.status_effects)):
+        assert not game.finished
+        game.step() # On to mid-wave: bloons, projectiles and slows all in play
+    data = save_snapshot(game)
+    restored = load_snapshot(data, WAVES)
+    restored.layout_version = game.layout_version # Bumped by load_snapshot, so cached drawings are redone
+    assert save_snapshot(restored) == data
+    assert _finish(restored) == _finish(game)
+
+
+def test_snapshot_file_round_trip(tmp_path):
+    game, _ = build_game(LAYOUT, WAVES, seed=3)
+    for _ in range(300):
+        game.step()
+    file_path = str(tmp_path / "autosave.tds")
+    assert write_snapshot(game, file_path) == len(save_snapshot(game))
+    restored = read_snapshot(file_path, WAVES)
+    restored.layout_version = game.layout_version
+    assert save_snapshot(restored) == save_snapshot(game)
+
+
+def test_snapshot_needs_the_same_waves():
+    game, _ = build_game(LAYOUT, WAVES, seed=3)
+    with pytest.raises(ValueError, match="waves"):
+        load_snapshot(save_snapshot(game), WAVES[:2])
+
+
+def test_path_geometry_is_looked_up_by_points():
+    points = [list(point) for point in path]
+    references = sys.getrefcount(points)
+    geometry = get_path_geometry(points)
+    assert sys.getrefcount(points) == references # The cache doesn't hold on to the caller's list
+    assert get_path_geometry(path) is geometry
+    points[-1] = [points[-1][0] + 50, points[-1][1]] # Changed in place: same list, new points
+    moved = get_path_geometry(points)
+    assert moved is not geometry
+    assert moved.points[-1] == (path[-1][0] + 50, path[-1][1])
+
+
+def test_spawning_on_the_same_path_allocates_no_geometry_key():
+    geometry = get_path_geometry(path)
+    spawns = itertools.repeat(path, 1000) # Created before tracing, like the bloons' path itself
+    tracemalloc.start()
+    for same_path in spawns:
+        get_path_geometry(same_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak == 0
+    assert Red(path).geometry is geometry
+    assert get_path_geometry(list(path)) is geometry # Equal points, another list
+
+
+def test_path_geometry_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(path_geometry, "MAX_PATH_GEOMETRIES", 3)
+    monkeypatch.setattr(path_geometry, "_geometries", {})
+    first = get_path_geometry([(0, 0), (10, 0)])
+    for length in (20, 30):
+        get_path_geometry([(0, 0), (length, 0)])
+    assert get_path_geometry([(0, 0), (10, 0)]) is first # Used again: now the most recent
+    get_path_geometry([(0, 0), (40, 0)]) # Drops the least recently used, (20, 0)
+    assert len(path_geometry._geometries) == 3
+    assert ((0, 0), (20, 0)) not in path_geometry._geometries
+    assert get_path_geometry([(0, 0), (10, 0)]) is first
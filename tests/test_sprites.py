@@ -0,0 +1,67 @@
+# test_sprites.py
+"""
+The shared sprite and text caches: one surface per look, reused until the cache drops it.
+"""
+import pygame
+import pytest
+
+import sprites
+from sprites import get_text_surface, clear_sprite_cache
+
+
+@pytest.fixture
+def display():
+    """A dummy window (needed to convert images) and empty caches, torn down afterwards."""
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((100, 100))
+    clear_sprite_cache()
+    yield
+    clear_sprite_cache()
+    pygame.display.quit()
+
+
+def test_text_is_rendered_once_per_font_text_and_color(display):
+    font = pygame.font.Font(None, 20)
+    money = get_text_surface(font, "Money: 650", (255, 255, 0))
+    assert get_text_surface(font, "Money: 650", (255, 255, 0)) is money
+    assert get_text_surface(font, "Money: 650", (255, 255, 255)) is not money
+    assert get_text_surface(font, "Money: 700", (255, 255, 0)) is not money
+    assert money.get_size() == font.size("Money: 650")
+
+
+def test_text_cache_drops_the_least_recently_used(display, monkeypatch):
+    monkeypatch.setattr(sprites, 'TEXT_CACHE_SIZE', 2)
+    font = pygame.font.Font(None, 20)
+    first = get_text_surface(font, "a", (0, 0, 0))
+    second = get_text_surface(font, "b", (0, 0, 0))
+    assert get_text_surface(font, "a", (0, 0, 0)) is first # "a" is now the most recent use
+    get_text_surface(font, "c", (0, 0, 0))
+    assert len(sprites._text_surfaces) == 2
+    assert get_text_surface(font, "a", (0, 0, 0)) is first
+    assert get_text_surface(font, "b", (0, 0, 0)) is not second # Dropped, so rendered again
+
+
+@pytest.fixture
+def drawing(display, monkeypatch):
+    """Sprites are loaded from the repository's bloons folder, as in the game."""
+    monkeypatch.chdir(sprites.os.path.dirname(sprites.os.path.abspath(sprites.__file__)))
+    sprites.set_headless(False)
+    yield
+    sprites.set_headless(True)
+
+
+def test_camo_overlay_is_painted_into_the_shared_sprite(drawing):
+    from enemy import Red
+    from enemy_info import path
+
+    plain = sprites.get_bloon_sprite("Red", 30, 30)
+    camo = sprites.get_bloon_sprite("Red", 30, 30, is_camo=True)
+    assert camo is not plain
+    assert sprites.get_bloon_sprite("Red", 30, 30, is_camo=True) is camo
+    assert pygame.image.tobytes(camo, "RGBA") != pygame.image.tobytes(plain, "RGBA")
+    assert sprites.get_bloon_sprite("Red", 30, 30) is plain # Painting the overlay left the plain sprite alone
+
+    bloons = [Red(path, is_camo=True) for _ in range(3)]
+    assert all(bloon.image is bloons[0].image for bloon in bloons)
+    assert bloons[0].image is sprites.get_bloon_sprite("Red", bloons[0].width, bloons[0].height, is_camo=True)
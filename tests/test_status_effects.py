@@ -0,0 +1,68 @@
+# test_status_effects.py
+"""
+StatusEffects: applying, refreshing, removing and expiring timed effects through the heap.
+"""
+from types import SimpleNamespace
+
+from status_effects import StatusEffects, SLOW, FREEZE, STUN, apply_on_hit_effects
+
+
+def _bloon(speed=2.0):
+    return SimpleNamespace(base_speed=speed, speed=speed, frozen=False, status_effects={})
+
+
+def test_strongest_slow_wins_and_expiry_restores_speed():
+    effects = StatusEffects()
+    bloon = _bloon()
+    effects.apply(bloon, SLOW, 0.8, "glue", 5.0)
+    effects.apply(bloon, SLOW, 0.5, "ice", 3.0)
+    assert bloon.speed == 1.0
+    assert effects.expire(3.5) == 1 # The Ice slow ran out; the weaker glue slow is left
+    assert bloon.speed == 1.6
+    assert effects.expire(5.5) == 1
+    assert bloon.speed == 2.0 and bloon.status_effects == {}
+    assert len(effects) == 0
+
+
+def test_refresh_keeps_later_expiry_without_a_second_entry():
+    effects = StatusEffects()
+    bloon = _bloon()
+    effects.apply(bloon, FREEZE, 0, "ice", 1.0)
+    effects.apply(bloon, FREEZE, 0, "ice", 4.0)
+    effects.apply(bloon, FREEZE, 0, "ice", 2.0) # An earlier expiry never shortens the effect
+    assert len(effects) == 1
+    assert effects.expire(1.5) == 0 # The old entry is pushed again with the new time
+    assert bloon.frozen
+    assert effects.expire(4.5) == 1
+    assert not bloon.frozen
+
+
+def test_refresh_takes_the_new_magnitude():
+    effects = StatusEffects()
+    bloon = _bloon()
+    effects.apply(bloon, SLOW, 0.5, "ice", 2.0)
+    effects.apply(bloon, SLOW, 0.25, "ice", 2.0)
+    assert bloon.speed == 0.5
+
+
+def test_removed_and_recycled_bloons_are_dropped():
+    effects = StatusEffects()
+    removed, recycled = _bloon(), _bloon()
+    effects.apply(removed, STUN, 0, "bomb", 1.0)
+    effects.apply(recycled, SLOW, 0.5, "ice", 1.0)
+    effects.remove(removed, STUN, "bomb")
+    assert not removed.frozen
+    recycled.status_effects = {} # What Enemy.reset does when object_pool reuses the bloon
+    assert effects.expire(2.0) == 0
+    assert len(effects) == 0
+
+
+def test_on_hit_effects():
+    effects = StatusEffects()
+    bloon = _bloon()
+    apply_on_hit_effects(effects, bloon, ['slow', 'stun'], "tower", 10.0)
+    assert bloon.speed == 1.0 and bloon.frozen
+    effects.expire(11.5) # The stun lasts 1 s, the slow 2 s
+    assert bloon.speed == 1.0 and not bloon.frozen
+    effects.expire(12.5)
+    assert bloon.speed == 2.0
@@ -0,0 +1,82 @@
+# test_wave_timeline.py
+"""
+Wave compilation, the timeline cache and the spawn scheduler's catch-up of late spawns.
+"""
+import pytest
+
+import wave_timeline
+from enemy import Red, Blue
+from enemy_info import path
+from game import Game
+from wave_timeline import compile_wave, compile_waves, SpawnScheduler
+
+
+def _group(bloon_type, amount, delay_from_start=0.0, spawn_delay=1.0, **extra):
+    return dict({"type": bloon_type, "amount": amount, "delay_from_start": delay_from_start,
+                 "spawn_delay": spawn_delay}, **extra)
+
+
+def test_groups_follow_each_other():
+    events = compile_wave([_group("Red", 3, spawn_delay=0.5), _group("Blue", 2, delay_from_start=2.0)], path)
+    assert [(offset, bloon_class) for offset, bloon_class, *_ in events] == [
+        (0.0, Red), (0.5, Red), (1.0, Red), (3.0, Blue), (4.0, Blue)]
+
+
+def test_equal_waves_share_a_timeline():
+    first = compile_waves([[_group("Red", 3)]], path)
+    second = compile_waves([[_group("Red", 3)]], list(path))
+    assert first[0] is second[0]
+
+
+def test_changed_wave_list_is_compiled_again():
+    wave = [_group("Red", 3)]
+    before = compile_waves([wave], path)[0]
+    wave[0]["amount"] = 5
+    after = compile_waves([wave], path)[0]
+    assert len(before) == 3
+    assert len(after) == 5
+
+
+def test_changed_path_list_does_not_reach_cached_events():
+    own_path = [(0, 0), (100, 0)]
+    timeline = compile_waves([[_group("Red", 1, path=own_path)]], path)[0]
+    own_path.append((100, 100))
+    assert timeline[0][2] == ((0, 0), (100, 0))
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(wave_timeline, "MAX_COMPILED_WAVES", 4)
+    monkeypatch.setattr(wave_timeline, "_compiled", {})
+    compile_waves([[_group("Red", amount)] for amount in range(1, 11)], path)
+    assert len(wave_timeline._compiled) == 4
+
+
+def test_scheduler_hands_out_everything_due_in_order():
+    scheduler = SpawnScheduler()
+    scheduler.schedule(compile_wave([_group("Red", 4, spawn_delay=0.01)], path), start_time=1.0)
+    due = scheduler.pop_due(1.025)
+    assert [event[0] for event in due] == pytest.approx([1.0, 1.01, 1.02])
+    assert len(scheduler) == 1
+
+
+def test_late_spawns_catch_up_along_the_path():
+    # Five Reds 5 ms apart: four are due within the first 1/60 s tick and spawn in it together,
+    # each moved on by the part of the tick it missed
+    game = Game(waves=[[_group("Red", 5, spawn_delay=0.005)]], seed=0)
+    game.step()
+    spawned = game.enemy_list
+    assert len(spawned) == 4
+    speed = spawned[0].speed
+    for index, enemy in enumerate(spawned):
+        assert enemy.distance_travelled == pytest.approx(speed * (game.time - index * 0.005))
+
+
+def test_spawn_spacing_does_not_depend_on_tick_rate():
+    positions = []
+    for tick_rate in (30, 60, 240):
+        game = Game(waves=[[_group("Red", 10, spawn_delay=0.02)]], tick_rate=tick_rate, seed=0)
+        while game.time < 0.5 - 1e-9:
+            game.step()
+        positions.append([enemy.distance_travelled for enemy in game.enemy_list])
+    assert positions[1] == pytest.approx(positions[0])
+    assert positions[2] == pytest.approx(positions[0])
@@ -1,4 +1,7 @@
 from projectiles import Projectile, DartProjectile, CannonProjectile, TackProjectile, HitscanProjectile, SpikeProjectile, CrossbowProjectile, BladeProjectile, RocketProjectile, ShrapnelProjectile
+from spatial_hash import enemies_in_range
+from status_effects import StatusEffects, SLOW, FREEZE, AURA_LINGER
+from object_pool import acquire, release
 import pygame
 import math
 import random
@@ -208,6 +211,9 @@ class Tower:
         self.fire_rate = 1.0  # Current shots per second (attacks per second)
         self.last_shot = 0 # Time of the last shot, for cooldown calculation
         self.projectiles = [] # List of active projectiles fired by this tower
+        self.projectile_pool = None # Shared ProjectilePool set by the Game when pooling is on (see projectile_pool.py)
+        self.status_effects = StatusEffects() # Effect expiry queue; replaced by the Game's shared one when the tower is placed
+        self.rng = random # Source of random numbers; replaced by the Game's seeded stream when the tower is placed (see replay.py)
         self.projectile_type = Projectile # Class of projectile this tower fires
         self.projectile_config = self.PROJECTILE_CONFIG.copy() # Current configuration for projectiles
 
@@ -220,56 +226,27 @@ class Tower:
         self.upgrades_locked_path = None # Stores which path (1, 2, or 3) is locked out after two paths are upgraded
         self.price = 0 # Base price, will be set by specific tower subclass
 
-    def find_target(self, enemies):
+    def find_target(self, enemies, grid=None):
         """
         Find the furthest enemy in range that the tower can pop.
-        Prioritizes enemies deeper into the track (higher current_path_index).
-        If multiple enemies are on the same path segment, prioritizes the one further along that segment.
+        Prioritizes enemies deeper into the track (higher distance_travelled along the path).
+        If a spatial hash (grid) is given, only enemies in nearby cells are considered.
         """
         furthest_enemy = None
-        max_path_index = -1 # Tracks the highest path index seen so far
-        max_distance_on_segment = -1.0 # Tracks progress along the current furthest segment
+        max_distance_travelled = -1.0 # Tracks the furthest progress seen so far
 
-        for enemy in enemies:
-            dist = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-            if dist <= self.range: # Check if enemy is within tower's attack range
-                # Check for camo immunity: if enemy is camo and tower cannot pop camo, skip
-                if enemy.is_camo and not self.projectile_config.get('can_pop_camo', False):
-                    continue
-
-                # Prioritize based on path index first (further along the track)
-                if enemy.current_path_index > max_path_index:
-                    furthest_enemy = enemy
-                    max_path_index = enemy.current_path_index
-                    # Calculate distance along the current segment for the new furthest enemy
-                    if enemy.current_path_index < len(enemy.path) - 1:
-                        p1 = enemy.path[enemy.current_path_index]
-                        p2 = enemy.path[enemy.current_path_index + 1]
-                        segment_length_sq = (p2[0] - p1[0])**2 + (p2[1] - p1[1])**2
-                        if segment_length_sq > 0: # Avoid division by zero if segment is a point
-                            # Project enemy's position onto the segment to get normalized distance (0 to 1)
-                            t = ((enemy.x - p1[0]) * (p2[0] - p1[0]) + (enemy.y - p1[1]) * (p2[1] - p1[1])) / segment_length_sq
-                            max_distance_on_segment = t
-                        else:
-                            max_distance_on_segment = 0.0 # At the start of a zero-length segment
-                    else: # Enemy is at the very end of the path
-                        max_distance_on_segment = 1.0 # Max progress value
-                elif enemy.current_path_index == max_path_index:
-                    # If on the same path segment, check which is further along that segment
-                    if enemy.current_path_index < len(enemy.path) - 1:
-                        p1 = enemy.path[enemy.current_path_index]
-                        p2 = enemy.path[enemy.current_path_index + 1]
-                        segment_length_sq = (p2[0] - p1[0])**2 + (p2[1] - p1[1])**2
-                        if segment_length_sq > 0:
-                            t = ((enemy.x - p1[0]) * (p2[0] - p1[0]) + (enemy.y - p1[1]) * (p2[1] - p1[1])) / segment_length_sq
-                            if t > max_distance_on_segment: # If this enemy is further along the same segment
-                                furthest_enemy = enemy
-                                max_distance_on_segment = t
-                        # else: Segment is a point, keep current furthest_enemy
-                    # else: Both are at the very end, keep the first one found (or current)
+        for enemy in enemies_in_range(enemies, self.x, self.y, self.range, grid): # Enemies within tower's attack range
+            # Check for camo immunity: if enemy is camo and tower cannot pop camo, skip
+            if enemy.is_camo and not self.projectile_config.get('can_pop_camo', False):
+                continue
+
+            # Path progress is a single precomputed number, so "further along" is one comparison
+            if enemy.distance_travelled > max_distance_travelled:
+                furthest_enemy = enemy
+                max_distance_travelled = enemy.distance_travelled
         return furthest_enemy
 
-    def fire(self, enemies: list, current_time: float):
+    def fire(self, enemies: list, current_time: float, grid=None):
         """
         Creates projectiles if the tower is ready to fire (cooldown passed) and a target is found.
         Passes the target's position (x, y) to the projectile.
@@ -278,7 +255,7 @@ class Tower:
         if current_time - self.last_shot < (1.0 / self.fire_rate): # Check if cooldown has passed
             return
 
-        target = self.find_target(enemies)
+        target = self.find_target(enemies, grid)
         if target:
             # Pass target's position at time of firing, not the enemy object itself (target might move)
             self.create_projectile((target.x, target.y))
@@ -288,53 +265,101 @@ class Tower:
         """
         Instantiates configured projectile type with given target position and tower's projectile_config.
         Adds the new projectile to the tower's list of active projectiles.
+        Recycles an expired projectile of the same type when one is available (see object_pool.py).
         """
-        projectile = self.projectile_type(
+        projectile = acquire(
+            self.projectile_type,
             self, # MODIFIED: Pass the tower itself as the source
             self.x, self.y, # Origin of projectile (tower's position)
             target_pos, # Target's static position at time of firing
             **self.projectile_config # Pass all projectile attributes (damage, speed, etc.)
         )
-        self.projectiles.append(projectile)
+        self.add_projectile(projectile)
+
+    def add_projectile(self, projectile):
+        """
+        Puts a newly fired projectile in flight. Straight-flying projectiles go to the shared
+        projectile pool when there is one; everything else is kept in self.projectiles.
+        """
+        if self.projectile_pool is not None and self.projectile_pool.accepts(projectile):
+            self.projectile_pool.add(projectile)
+            release(projectile) # The pool copied what it needs, so the object can be recycled right away
+        else:
+            self.projectiles.append(projectile)
 
-    def update_projectiles(self, screen, enemies: list, dt: float):
+    def update_projectiles(self, enemies: list, dt: float, current_time: float, effects_list: list, grid=None):
         """
         Updates the position of all active projectiles, handles collisions,
         applies damage and effects, and removes expired projectiles.
+        Nothing is drawn here; see draw_projectiles.
+        If a spatial hash (grid) is given, collisions and explosions only test nearby enemies.
         """
         # Iterate over a copy of the list (self.projectiles[:]) to safely remove elements during iteration
         for proj in self.projectiles[:]:
             proj.move(dt) # Update projectile's position based on delta time
 
             # Check for collisions with any enemy along its path
-            hit_enemy = proj.check_collision(enemies)
+            hit_enemy = proj.check_collision(enemies, grid)
 
             if hit_enemy:
                 # Apply damage and effects to the hit enemy
                 if hasattr(hit_enemy, 'take_damage'): # Check if enemy can take damage
                     hit_enemy.take_damage(proj.damage)
-                    proj.apply_effects(hit_enemy) # Apply any special projectile effects (e.g., slow)
+                    if proj.on_hit_effects: # Only the front bloon of a crowd was hit, so only it is slowed or stunned
+                        hit_enemy.split_front(enemies, grid, self.status_effects)
+                    proj.apply_effects(hit_enemy, current_time) # Apply any special projectile effects (e.g., slow)
                 proj.pierce -= 1 # Reduce pierce count after hitting an enemy
 
                 # If it's a CannonProjectile or RocketProjectile and has an AOE radius, trigger its explosion
                 if (isinstance(proj, CannonProjectile) or isinstance(proj, RocketProjectile)) and proj.aoe_radius > 0:
                     # Pass the current enemy list to the explosion to potentially damage multiple enemies
-                    proj.explode(screen, enemies)
+                    proj.explode(enemies, current_time, effects_list, grid)
 
             # Remove the projectile if it has no pierce left or has expired (e.g., reached max distance/lifespan)
             if proj.should_expire():
                 self.projectiles.remove(proj)
-            else:
-                proj.draw(screen) # Draw the projectile if it's still active
+                release(proj) # Recycle it for a later shot
+
+    def draw_projectiles(self, screen):
+        """
+        Draws all active projectiles fired by this tower.
+
+        Returns:
+            list of pygame.Rect: The areas drawn over (for dirty-rectangle updates).
+        """
+        return [proj.draw(screen) for proj in self.projectiles]
 
     def draw(self, screen, enemies: list): # enemies list currently unused here, but kept for consistency
         """
-        Draws the tower itself on the screen.
+        Draws the tower itself on the screen: its body, then anything that changes from frame to frame.
+
+        Returns:
+            list of pygame.Rect: The areas drawn over (for dirty-rectangle updates).
+        """
+        rects = [self.draw_body(screen)]
+        rects.extend(self.draw_extras(screen, enemies))
+        return rects
+
+    def draw_body(self, screen):
         """
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+        Draws the tower's body. It only changes when the tower is upgraded, so the renderer can keep
+        it in the cached background (see renderer.py).
 
+        Returns:
+            pygame.Rect: The area drawn over.
+        """
         # Optional: Draw range circle for debugging/visualisation
         # pygame.draw.circle(screen, (100, 100, 100, 50), (int(self.x), int(self.y)), self.range, 1) # 4th arg is alpha, 5th is width
+        return pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+
+    def draw_extras(self, screen, enemies: list):
+        """
+        Draws what changes from frame to frame on top of the body (auras, bananas, ...). Nothing for most towers.
+
+        Returns:
+            list of pygame.Rect: The areas drawn over.
+        """
+        return []
 
     def get_upgrade_info(self, path: int, tier: int):
         """Returns the upgrade data (name, price, stats_effect) for a specific path and tier."""
@@ -378,11 +403,14 @@ class Tower:
 
         return True
 
-    def apply_upgrade(self, path: int, tier: int):
+    def apply_upgrade(self, path: int, tier: int, current_time: float = None):
         """
         Applies the effects of an upgrade to the tower's stats and properties.
         Also handles locking out the third path if two paths reach any upgrade tier.
+        current_time is the game time used to start ability/interest timers (defaults to pygame's clock).
         """
+        if current_time is None:
+            current_time = pygame.time.get_ticks() / 1000.0
         upgrade_data = self.get_upgrade_info(path, tier)
         if not upgrade_data:
             print(f"Error: Upgrade data not found for {self.__class__.__name__}, path {path}, tier {tier}")
@@ -480,7 +508,7 @@ class Tower:
                     self.ability_cooldown = value
                 elif stat == 'income_ability': # Sniper Supply Drop, amount of income
                     self.income_ability = value
-                    self.last_ability_time = pygame.time.get_ticks() / 1000.0 # Start cooldown timer
+                    self.last_ability_time = current_time # Start cooldown timer
                 elif stat == 'banana_value': # Banana Farm, value per banana/bundle
                     self.banana_value = value # Sets the value
                 elif stat == 'banana_lifespan': # Banana Farm, how long bananas stay on screen
@@ -490,7 +518,7 @@ class Tower:
                     self.current_bank_amount = 0 # Initialize bank amount when capacity is gained
                 elif stat == 'interest_rate': # Banana Farm Bank interest rate
                     self.interest_rate = value
-                    self.last_interest_time = pygame.time.get_ticks() / 1000.0 # Start interest timer
+                    self.last_interest_time = current_time # Start interest timer
                 elif stat == 'loan_ability': # Banana Farm IMF Loan ability flag
                     self.loan_ability = value
                     self.last_loan_time = 0 # Initialize loan cooldown
@@ -522,7 +550,6 @@ class Tower:
             for p_num in [1, 2, 3]: # Iterate through possible path numbers
                 if p_num not in active_paths:
                     self.upgrades_locked_path = p_num
-                    print(f"Path {p_num} locked for {self.__class__.__name__}") # Debug message
                     break
 
 
@@ -592,7 +619,7 @@ class TackShooter(Tower):
         })
         self.num_projectiles = 8 # Base Tack Shooter fires 8 tacks in a circle
 
-    def fire(self, enemies: list, current_time: float):
+    def fire(self, enemies: list, current_time: float, grid=None):
         """
         Overrides the base fire method to shoot tacks in multiple radial directions.
         Fires if any valid target (non-immune) is in range to avoid wasting shots.
@@ -601,13 +628,11 @@ class TackShooter(Tower):
             return
 
         has_valid_target = False # Flag to check if there's at least one poppable bloon in range
-        for enemy in enemies:
-            dist = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-            if dist <= self.range: # Check if enemy is within nominal range
-                # Check if this enemy can be popped by current projectile config (e.g., camo)
-                if not (enemy.is_camo and not self.projectile_config.get('can_pop_camo', False)):
-                    has_valid_target = True
-                    break # Found at least one valid target, no need to check further
+        for enemy in enemies_in_range(enemies, self.x, self.y, self.range, grid): # Enemies within nominal range
+            # Check if this enemy can be popped by current projectile config (e.g., camo)
+            if not (enemy.is_camo and not self.projectile_config.get('can_pop_camo', False)):
+                has_valid_target = True
+                break # Found at least one valid target, no need to check further
 
         if has_valid_target:
             # Fire self.num_projectiles (e.g., 8 tacks) in radial directions
@@ -652,8 +677,7 @@ class SniperMonkey(Tower):
             return None
 
         furthest_enemy = None
-        max_path_index = -1
-        max_distance_on_segment = -1.0
+        max_distance_travelled = -1.0
 
         for enemy in enemies:
             # Sniper has infinite range, so no dist <= self.range check.
@@ -661,42 +685,18 @@ class SniperMonkey(Tower):
             if enemy.is_camo and not self.projectile_config.get('can_pop_camo', False):
                 continue # Skip camo enemy if sniper cannot pop camo
 
-            # Prioritize based on path index first (further along the track)
-            if enemy.current_path_index > max_path_index:
+            # Prioritize the enemy furthest along the path
+            if enemy.distance_travelled > max_distance_travelled:
                 furthest_enemy = enemy
-                max_path_index = enemy.current_path_index
-                # Calculate distance along the current segment for the new furthest enemy
-                if enemy.current_path_index < len(enemy.path) - 1:
-                    p1 = enemy.path[enemy.current_path_index]
-                    p2 = enemy.path[enemy.current_path_index + 1]
-                    segment_length_sq = (p2[0] - p1[0])**2 + (p2[1] - p1[1])**2
-                    if segment_length_sq > 0:
-                        t = ((enemy.x - p1[0]) * (p2[0] - p1[0]) + (enemy.y - p1[1]) * (p2[1] - p1[1])) / segment_length_sq
-                        max_distance_on_segment = t
-                    else:
-                        max_distance_on_segment = 0.0
-                else: # Enemy is at the very end of the path
-                    max_distance_on_segment = 1.0
-            elif enemy.current_path_index == max_path_index:
-                # If on the same path segment, check which is further along that segment
-                if enemy.current_path_index < len(enemy.path) - 1:
-                    p1 = enemy.path[enemy.current_path_index]
-                    p2 = enemy.path[enemy.current_path_index + 1]
-                    segment_length_sq = (p2[0] - p1[0])**2 + (p2[1] - p1[1])**2
-                    if segment_length_sq > 0:
-                        t = ((enemy.x - p1[0]) * (p2[0] - p1[0]) + (enemy.y - p1[1]) * (p2[1] - p1[1])) / segment_length_sq
-                        if t > max_distance_on_segment:
-                            furthest_enemy = enemy
-                            max_distance_on_segment = t
-                    # else: Segment is a point
-                # else: Both are at the very end
+                max_distance_travelled = enemy.distance_travelled
         return furthest_enemy
 
 
-    def fire(self, enemies: list, current_time: float, screen: pygame.Surface, effects_list: list):
+    def fire(self, enemies: list, current_time: float, effects_list: list, grid=None):
         """
         Overrides the fire method for instant (hitscan) damage.
         Sniper projectiles do not travel; they hit the target instantly.
+        The grid (spatial hash or enemy store) is only needed to split a crowd for on-hit effects.
         """
         if current_time - self.last_shot < (1.0 / self.fire_rate): # Check cooldown
             return
@@ -705,8 +705,11 @@ class SniperMonkey(Tower):
         if target:
             # Create a HitscanProjectile and immediately apply its hit effect
             # MODIFIED: It now passes the projectile_config which contains shrapnel data
-            hitscan_projectile = HitscanProjectile(self, target, **self.projectile_config) 
-            hitscan_projectile.apply_hit(screen, effects_list)
+            hitscan_projectile = acquire(HitscanProjectile, self, target, **self.projectile_config)
+            if hitscan_projectile.on_hit_effects: # Only the front bloon of a crowd is slowed or stunned
+                target.split_front(enemies, grid, self.status_effects)
+            hitscan_projectile.apply_hit(current_time, effects_list)
+            release(hitscan_projectile)
             self.last_shot = current_time # Reset cooldown
 
     def update(self, enemies: list, current_time: float): # enemies list currently unused here
@@ -718,22 +721,21 @@ class SniperMonkey(Tower):
         # Handle Supply Drop ability
         if self.income_ability > 0 and self.ability_cooldown > 0 and \
            current_time - getattr(self, 'last_ability_time', 0) >= self.ability_cooldown:
-            # For now, just print income. In a full game, this would add to player's money.
-            print(f"Sniper Supply Drop: +${self.income_ability}")
+            # The game adds the returned income to the player's money
             self.last_ability_time = current_time # Reset ability cooldown timer
             income_generated = self.income_ability # Store income for game logic to handle
 
         # Other Sniper update logic if any (e.g., tracking debuffs on bloons) could go here.
         return income_generated # Return income for game's economy manager
 
-    def update_projectiles(self, screen, enemies: list, dt: float):
+    def update_projectiles(self, enemies: list, dt: float, current_time: float, effects_list: list, grid=None):
         """
         Sniper Monkey's projectiles are hitscan (instant). They don't need continuous
         position updates or drawing like traditional projectiles. This method is empty.
         However, the shrapnel they create are real projectiles and need to be updated.
         The base Tower.update_projectiles method handles this perfectly.
         """
-        super().update_projectiles(screen, enemies, dt)
+        super().update_projectiles(enemies, dt, current_time, effects_list, grid)
 
 
 class DartlingGunner(Tower):
@@ -774,8 +776,8 @@ class DartlingGunner(Tower):
         if self.accuracy > 0:
             # Calculate random deviation based on accuracy stat
             # Deviation is scaled; accuracy 0.05 might mean up to 5 pixels deviation if 100 is the scale.
-            deviation_x = self.accuracy * 100 * (2 * random.random() - 1) # Random value between -accuracy*100 and +accuracy*100
-            deviation_y = self.accuracy * 100 * (2 * random.random() - 1)
+            deviation_x = self.accuracy * 100 * (2 * self.rng.random() - 1) # Random value between -accuracy*100 and +accuracy*100
+            deviation_y = self.accuracy * 100 * (2 * self.rng.random() - 1)
             target_x = mouse_pos[0] + deviation_x
             target_y = mouse_pos[1] + deviation_y
             self.create_projectile((target_x, target_y))
@@ -817,140 +819,86 @@ class IceTower(Tower):
         self.freeze_duration = 0 # Duration of freeze effect (can be 0 if only slowing)
         self.show_blast_aura = False # Flag to draw a momentary visual for the blast effect
 
-    def update(self, enemies: list, current_time: float, screen): # screen needed for drawing aura
+    def update(self, enemies: list, current_time: float, grid=None):
         """
         Applies freezing/slowing effects and damage to enemies within its range.
         Handles Absolute Zero ability, Arctic Wind continuous effect, and
         base Ice Tower's momentary blast.
+        If a spatial hash (grid) is given, only enemies near the tower are scanned.
+        Effects are timed records (see status_effects.py): the Game expires them, so nothing
+        here has to look at bloons whose effects are still running.
         """
+        effects = self.status_effects
+
         # Handle Absolute Zero ability (if active and cooldown passed)
         if self.global_freeze_ability and self.ability_cooldown > 0 and \
            current_time - getattr(self, 'last_ability_time', 0) >= self.ability_cooldown:
-            print("Absolute Zero activated! Global Freeze!") # Debug message
+            freeze_until = current_time + self.freeze_duration
             for enemy in enemies: # Affect all enemies on screen
                 # Camo check for Absolute Zero might be desired but currently affects all.
-                if not hasattr(enemy, 'original_speed'): # Store original speed if not already stored
-                    enemy.original_speed = enemy.speed
-                enemy.speed = 0 # Fully stop bloons
-                enemy.frozen = True # Mark as frozen
-                enemy.freeze_expire_time = current_time + self.freeze_duration # Set freeze expiration
+                effects.apply(enemy, FREEZE, 0, self, freeze_until) # Fully stop bloons
                 # Note: Actual damage from Absolute Zero is not implemented here, only freeze.
             self.last_ability_time = current_time # Reset ability cooldown
 
+        can_pop_camo = self.projectile_config.get('can_pop_camo', False)
+
         # Arctic Wind - continuous effect (Tier 3 Path 1)
         if self.area_slow:
+            # Enemies inside the aura (Ice tower cannot pop camo by default; Arctic Wind respects this too)
+            in_range = [enemy for enemy in enemies_in_range(enemies, self.x, self.y, self.range, grid)
+                        if not (enemy.is_camo and not can_pop_camo)]
+
             # Damage periodically within the constant aura
             if current_time - self.last_attack_time >= self.attack_cooldown: # Cooldown for damage pulse
-                for enemy in enemies:
-                    dist = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-                    if dist <= self.range: # If enemy in range
-                        # Ice tower cannot pop camo by default; Arctic Wind needs to respect this too.
-                        # (Assuming projectile_config['can_pop_camo'] is updated by upgrades)
-                        if enemy.is_camo and not self.projectile_config.get('can_pop_camo', False):
-                            continue # Skip camo bloon if not poppable
-                        enemy.take_damage(self.blast_damage) # Apply damage
+                for enemy in in_range:
+                    enemy.take_area_damage(self.blast_damage) # Apply damage (to every bloon of a crowd)
                 self.last_attack_time = current_time # Reset damage pulse cooldown
 
-            # Apply slow/freeze continuously for bloons inside the aura
-            for enemy in enemies:
-                # Handle expiration of a global freeze (like Absolute Zero) if enemy is still in Arctic Wind aura
-                if hasattr(enemy, 'frozen_by_ice_tower') and enemy.frozen_by_ice_tower and current_time > getattr(enemy, 'freeze_expire_time', 0):
-                    enemy.frozen = False
-                    del enemy.frozen_by_ice_tower
-                    if hasattr(enemy, 'freeze_expire_time'): del enemy.freeze_expire_time
-                    # Reapply Arctic Wind's own slow/freeze if applicable
-
-                dist = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-                if dist <= self.range: # If enemy in range
-                    if enemy.is_camo and not self.projectile_config.get('can_pop_camo', False):
-                        continue # Skip camo bloon if not poppable
-
-                    # Apply continuous slow if not already slowed by this tower, or re-apply freeze
-                    if not hasattr(enemy, 'ice_slow_active') or not enemy.ice_slow_active or enemy.ice_slow_source != self:
-                        if not hasattr(enemy, 'original_speed'):
-                            enemy.original_speed = enemy.speed
-                        enemy.speed = enemy.original_speed * self.slow_factor # Apply slow
-                        enemy.ice_slow_active = True # Mark as slowed by an ice tower
-                        enemy.ice_slow_source = self # Mark which ice tower slowed it
-                    # If freeze_duration is set (e.g., from Arctic Wind itself or other upgrades), apply/extend freeze
-                    if self.freeze_duration > 0:
-                         enemy.frozen = True
-                         enemy.frozen_by_ice_tower = True # Mark that this tower is freezing it
-                         enemy.freeze_expire_time = current_time + self.freeze_duration # (Re)set freeze timer
-                # else: Enemy is outside the aura (handled below)
-
-            # Clean up speeds and effects for bloons leaving the Arctic Wind aura
-            for enemy in enemies:
-                if hasattr(enemy, 'ice_slow_active') and enemy.ice_slow_active and enemy.ice_slow_source == self:
-                    dist = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-                    if dist > self.range: # If enemy left the aura
-                        if hasattr(enemy, 'original_speed'):
-                            enemy.speed = enemy.original_speed # Restore original speed
-                            del enemy.original_speed
-                        enemy.ice_slow_active = False
-                        del enemy.ice_slow_source
-                        enemy.frozen = False # Unfreeze if leaving aura
-                        if hasattr(enemy, 'frozen_by_ice_tower'): del enemy.frozen_by_ice_tower
-                        if hasattr(enemy, 'freeze_expire_time'): del enemy.freeze_expire_time
+            # Slow (and freeze, if freeze_duration is set) bloons inside the aura. The slow is refreshed
+            # every tick, so it runs out AURA_LINGER seconds after a bloon leaves.
+            slow_until = current_time + AURA_LINGER
+            freeze_until = current_time + self.freeze_duration
+            for enemy in in_range:
+                effects.apply(enemy, SLOW, self.slow_factor, self, slow_until)
+                if self.freeze_duration > 0:
+                    effects.apply(enemy, FREEZE, 0, self, freeze_until) # (Re)set freeze timer
         else: # Momentary blast logic (base Ice Tower and upgrades that don't grant continuous aura)
             if current_time - self.last_attack_time >= self.attack_cooldown: # Check attack cooldown
                 self.show_blast_aura = True # Set flag to draw aura for this frame (visual only)
+                slow_until = current_time + self.slow_duration
+                freeze_until = current_time + self.freeze_duration
+
+                for enemy in enemies_in_range(enemies, self.x, self.y, self.range, grid): # Enemies in range of blast
+                    if enemy.is_camo and not can_pop_camo:
+                        continue # Skip camo bloon if not poppable
+
+                    enemy.take_area_damage(self.blast_damage) # Apply damage (to every bloon of a crowd)
 
-                for enemy in enemies:
-                    dist = math.sqrt((enemy.x - self.x)**2 + (enemy.y - self.y)**2)
-                    if dist <= self.range: # If enemy in range of blast
-                        if enemy.is_camo and not self.projectile_config.get('can_pop_camo', False):
-                            continue # Skip camo bloon if not poppable
-
-                        enemy.take_damage(self.blast_damage) # Apply damage
-
-                        # Apply slow effect (non-stackable by this specific tower instance for momentary blast)
-                        if not hasattr(enemy, 'ice_slow_active') or not enemy.ice_slow_active: # Apply if not already slowed
-                            if not hasattr(enemy, 'original_speed'):
-                                enemy.original_speed = enemy.speed
-                            enemy.speed = enemy.original_speed * self.slow_factor
-                            enemy.ice_slow_expire_time = current_time + self.slow_duration # Set slow expiration
-                            enemy.ice_slow_active = True
-                            enemy.ice_slow_source = self
-                        # If freeze_duration is set by upgrades, apply initial freeze
-                        if self.freeze_duration > 0:
-                            enemy.frozen = True
-                            enemy.freeze_expire_time = current_time + self.freeze_duration # Set freeze expiration
+                    # Apply slow effect (a second blast from this tower only extends it)
+                    effects.apply(enemy, SLOW, self.slow_factor, self, slow_until)
+                    # If freeze_duration is set by upgrades, apply initial freeze
+                    if self.freeze_duration > 0:
+                        effects.apply(enemy, FREEZE, 0, self, freeze_until)
                 self.last_attack_time = current_time # Reset attack cooldown
 
-            # Check and remove expired slow/freeze effects from momentary blasts
-            for enemy in enemies:
-                if hasattr(enemy, 'ice_slow_active') and enemy.ice_slow_active and enemy.ice_slow_source == self and \
-                   current_time > getattr(enemy, 'ice_slow_expire_time', float('inf')): # Check slow expiration
-                    if hasattr(enemy, 'original_speed'):
-                        enemy.speed = enemy.original_speed # Reset speed
-                        del enemy.original_speed
-                    enemy.ice_slow_active = False
-                    del enemy.ice_slow_source
-                    # Also unfreeze if the slow duration was tied to the freeze from this momentary blast
-                    if hasattr(enemy, 'freeze_expire_time') and current_time > enemy.freeze_expire_time:
-                        enemy.frozen = False
-                        if hasattr(enemy, 'freeze_expire_time'): del enemy.freeze_expire_time
-
-
-    def draw(self, screen, enemies: list): # enemies list currently unused here
+
+    def draw_extras(self, screen, enemies: list): # enemies list currently unused here
         """
-        Draws the Ice Tower. If Arctic Wind is active, draw its persistent aura.
+        Draws the Ice Tower's aura. If Arctic Wind is active, draw its persistent aura.
         If a momentary blast just occurred, draw a temporary blast aura.
         """
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius) # Draw tower body
-
         # Draw persistent aura for Arctic Wind
         if self.area_slow:
             aura_surface = pygame.Surface((self.range * 2, self.range * 2), pygame.SRCALPHA) # Create transparent surface
             pygame.draw.circle(aura_surface, (100, 200, 255, 50), (self.range, self.range), self.range) # Draw semi-transparent blue circle
-            screen.blit(aura_surface, (int(self.x - self.range), int(self.y - self.range))) # Blit onto screen
+            return [screen.blit(aura_surface, (int(self.x - self.range), int(self.y - self.range)))] # Blit onto screen
         # Draw momentary blast aura if triggered
         elif self.show_blast_aura:
             aura_surface = pygame.Surface((self.range * 2, self.range * 2), pygame.SRCALPHA)
             pygame.draw.circle(aura_surface, (100, 200, 255, 70), (self.range, self.range), self.range) # Slightly more opaque for momentary
-            screen.blit(aura_surface, (int(self.x - self.range), int(self.y - self.range)))
             self.show_blast_aura = False # Reset flag after drawing for one frame
+            return [screen.blit(aura_surface, (int(self.x - self.range), int(self.y - self.range)))]
+        return []
 
 
 class BananaFarm(Tower):
@@ -980,16 +928,17 @@ class BananaFarm(Tower):
         self.income_per_round = 0 # Passive income for Central Market/Monkey Wall Street (per second in this model)
         self.auto_collect = False # Flag for Monkey Wall Street auto-collection
 
-    def update(self, current_time: float, mouse_pos): # mouse_pos for manual collection
+    def update(self, current_time: float, mouse_pos, dt: float = 1.0 / 60.0): # mouse_pos for manual collection
         """
         Generates bananas, handles their collection (manual or auto), and manages bank/passive income.
+        dt is the time step in seconds, used to move bananas towards the mouse.
         Returns any money earned this frame from collected bananas or passive income.
         """
         money_earned = 0
 
         # Handle passive income from Central Market / Monkey Wall Street (simplified to per-second)
         # This logic triggers roughly once per second if update is called frequently (e.g., 60 FPS)
-        if self.income_per_round > 0 and int(current_time) > int(current_time - (1.0/60.0)): # Check if second changed
+        if self.income_per_round > 0 and int(current_time) > int(current_time - dt): # Check if second changed
              # This is a simplified per-second income. A per-round system would be more complex.
              # For simplicity, let's assume income_per_round is actually income_per_second here.
              # A more robust way: store last_passive_income_time.
@@ -1003,8 +952,8 @@ class BananaFarm(Tower):
             # Generate 4 bananas at/near the farm's location
             for _ in range(4): # BTD6 typically produces multiple bananas per cycle
                 self.bananas.append({
-                    'x': self.x + random.randint(-20, 20), # Slight random offset for visual spread
-                    'y': self.y + random.randint(-20, 20),
+                    'x': self.x + self.rng.randint(-20, 20), # Slight random offset for visual spread
+                    'y': self.y + self.rng.randint(-20, 20),
                     'collected': False, # Flag indicating if collected
                     'spawn_time': current_time # Timestamp of spawn for lifespan check
                 })
@@ -1032,21 +981,32 @@ class BananaFarm(Tower):
             # Note: 150*150 = 22500. Using squared distances avoids sqrt.
             if dist_sq < 150**2:
                 dist = math.sqrt(dist_sq) # Calculate actual distance only if needed
-                # Move banana towards mouse; 0.1 is attraction speed factor
-                banana['x'] += dx/dist * (dist * 0.1) # Proportional move
-                banana['y'] += dy/dist * (dist * 0.1)
+                # Move banana towards mouse; covers 10% of the remaining distance per 1/60 s
+                attraction = min(1.0, 6.0 * dt)
+                banana['x'] += dx * attraction # Proportional move (also safe when the banana is right under the mouse)
+                banana['y'] += dy * attraction
 
                 # Collection range: if mouse is very close, banana is collected
                 if dist < 15:  # Small radius for collection
                     banana['collected'] = True
         return money_earned # Return total money earned this frame
 
-    def draw(self, screen, enemies: list): # enemies list currently unused here
+    def draw_extras(self, screen, enemies: list): # enemies list currently unused here
         """
-        Draws the Banana Farm building and any uncollected bananas on the screen.
+        Draws any uncollected bananas on the screen (the farm building is the tower body).
         """
-        super().draw(screen, enemies) # Draw the base tower (farm building)
         # Draw bananas that haven't been collected
-        for banana in self.bananas:
-            if not banana['collected']:
-                pygame.draw.circle(screen, (255, 255, 0), (int(banana['x']), int(banana['y'])), 8) # Yellow circle for banana
\ No newline at end of file
+        return [pygame.draw.circle(screen, (255, 255, 0), (int(banana['x']), int(banana['y'])), 8) # Yellow circle for banana
+                for banana in self.bananas if not banana['collected']]
+
+
+# Maps the names shown in the buy menu (tower_menu_info) to the tower classes
+TOWER_CLASSES = {
+    "Dart Monkey": DartMonkey,
+    "Tack Shooter": TackShooter,
+    "Sniper Monkey": SniperMonkey,
+    "Dartling Gunner": DartlingGunner,
+    "Ice Tower": IceTower,
+    "Banana Farm": BananaFarm,
+    "Cannon Tower": CannonTower,
+}
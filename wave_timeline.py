@@ -0,0 +1,141 @@
+# wave_timeline.py
+"""
+Waves compiled into spawn timelines, and the scheduler that plays them back.
+
+A wave in enemy_info is a list of spawn groups. compile_wave() turns one into a flat list of
+spawn events sorted by time, so nothing about the group dictionaries has to be looked up
+while the game runs. Each event is a tuple:
+
+    (offset, bloon_class, path, is_regrowth, is_camo)
+
+where offset is the time in seconds from the start of the wave. Groups follow each other as
+they always have: a group starts delay_from_start seconds after the previous group's last
+spawn, and spawns amount bloons spawn_delay seconds apart.
+
+SpawnScheduler keeps the scheduled events of the running wave in a priority queue keyed by
+their due time, and hands out every event that is due in a tick, however many that is.
+"""
+import heapq
+
+from enemy import BLOON_CLASSES
+
+TIME_EPSILON = 1e-9 # Events due this close after the current time count as due (guards against float rounding)
+MAX_COMPILED_WAVES = 1024 # Timelines kept by compile_waves; the least recently used is dropped beyond this
+
+_compiled = {} # Wave contents (see _wave_key) -> timeline, least recently used first
+
+
+def compile_wave(groups, default_path):
+    """
+    Compiles one wave's spawn groups into a timeline.
+
+    Args:
+        groups (list of dict): The wave's spawn groups (see enemy_info.ALL_WAVES).
+        default_path (list of tuples): Path used by groups that don't name their own.
+
+    Returns:
+        list of tuples: Spawn events (offset, bloon_class, path, is_regrowth, is_camo), sorted by offset.
+    """
+    events = []
+    group_start = 0.0 # Time of the previous group's last spawn; the next group's delay counts from here
+    for group in groups:
+        amount = group["amount"]
+        if amount <= 0:
+            continue
+        start = group_start + group["delay_from_start"]
+        spawn_delay = group["spawn_delay"]
+        group_start = start + (amount - 1) * spawn_delay
+
+        bloon_class = BLOON_CLASSES.get(group["type"])
+        if bloon_class is None:
+            print(f"Warning: Unknown bloon type '{group['type']}' in wave data, group skipped.")
+            continue
+        path = group.get("path", default_path)
+        is_regrowth = group.get("is_regrowth", False)
+        is_camo = group.get("is_camo", False)
+        for i in range(amount):
+            events.append((start + i * spawn_delay, bloon_class, path, is_regrowth, is_camo))
+
+    events.sort(key=lambda event: event[0]) # Stable, so bloons due at the same time keep their group order
+    return events
+
+
+def _frozen_path(path):
+    """A path as a tuple of points: hashable, and safe from changes to the list it was copied from."""
+    return tuple(map(tuple, path))
+
+
+def _wave_key(groups, default_path):
+    """Everything compile_wave reads from a wave, as a hashable value."""
+    return default_path, tuple(
+        (group["type"], group["amount"], group["delay_from_start"], group["spawn_delay"],
+         _frozen_path(group["path"]) if "path" in group else None,
+         group.get("is_regrowth", False), group.get("is_camo", False))
+        for group in groups)
+
+
+def compile_waves(waves, default_path):
+    """
+    Compiles every wave (see compile_wave). Returns one timeline per wave.
+
+    Timelines are cached by the waves' contents, so games after the first in a process (e.g., other
+    slices of ALL_WAVES, or waves read back from a replay) don't compile anything. Cached events
+    hold their own tuple copies of the paths, so changing a wave or path list later can't reach them.
+    """
+    default_path = _frozen_path(default_path)
+    timelines = []
+    for groups in waves:
+        key = _wave_key(groups, default_path)
+        timeline = _compiled.pop(key, None) # Re-inserted below, as the most recently used
+        if timeline is None:
+            # Compiled with the key's frozen paths, not the lists passed in
+            timeline = compile_wave([group if frozen[4] is None else dict(group, path=frozen[4])
+                                     for group, frozen in zip(groups, key[1])], default_path)
+            if len(_compiled) >= MAX_COMPILED_WAVES:
+                del _compiled[next(iter(_compiled))]
+        _compiled[key] = timeline
+        timelines.append(timeline)
+    return timelines
+
+
+class SpawnScheduler:
+    """
+    Priority queue of pending spawns, ordered by the game time they are due.
+    """
+    def __init__(self):
+        self.queue = [] # Heap of (due_time, sequence, bloon_class, path, is_regrowth, is_camo)
+        self.sequence = 0 # Tie-breaker: events due at the same time come out in the order they were scheduled
+
+    def __len__(self):
+        return len(self.queue)
+
+    def schedule(self, timeline, start_time):
+        """
+        Queues every event of a compiled timeline.
+
+        Args:
+            timeline (list of tuples): Events from compile_wave.
+            start_time (float): Game time the timeline's offsets count from.
+        """
+        queue = self.queue
+        for offset, bloon_class, path, is_regrowth, is_camo in timeline:
+            heapq.heappush(queue, (start_time + offset, self.sequence, bloon_class, path, is_regrowth, is_camo))
+            self.sequence += 1
+
+    def pop_due(self, current_time):
+        """
+        Removes and returns every event due at or before current_time, earliest first.
+
+        Returns:
+            list of tuples: (due_time, sequence, bloon_class, path, is_regrowth, is_camo) for each due spawn.
+        """
+        queue = self.queue
+        due = []
+        limit = current_time + TIME_EPSILON
+        while queue and queue[0][0] <= limit:
+            due.append(heapq.heappop(queue))
+        return due
+
+    def clear(self):
+        """Drops every pending spawn."""
+        self.queue = []